@@ -1,80 +1,52 @@
 #!/usr/bin/env python3
 
+# Step-by-step log of the shared snakeai engine on a 20x30 board. The engine
+# differs from the original debug script in two ways: the network sees the
+# distance-based values of SmartSnake.look_in_direction rather than 1/wall
+# distance with food and body flags, and food is kept more than 3 steps from
+# the head in Manhattan distance rather than more than 3 columns away.
+
 import numpy as np
-import random
 
-class DebugNeuralNetwork:
-    def __init__(self, input_size=24, hidden_size=16, output_size=4):
-        self.input_size = input_size
-        self.hidden_size = hidden_size
-        self.output_size = output_size
+from snakeai import DIRECTIONS, VISION_DIRECTIONS, GameRules, ImprovedNeuralNetwork, SmartSnake
+
+# 20 wide, 30 high, 200 moves to start with and +100 per food up to 500. Food
+# lands anywhere more than 3 steps (Manhattan) from the head.
+DEBUG_RULES = GameRules(width=20, height=30, start_life=200, food_life=100, max_life=500, max_hunger=500,
+                        food_margin=0, food_distance=3)
+
+class DebugNeuralNetwork(ImprovedNeuralNetwork):
+    def __init__(self, input_size=24, hidden_size=16, output_size=4, rng=None):
+        super().__init__(input_size, hidden_size, output_size, rng)
 
         # Initialize weights with smaller random values for more stable start
-        self.weights1 = np.random.randn(input_size, hidden_size) * 0.1
-        self.weights2 = np.random.randn(hidden_size, hidden_size) * 0.1
-        self.weights3 = np.random.randn(hidden_size, output_size) * 0.1
+        self.weights1 *= 0.5
+        self.weights2 *= 0.5
+        self.weights3 *= 0.5
 
         self.bias1 = np.zeros((1, hidden_size))
         self.bias2 = np.zeros((1, hidden_size))
         self.bias3 = np.zeros((1, output_size))
 
-    def relu(self, x):
-        return np.maximum(0, x)
-
-    def softmax(self, x):
-        exp_x = np.exp(x - np.max(x))
-        return exp_x / np.sum(exp_x)
-
-    def forward(self, x):
-        z1 = np.dot(x, self.weights1) + self.bias1
-        a1 = self.relu(z1)
-        z2 = np.dot(a1, self.weights2) + self.bias2
-        a2 = self.relu(z2)
-        z3 = np.dot(a2, self.weights3) + self.bias3
-        output = self.softmax(z3)
-        return output
-
-class DebugSnake:
-    def __init__(self):
-        self.reset()
-        self.brain = DebugNeuralNetwork()
+class DebugSnake(SmartSnake):
+    def __init__(self, rng=None, rules=DEBUG_RULES):
+        super().__init__(brain=DebugNeuralNetwork(), rng=rng, rules=rules)
 
     def reset(self):
         # Start in center, facing right
-        self.body = [(10, 15)]
-        self.direction = (1, 0)  # Start moving right
-        self.food = self.place_food()
-        self.score = 0
-        self.life_left = 200
-        self.dead = False
+        super().reset()
         self.moves_made = 0
 
-    def place_food(self):
-        while True:
-            food = (random.randint(0, 19), random.randint(0, 29))
-            if food not in self.body and abs(food[0] - self.body[0][0]) > 3:
-                return food
-
     def get_vision(self):
         """Get vision data with detailed logging"""
         vision = []
-        directions = [
-            (0, -1),   # Up
-            (1, -1),   # Up-Right
-            (1, 0),    # Right
-            (1, 1),    # Down-Right
-            (0, 1),    # Down
-            (-1, 1),   # Down-Left
-            (-1, 0),   # Left
-            (-1, -1)   # Up-Left
-        ]
 
         print(f"\n=== Snake Vision Analysis ===")
         print(f"Position: {self.body[0]}")
         print(f"Food: {self.food}")
         print(f"Current direction: {self.direction}")
 
-        for i, (dx, dy) in enumerate(directions):
+        for i, (dx, dy) in enumerate(VISION_DIRECTIONS):
             food_dist, body_dist, wall_dist = self.look_in_direction(dx, dy)
             vision.extend([food_dist, body_dist, wall_dist])
 
@@ -83,33 +55,6 @@ class DebugSnake:
 
         return vision
 
-    def look_in_direction(self, dx, dy):
-        head_x, head_y = self.body[0]
-        distance = 1
-        food_found = False
-        body_found = False
-
-        while True:
-            x = head_x + dx * distance
-            y = head_y + dy * distance
-
-            # Check wall collision
-            if x < 0 or x >= 20 or y < 0 or y >= 30:
-                food_dist = 1/distance if food_found else 0
-                body_dist = 1/distance if body_found else 0
-                wall_dist = 1/distance
-                return [food_dist, body_dist, wall_dist]
-
-            # Check food collision
-            if not food_found and (x, y) == self.food:
-                food_found = True
-
-            # Check body collision
-            if not body_found and (x, y) in self.body[1:]:
-                body_found = True
-
-            distance += 1
-
     def make_decision(self):
         """Make AI decision with detailed logging"""
         vision = self.get_vision()
@@ -117,8 +62,7 @@ class DebugSnake:
 
         output = self.brain.forward(vision_array)[0]
         direction_index = np.argmax(output)
-        directions = [(0, -1), (0, 1), (-1, 0), (1, 0)]  # Up, Down, Left, Right
-        new_direction = directions[direction_index]
+        new_direction = DIRECTIONS[direction_index]  # Up, Down, Left, Right
 
         print(f"\n=== AI Decision ===")
         print(f"Neural network outputs: [{output[0]:.3f}, {output[1]:.3f}, {output[2]:.3f}, {output[3]:.3f}]")
@@ -147,39 +91,26 @@ class DebugSnake:
         print(f"Direction: {self.direction}")
         print(f"New position: {new_head}")
 
-        # Check wall collision
-        if new_head[0] < 0 or new_head[0] >= 20 or new_head[1] < 0 or new_head[1] >= 30:
+        score = self.score
+        super().move()
+
+        if self.death_cause == "wall":
             print(f"💀 DIED: Hit wall at {new_head}")
-            self.dead = True
             return
-
-        # Check body collision
-        if new_head in self.body:
+        if self.death_cause == "body":
             print(f"💀 DIED: Hit body at {new_head}")
-            self.dead = True
             return
 
-        # Move snake
-        self.body.insert(0, new_head)
-
-        # Check food collision
-        if new_head == self.food:
-            self.score += 1
+        if self.score > score:
             print(f"🍎 ATE FOOD! Score: {self.score}")
-            self.food = self.place_food()
-            self.life_left = min(self.life_left + 100, 500)
-        else:
-            self.body.pop()
 
         self.moves_made += 1
-        self.life_left -= 1
 
         print(f"New body length: {len(self.body)}")
         print(f"Life left: {self.life_left}")
 
-        if self.life_left <= 0:
-            print(f"💀 DIED: Ran out of life")
-            self.dead = True
+        if self.dead:
+            print(f"💀 DIED: {self.death_cause}")
 
 def run_debug_session():
     print("🐍 Starting Snake AI Debug Session")
@@ -1,15 +1,15 @@
-import pygame
+# Pygame front-end for the original Snake AI port. The game itself is the
+# shared engine in the snakeai package, played here by the port's rules: a
+# shorter life budget, no hunger limit and food anywhere on the board.
+# Vision is the engine's, not the port's: along each ray the network sees the
+# distance-based values of SmartSnake.look_in_direction, where the port gave
+# 1/wall distance in all three slots and zeroed food and body when they were
+# not on the ray.
 import numpy as np
-import random
-import math
-from collections import deque
+import pygame
 
-# Window dimensions
-WIDTH = 800
-HEIGHT = 600
-GRID_SIZE = 20
-GRID_WIDTH = WIDTH // GRID_SIZE
-GRID_HEIGHT = HEIGHT // GRID_SIZE
+from snakeai import DIRECTIONS, HEIGHT, WIDTH, GameRules, ImprovedNeuralNetwork, SmartSnake
+from snakeai.render import BoardRenderer
 
 # Colors
 BLACK = (0, 0, 0)
@@ -18,68 +18,51 @@ GREEN = (0, 255, 0)
 RED = (255, 0, 0)
 BLUE = (0, 0, 255)
 
-class NeuralNetwork:
-    def __init__(self, input_size=24, hidden_size=16, output_size=4):
-        self.input_size = input_size
-        self.hidden_size = hidden_size
-        self.output_size = output_size
+# 200 moves to start with, +100 per food up to 500. The hunger limit equals
+# the life cap, so life always runs out first.
+CLASSIC_RULES = GameRules(start_life=200, food_life=100, max_life=500, max_hunger=500,
+                          food_margin=0, food_distance=0)
+
+class NeuralNetwork(ImprovedNeuralNetwork):
+    def __init__(self, input_size=24, hidden_size=16, output_size=4, rng=None):
+        super().__init__(input_size, hidden_size, output_size, rng)
 
         # Initialize weights with random values
-        self.weights1 = np.random.randn(input_size, hidden_size) * 0.5
-        self.weights2 = np.random.randn(hidden_size, hidden_size) * 0.5
-        self.weights3 = np.random.randn(hidden_size, output_size) * 0.5
+        self.weights1 *= 2.5
+        self.weights2 *= 2.5
+        self.weights3 *= 2.5
 
         # Bias terms
         self.bias1 = np.zeros((1, hidden_size))
         self.bias2 = np.zeros((1, hidden_size))
         self.bias3 = np.zeros((1, output_size))
 
-    def relu(self, x):
-        return np.maximum(0, x)
-
-    def relu_derivative(self, x):
-        return (x > 0).astype(float)
-
-    def forward(self, x):
-        # First hidden layer
-        self.z1 = np.dot(x, self.weights1) + self.bias1
-        self.a1 = self.relu(self.z1)
-
-        # Second hidden layer
-        self.z2 = np.dot(self.a1, self.weights2) + self.bias2
-        self.a2 = self.relu(self.z2)
-
-        # Output layer
-        self.z3 = np.dot(self.a2, self.weights3) + self.bias3
-        self.output = self.softmax(self.z3)
-
-        return self.output
+    def mutate(self, mutation_rate=0.05, rng=None):
+        if rng is None:
+            rng = np.random.default_rng()
 
-    def softmax(self, x):
-        exp_x = np.exp(x - np.max(x))
-        return exp_x / np.sum(exp_x)
-
-    def mutate(self, mutation_rate=0.05):
         # Mutate weights
-        if random.random() < mutation_rate:
-            self.weights1 += np.random.randn(*self.weights1.shape) * 0.1
-        if random.random() < mutation_rate:
-            self.weights2 += np.random.randn(*self.weights2.shape) * 0.1
-        if random.random() < mutation_rate:
-            self.weights3 += np.random.randn(*self.weights3.shape) * 0.1
+        if rng.random() < mutation_rate:
+            self.weights1 += rng.standard_normal(self.weights1.shape) * 0.1
+        if rng.random() < mutation_rate:
+            self.weights2 += rng.standard_normal(self.weights2.shape) * 0.1
+        if rng.random() < mutation_rate:
+            self.weights3 += rng.standard_normal(self.weights3.shape) * 0.1
 
         # Clamp weights
         self.weights1 = np.clip(self.weights1, -1, 1)
         self.weights2 = np.clip(self.weights2, -1, 1)
         self.weights3 = np.clip(self.weights3, -1, 1)
 
-    def crossover(self, partner):
-        child = NeuralNetwork(self.input_size, self.hidden_size, self.output_size)
+    def crossover(self, partner, rng=None):
+        if rng is None:
+            rng = np.random.default_rng()
+        child = NeuralNetwork(self.input_size, self.hidden_size, self.output_size, rng)
 
         # Simple crossover - mix weights from both parents
-        mask1 = np.random.random(self.weights1.shape) < 0.5
-        mask2 = np.random.random(self.weights2.shape) < 0.5
-        mask3 = np.random.random(self.weights3.shape) < 0.5
+        mask1 = rng.random(self.weights1.shape) < 0.5
+        mask2 = rng.random(self.weights2.shape) < 0.5
+        mask3 = rng.random(self.weights3.shape) < 0.5
 
         child.weights1 = np.where(mask1, self.weights1, partner.weights1)
         child.weights2 = np.where(mask2, self.weights2, partner.weights2)
@@ -87,131 +70,24 @@ class NeuralNetwork:
 
         return child
 
-class Snake:
-    def __init__(self, brain=None):
-        self.reset()
-        if brain is None:
-            self.brain = NeuralNetwork()
-        else:
-            self.brain = brain
-
-    def reset(self):
-        # Start position in the middle
-        self.body = [(GRID_WIDTH // 2, GRID_HEIGHT // 2)]
-        self.direction = (1, 0)  # Start moving right
-        self.food = self.place_food()
-        self.score = 0
-        self.life_left = 200
-        self.dead = False
-        self.fitness = 0
-
-    def place_food(self):
-        while True:
-            food = (random.randint(0, GRID_WIDTH-1), random.randint(0, GRID_HEIGHT-1))
-            if food not in self.body:
-                return food
-
-    def look(self):
-        """Look in 8 directions and detect food, body, and wall"""
-        vision = []
-        directions = [
-            (0, -1),   # Up
-            (1, -1),   # Up-Right
-            (1, 0),    # Right
-            (1, 1),    # Down-Right
-            (0, 1),    # Down
-            (-1, 1),   # Down-Left
-            (-1, 0),   # Left
-            (-1, -1)   # Up-Left
-        ]
-
-        for dx, dy in directions:
-            # Look for food, body, wall in this direction
-            food_dist, body_dist, wall_dist = self.look_in_direction(dx, dy)
-            vision.extend([food_dist, body_dist, wall_dist])
-
-        return vision
-
-    def look_in_direction(self, dx, dy):
-        """Look in a specific direction and return distances to food, body, and wall"""
-        head_x, head_y = self.body[0]
-        distance = 1
-        food_found = False
-        body_found = False
-
-        while True:
-            x = head_x + dx * distance
-            y = head_y + dy * distance
-
-            # Check wall collision
-            if x < 0 or x >= GRID_WIDTH or y < 0 or y >= GRID_HEIGHT:
-                food_dist = 1/distance if food_found else 0
-                body_dist = 1/distance if body_found else 0
-                wall_dist = 1/distance
-                return [food_dist, body_dist, wall_dist]
-
-            # Check food collision
-            if not food_found and (x, y) == self.food:
-                food_found = True
-
-            # Check body collision
-            if not body_found and (x, y) in self.body[1:]:
-                body_found = True
-
-            distance += 1
+class Snake(SmartSnake):
+    """A SmartSnake on CLASSIC_RULES that follows its network without heuristics"""
+
+    def __init__(self, brain=None, rng=None, rules=CLASSIC_RULES):
+        super().__init__(brain=brain if brain is not None else NeuralNetwork(), rng=rng, rules=rules)
 
     def think(self):
         """Use neural network to decide next direction"""
-        vision = self.look()
-        vision_array = np.array(vision).reshape(1, -1)
-
+        vision_array = np.array(self.look()).reshape(1, -1)
         output = self.brain.forward(vision_array)[0]
 
         # Choose direction with highest output
-        direction_index = np.argmax(output)
-
-        # Map index to direction
-        directions = [(0, -1), (0, 1), (-1, 0), (1, 0)]  # Up, Down, Left, Right
-        new_direction = directions[direction_index]
+        new_direction = DIRECTIONS[np.argmax(output)]
 
         # Prevent reversing
         if (new_direction[0] * -1, new_direction[1] * -1) != self.direction:
             self.direction = new_direction
 
-    def move(self):
-        """Move the snake"""
-        if self.dead:
-            return
-
-        head_x, head_y = self.body[0]
-        new_head = (head_x + self.direction[0], head_y + self.direction[1])
-
-        # Check wall collision
-        if (new_head[0] < 0 or new_head[0] >= GRID_WIDTH or
-            new_head[1] < 0 or new_head[1] >= GRID_HEIGHT):
-            self.dead = True
-            return
-
-        # Check body collision
-        if new_head in self.body:
-            self.dead = True
-            return
-
-        # Move snake
-        self.body.insert(0, new_head)
-
-        # Check food collision
-        if new_head == self.food:
-            self.score += 1
-            self.food = self.place_food()
-            self.life_left = min(self.life_left + 100, 500)
-        else:
-            self.body.pop()
-
-        self.life_left -= 1
-        if self.life_left <= 0:
-            self.dead = True
-
     def calculate_fitness(self):
         """Calculate fitness based on score and lifetime"""
         if self.score < 10:
@@ -221,8 +97,7 @@ class Snake:
 
     def clone(self):
         """Create a copy of the snake"""
-        new_snake = Snake(self.brain)
-        return new_snake
+        return Snake(self.brain, rules=self.rules)
 
 class SnakeGame:
     def __init__(self, human_controlled=False):
@@ -232,6 +107,7 @@ class SnakeGame:
         self.clock = pygame.time.Clock()
         self.human_controlled = human_controlled
         self.snake = Snake()
+        self.board = BoardRenderer(self.snake.width, self.snake.height)
         self.running = True
         self.fps = 10
 
@@ -254,19 +130,8 @@ class SnakeGame:
                         self.snake.reset()
 
     def draw(self):
-        self.screen.fill(BLACK)
-
-        # Draw snake
-        for i, segment in enumerate(self.snake.body):
-            color = GREEN if i == 0 else WHITE  # Head is green
-            pygame.draw.rect(self.screen, color,
-                           (segment[0] * GRID_SIZE, segment[1] * GRID_SIZE,
-                            GRID_SIZE, GRID_SIZE))
-
-        # Draw food
-        pygame.draw.rect(self.screen, RED,
-                        (self.snake.food[0] * GRID_SIZE, self.snake.food[1] * GRID_SIZE,
-                         GRID_SIZE, GRID_SIZE))
+        # Snake (green head, white body) and food in one blit
+        self.board.draw(self.screen, self.snake)
 
         # Draw score
         font = pygame.font.Font(None, 36)
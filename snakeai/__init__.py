@@ -0,0 +1,22 @@
+"""Display-free core of the Python Snake AI
+
+Game rules, brains and evolution live here without any pygame dependency;
+the pygame front-end is snakeai.ui and the command line is python -m snakeai.
+"""
+
+from .batch import BatchSnakeEnv, evaluate_genomes, play_batch
+from .brain import ImprovedNeuralNetwork, PopulationBrain, genome_layout, random_genomes
+from .curriculum import Curriculum
+from .evolution import SimpleEvolution
+from .processing import (ProcessingNeuralNetwork, ProcessingSnake, load_processing_model,
+                         save_processing_model)
+from .rules import (DEFAULT_RULES, DIRECTIONS, GRID_HEIGHT, GRID_SIZE, GRID_WIDTH, HEIGHT, VISION_DIRECTIONS,
+                    WIDTH, GameRules, build_ray_tables, get_board)
+from .snake import SmartSnake
+from .training import TrainingWorker
+
+__all__ = ["BatchSnakeEnv", "evaluate_genomes", "play_batch", "ImprovedNeuralNetwork", "PopulationBrain",
+           "genome_layout", "random_genomes", "Curriculum", "SimpleEvolution", "ProcessingNeuralNetwork",
+           "ProcessingSnake", "load_processing_model", "save_processing_model", "DEFAULT_RULES", "DIRECTIONS",
+           "GRID_HEIGHT", "GRID_SIZE", "GRID_WIDTH", "HEIGHT", "VISION_DIRECTIONS", "WIDTH", "GameRules",
+           "build_ray_tables", "get_board", "SmartSnake", "TrainingWorker"]
@@ -0,0 +1,404 @@
+import numpy as np
+
+from .brain import PopulationBrain
+from .kernel import load_kernels, resolve_backend
+from .profiling import BRAIN_PHASES, SNAKE_PHASES
+from .snake import (DEATH_CAUSES, DEFAULT_RULES, DIRECTIONS, HEAD_LINK, VISION_DIRECTIONS, VISION_DX,
+                    VISION_DY)
+
+class BatchSnakeEnv:
+    """Run many SmartSnake games side by side as NumPy arrays
+
+    Each game follows the exact rules of SmartSnake.think/move, so a game with
+    the same food rng and brain plays out identically. Dead games are masked
+    out and keep their final state. backend picks how look and move run (see
+    snakeai.kernel); every backend plays the same games.
+    """
+
+    def __init__(self, num_games, rngs=None, detect_loops=False, rules=None, backend="numpy"):
+        self.num_games = num_games
+        self.detect_loops = detect_loops  # As in SmartSnake: end games that repeat a state without eating
+        self.rules = rules if rules is not None else DEFAULT_RULES  # Shared by every game
+        self.board = self.rules.board
+        self.width = self.rules.width
+        self.height = self.rules.height
+        self.ray_cells, self.wall_distance = self.board.ray_cells, self.board.wall_distance
+        self.backend = resolve_backend(backend)
+        self.kernels = load_kernels(self.backend)  # None for the vectorised NumPy methods
+
+        # Occupancy grid per game plus a ring buffer of body cells (head at head_ptr).
+        # cells has one spare, always empty column for the ray padding.
+        self.cells = np.zeros((num_games, self.width * self.height + 1), dtype=bool)
+        self.grid = self.cells[:, :-1].reshape(num_games, self.height, self.width)
+        self.body_cells = np.zeros((num_games, self.width * self.height), dtype=np.int32)
+        # Direction from each body cell to the segment ahead of it, for the Zobrist hash
+        self.links = np.zeros((num_games, self.width * self.height), dtype=np.int8)
+        # Free-cell index of the food cells per game, as in SmartSnake
+        self.free_cells = np.zeros((num_games, len(self.rules.food_cells)), dtype=np.int32)
+        self.free_position = np.zeros((num_games, self.width * self.height), dtype=np.int32)
+        self.num_free = np.zeros(num_games, dtype=np.int64)
+        # State hashes since the last food, indexed by moves_without_food
+        self.recent_states = (np.zeros((num_games, self.rules.max_hunger + 2), dtype=np.uint64)
+                              if detect_loops else None)
+
+        self.reset(rngs)
+
+    def reset(self, rngs=None):
+        """Start every game from the SmartSnake.reset position"""
+        if rngs is None:
+            rngs = [np.random.default_rng(seed) for seed in np.random.SeedSequence().spawn(self.num_games)]
+        self.rngs = list(rngs)
+
+        start_x, start_y = self.rules.start
+        start = start_y * self.width + start_x
+        self.grid[:] = False
+        self.cells[:, start] = True
+        self.free_cells[:] = self.rules.food_cells
+        self.free_position[:] = -1
+        self.free_position[:, self.rules.food_cells] = np.arange(len(self.rules.food_cells))
+        self.num_free[:] = len(self.rules.food_cells)
+        all_games = np.arange(self.num_games)
+        self.take_cells(all_games, np.full(self.num_games, start))
+        self.body_cells[:, 0] = start
+        self.head_ptr = np.zeros(self.num_games, dtype=np.int64)
+        self.head = np.full(self.num_games, start, dtype=np.int64)
+        self.length = np.ones(self.num_games, dtype=np.int64)
+
+        self.direction = np.full(self.num_games, DIRECTIONS.index((1, 0)))  # Start moving right
+        self.score = np.zeros(self.num_games, dtype=np.int64)
+        self.life_left = np.full(self.num_games, self.rules.start_life, dtype=np.int64)
+        self.moves_without_food = np.zeros(self.num_games, dtype=np.int64)
+        self.steps = np.zeros(self.num_games, dtype=np.int64)
+        self.dead = np.zeros(self.num_games, dtype=bool)
+        self.stopped = np.zeros(self.num_games, dtype=bool)  # Ended early by stop(), not by the rules
+        self.death_cause = np.full(self.num_games, -1, dtype=np.int8)  # Index into DEATH_CAUSES once dead
+        self.body_hash = np.full(self.num_games, self.board.zobrist_body[start, HEAD_LINK])
+
+        self.food = np.array([self.place_food(i) for i in range(self.num_games)], dtype=np.int64)
+        if self.detect_loops:
+            self.recent_states[:, 0] = self.state_hash(all_games)
+
+    def state_hash(self, games):
+        """SmartSnake.state_hash of the given games"""
+        return (self.body_hash[games] ^ self.board.zobrist_food[self.food[games]]
+                ^ self.board.zobrist_direction[self.direction[games]])
+
+    def take_cells(self, games, cells):
+        """SmartSnake.take_cell of one cell per game"""
+        position = self.free_position[games, cells]
+        keep = position >= 0
+        games, cells, position = games[keep], cells[keep], position[keep]
+        self.num_free[games] -= 1
+        last = self.free_cells[games, self.num_free[games]]
+        self.free_cells[games, position] = last
+        self.free_position[games, last] = position
+        self.free_position[games, cells] = -1
+
+    def release_cells(self, games, cells):
+        """SmartSnake.release_cell of one cell per game"""
+        keep = self.rules.food_cell_mask[cells]
+        games, cells = games[keep], cells[keep]
+        self.free_cells[games, self.num_free[games]] = cells
+        self.free_position[games, cells] = self.num_free[games]
+        self.num_free[games] += 1
+
+    def place_food(self, game):
+        """SmartSnake.place_food for one game, returned as a flat cell index (-1 once the game is won)"""
+        count = int(self.num_free[game])
+        if count == 0:
+            return -1
+        rng = self.rngs[game]
+        head_y, head_x = divmod(int(self.head[game]), self.width)
+        checked = False
+        while True:
+            food = int(self.free_cells[game, int(rng.integers(count))])
+            food_y, food_x = divmod(food, self.width)
+            # Make sure food is not too close to snake
+            if abs(food_x - head_x) + abs(food_y - head_y) > self.rules.food_distance:
+                return food
+            if not checked:
+                if self.free_cells_near_head(game) == count:
+                    return food
+                checked = True
+
+    def free_cells_near_head(self, game):
+        """SmartSnake.free_cells_near_head for one game"""
+        head_y, head_x = divmod(int(self.head[game]), self.width)
+        x = head_x + self.rules.near_dx
+        y = head_y + self.rules.near_dy
+        inside = (x >= 0) & (x < self.width) & (y >= 0) & (y < self.height)
+        return int((self.free_position[game, y[inside] * self.width + x[inside]] >= 0).sum())
+
+    def stop(self, games):
+        """End the given games where they stand"""
+        self.dead[games] = True
+        self.stopped[games] = True
+
+    def alive_games(self):
+        return np.flatnonzero(~self.dead)
+
+    def look(self, games):
+        """Vision of the given games, shape (len(games), 24) in SmartSnake.look order"""
+        if self.kernels is not None:
+            vision = np.empty((len(games), 3 * len(VISION_DIRECTIONS)))
+            self.kernels[0](games, self.head, self.food, self.cells, self.ray_cells, self.wall_distance,
+                            self.width, VISION_DX, VISION_DY, vision)
+            return vision
+
+        heads = self.head[games]
+        wall = self.wall_distance[heads]
+        visible = wall > 0
+
+        # First body cell along each ray
+        rays = self.ray_cells[heads]
+        body_hit = self.cells.ravel()[(games * self.cells.shape[1])[:, None, None] + rays]
+        body_distance = body_hit.argmax(axis=2) + 1
+        body_found = np.take_along_axis(body_hit, body_distance[..., None] - 1, axis=2)[..., 0] & visible
+
+        # Food sits on a ray if it is a whole number of steps away, short of the wall
+        head_y, head_x = np.divmod(heads, self.width)
+        food_y, food_x = np.divmod(self.food[games], self.width)
+        food_dx = (food_x - head_x)[:, None]
+        food_dy = (food_y - head_y)[:, None]
+        food_distance = np.where(VISION_DX != 0, food_dx * VISION_DX, food_dy * VISION_DY)
+        food_found = ((food_distance >= 1) & (food_distance < wall) &
+                      (food_dx == food_distance * VISION_DX) & (food_dy == food_distance * VISION_DY))
+
+        vision = np.empty((len(games), len(VISION_DIRECTIONS), 3))
+        vision[..., 0] = np.where(food_found, 1.0 / np.maximum(food_distance, 20), 0)
+        vision[..., 1] = np.where(body_found, 1.0 / np.maximum(body_distance, 20), 0)
+        vision[..., 2] = np.where(visible, 1.0 / np.maximum(wall, 1), 0)
+
+        return vision.reshape(len(games), -1)
+
+    def safe_directions(self, games):
+        """is_safe_direction for all four DIRECTIONS, shape (len(games), 4)"""
+        # A neighbour past the wall (-1) reads the spare column, which is always empty
+        neighbours = self.board.neighbours[self.head[games]]
+        return (neighbours >= 0) & ~self.cells[games[:, None], neighbours]
+
+    def heuristic_directions(self, games, allowed):
+        """SmartSnake.get_heuristic_direction for the given games"""
+        head_y, head_x = np.divmod(self.head[games], self.width)
+        food_y, food_x = np.divmod(self.food[games], self.width)
+        dx = food_x - head_x
+        dy = food_y - head_y
+
+        # Prefer the direction that gets us closer to food
+        preferred = np.where(np.abs(dx) > np.abs(dy),
+                             np.where(dx > 0, 3, 2),
+                             np.where(dy > 0, 1, 0))
+
+        # Alternatives are tried Down, Up, Right, Left
+        alternative_order = np.array([1, 0, 3, 2])
+        alternative_ok = allowed[:, alternative_order]
+        alternative = alternative_order[alternative_ok.argmax(axis=1)]
+
+        rows = np.arange(len(games))
+        return np.where(allowed[rows, preferred], preferred,
+                        np.where(alternative_ok.any(axis=1), alternative, self.direction[games]))
+
+    def think(self, games, outputs):
+        """Apply SmartSnake.think's decision rules to the brain outputs of the given games"""
+        rows = np.arange(len(games))
+        current = self.direction[games]
+        safe = self.safe_directions(games)
+        not_reverse = np.arange(len(DIRECTIONS))[None, :] != (current ^ 1)[:, None]
+        allowed = safe & not_reverse
+
+        choice = outputs.argmax(axis=1)
+
+        # Fallback to simple heuristics if AI output is too random
+        uncertain = outputs.max(axis=1) < 0.35
+        if uncertain.any():
+            choice[uncertain] = self.heuristic_directions(games[uncertain], allowed[uncertain])
+
+        # Prevent immediate suicide by taking the first safe direction
+        rescue = ~safe[rows, choice] & allowed.any(axis=1)
+        choice[rescue] = allowed[rescue].argmax(axis=1)
+
+        # Prevent reversing
+        turn = choice != (current ^ 1)
+        self.direction[games[turn]] = choice[turn]
+
+    def move(self):
+        """Advance every live game by one SmartSnake.move"""
+        games = self.alive_games()
+        if len(games) == 0:
+            return
+        if self.kernels is not None:
+            self.kernel_move(games)
+            return
+
+        self.steps[games] += 1
+
+        new_head = self.board.neighbours[self.head[games], self.direction[games]]
+
+        # Wall and body collisions
+        hit_wall = new_head < 0
+        crashed = hit_wall | self.cells[games, new_head]
+        self.dead[games[crashed]] = True
+        self.death_cause[games[crashed]] = np.where(hit_wall[crashed], DEATH_CAUSES.index("wall"),
+                                                    DEATH_CAUSES.index("body"))
+
+        games = games[~crashed]
+        new_head = new_head[~crashed]
+        ate = new_head == self.food[games]
+
+        # The old head now links to the new one
+        old_head = self.head[games]
+        moved = self.direction[games]
+        self.links[games, old_head] = moved
+        zobrist_body = self.board.zobrist_body
+        self.body_hash[games] ^= (zobrist_body[old_head, HEAD_LINK] ^ zobrist_body[old_head, moved]
+                                  ^ zobrist_body[new_head, HEAD_LINK])
+
+        # Free the tail of every snake that does not grow
+        capacity = self.body_cells.shape[1]
+        movers = games[~ate]
+        tail = self.body_cells[movers, (self.head_ptr[movers] - self.length[movers] + 1) % capacity]
+        self.cells[movers, tail] = False
+        self.body_hash[movers] ^= zobrist_body[tail, self.links[movers, tail]]
+        self.take_cells(games, new_head)
+        self.release_cells(movers, tail)
+
+        self.head_ptr[games] = (self.head_ptr[games] + 1) % capacity
+        self.body_cells[games, self.head_ptr[games]] = new_head
+        self.head[games] = new_head
+        self.cells[games, new_head] = True
+
+        eaters = games[ate]
+        self.length[eaters] += 1
+        self.score[eaters] += 1
+        self.life_left[eaters] = np.minimum(self.life_left[eaters] + self.rules.food_life, self.rules.max_life)
+        self.moves_without_food[eaters] = 0
+        self.moves_without_food[movers] += 1
+        for game in eaters:
+            self.food[game] = self.place_food(game)
+
+        self.life_left[games] -= 1
+        starved = (self.life_left[games] <= 0) | (self.moves_without_food[games] > self.rules.max_hunger)
+        self.dead[games[starved]] = True
+        self.death_cause[games[starved]] = DEATH_CAUSES.index("starvation")
+        self.end_won_games(eaters)
+
+        if self.detect_loops:
+            games = games[~self.dead[games]]
+            state = self.state_hash(games)
+            hunger = self.moves_without_food[games]
+            seen = ((self.recent_states[games] == state[:, None])
+                    & (np.arange(self.recent_states.shape[1]) < hunger[:, None]))
+            looped = seen.any(axis=1)
+            self.recent_states[games, hunger] = state
+
+            # Skip ahead to where the loop would have starved
+            loops = games[looped]
+            moves = np.minimum(self.life_left[loops], self.rules.max_hunger + 1 - self.moves_without_food[loops])
+            self.life_left[loops] -= moves
+            self.moves_without_food[loops] += moves
+            self.steps[loops] += moves
+            self.dead[loops] = True
+            self.death_cause[loops] = DEATH_CAUSES.index("loop")
+
+    def end_won_games(self, eaters):
+        """End the games that found no free cell for their next food"""
+        won = eaters[self.food[eaters] < 0]
+        self.food[won] = self.head[won]  # The food stays on the head, as in SmartSnake
+        self.dead[won] = True
+        self.death_cause[won] = DEATH_CAUSES.index("win")
+
+    def kernel_move(self, games):
+        """move() with the backend's kernels"""
+        _, move_games, check_loops = self.kernels
+        rules = self.rules
+        ate = np.empty(len(games), dtype=bool)
+        move_games(games, self.board.neighbours, self.direction, self.head, self.head_ptr, self.length, self.body_cells, self.cells, self.links, self.body_hash,
+                   self.board.zobrist_body, self.free_cells, self.free_position, self.num_free,
+                   self.rules.food_cell_mask, self.food, self.score, self.life_left, self.moves_without_food,
+                   self.steps, self.dead, self.death_cause, rules.food_life, rules.max_life, rules.max_hunger, ate)
+        eaters = games[ate]
+        for game in eaters:
+            self.food[game] = self.place_food(game)
+        self.end_won_games(eaters)
+        if self.detect_loops:
+            check_loops(games, self.body_hash, self.board.zobrist_food, self.board.zobrist_direction, self.food,
+                        self.direction, self.recent_states, self.life_left, self.moves_without_food, self.steps,
+                        self.dead, self.death_cause, rules.max_hunger)
+
+    def body(self, game):
+        """Body of one game as a SmartSnake-style list of (x, y), head first"""
+        capacity = self.body_cells.shape[1]
+        ptrs = (self.head_ptr[game] - np.arange(self.length[game])) % capacity
+        return [(int(cell % self.width), int(cell // self.width)) for cell in self.body_cells[game, ptrs]]
+
+    def copy_to_snake(self, game, snake):
+        """Write the state of one game back onto a SmartSnake"""
+        food_y, food_x = divmod(int(self.food[game]), self.width)
+        snake.body = self.body(game)
+        snake.direction = DIRECTIONS[self.direction[game]]
+        snake.food = (food_x, food_y)
+        snake.score = int(self.score[game])
+        snake.life_left = int(self.life_left[game])
+        snake.moves_without_food = int(self.moves_without_food[game])
+        snake.steps = int(self.steps[game])
+        snake.dead = bool(self.dead[game])
+        snake.death_cause = DEATH_CAUSES[self.death_cause[game]] if self.death_cause[game] >= 0 else None
+
+    def calculate_fitness(self):
+        """SmartSnake.calculate_fitness for every game"""
+        fitness = self.score * 1000
+        fitness += (self.rules.start_life - self.life_left) * 10
+        fitness -= self.moves_without_food * 5
+        return np.maximum(1, fitness)
+
+def play_batch(brains, rngs, early_stop=None, detect_loops=False, recorder=None, profiler=None, rules=None,
+               backend="numpy"):
+    """Play one game per PopulationBrain individual to the end, returning the BatchSnakeEnv
+
+    early_stop, if given, is asked every early_stop.interval steps which
+    live games to stop (see snakeai.early_stop). recorder, a
+    snakeai.replay.BatchRecorder, sees every move, and profiler, a
+    snakeai.profiling.Profiler, times the env and brain methods. rules is
+    the snakeai.rules.GameRules the games follow and backend the env's
+    snakeai.kernel backend.
+    """
+    env = BatchSnakeEnv(len(brains), rngs=rngs, detect_loops=detect_loops, rules=rules, backend=backend)
+    if recorder is not None:
+        recorder.start(env)
+    if profiler is None:
+        return run_batch(env, brains, early_stop, recorder)
+    with profiler.instrument(env, SNAKE_PHASES), profiler.instrument(brains, BRAIN_PHASES):
+        return run_batch(env, brains, early_stop, recorder)
+
+def run_batch(env, brains, early_stop=None, recorder=None):
+    """Step the live games of env until they have all ended"""
+    games = env.alive_games()
+    step = 0
+    while len(games) > 0:
+        env.think(games, brains.forward(env.look(games), games))
+        if recorder is not None:
+            recorder.before_move(env, games)
+        env.move()
+        if recorder is not None:
+            recorder.after_move(env, games)
+        games = env.alive_games()
+
+        step += 1
+        if early_stop is not None and len(games) > 0 and step % early_stop.interval == 0:
+            env.stop(games[early_stop(env, games)])
+            games = env.alive_games()
+
+    return env
+
+def evaluate_genomes(genomes, seeds, detect_loops=False, rules=None, backend="numpy"):
+    """Worker entry point: play one game per (genome, food seed) pair
+
+    A seed is anything np.random.default_rng accepts (an int or a
+    SeedSequence). Returns (scores, lifetimes, fitness, life_left,
+    moves_without_food) arrays. Each game only depends on its own genome and
+    seed, so the results do not change with how the population is split
+    across workers.
+    """
+    env = play_batch(PopulationBrain.from_genomes(genomes), [np.random.default_rng(seed) for seed in seeds],
+                     detect_loops=detect_loops, rules=rules, backend=backend)
+    return env.score, env.steps, env.calculate_fitness(), env.life_left, env.moves_without_food
@@ -0,0 +1,178 @@
+"""Timings of the simulator's hot paths, written as JSON
+
+Covers SmartSnake.look/think/move at several body lengths, a single
+network forward, one BatchSnakeEnv step and a whole evolve_one_generation
+at several population sizes. Every entry records the best time per call
+over a few repeats, so two result files can be compared entry by entry:
+
+    python -m snakeai bench --output before.json
+    python -m snakeai bench --compare before.json
+"""
+
+import json
+import platform
+import time
+
+import numpy as np
+
+from .batch import BatchSnakeEnv
+from .brain import ImprovedNeuralNetwork, PopulationBrain
+from .evolution import SimpleEvolution
+from .kernel import resolve_backend
+from .rules import GRID_HEIGHT, GRID_WIDTH
+from .snake import SmartSnake
+
+SNAKE_LENGTHS = (1, 50, 300)
+POPULATION_SIZES = (20, 200, 2000)
+ENGINES = ("sequential", "batched")
+
+def time_calls(function, number, repeat=5, setup=None):
+    """Best seconds per call of function over repeat runs of number calls
+
+    setup, if given, runs untimed before every run.
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        for _ in range(number):
+            function()
+        best = min(best, (time.perf_counter() - start) / number)
+    return best
+
+def serpentine_body(length):
+    """length cells folded row by row from the top left, head first
+
+    The head ends on the last filled row with free rows below it, so a
+    snake pointed down can keep moving for a while.
+    """
+    row_width = GRID_WIDTH - 2
+    path = []
+    for i in range(length):
+        y, x = divmod(i, row_width)
+        x = x if y % 2 == 0 else row_width - 1 - x
+        path.append((x + 1, y + 1))
+    return path[::-1]
+
+def benchmark_snake(length, number=200, repeat=5, rng=None):
+    """SmartSnake.look, think and move with a body of the given length"""
+    snake = SmartSnake(brain=ImprovedNeuralNetwork(rng=rng), rng=rng)
+    body = serpentine_body(length)
+
+    def restore():
+        snake.body = body
+        snake.direction = (0, 1)
+        snake.food = (GRID_WIDTH - 3, GRID_HEIGHT - 3)
+        snake.dead = False
+        snake.life_left = 300
+        snake.moves_without_food = 0
+
+    params = {"length": length}
+    restore()
+    results = [
+        ("SmartSnake.look", params, time_calls(snake.look, number, repeat), number, repeat),
+        ("SmartSnake.think", params, time_calls(snake.think, number, repeat, setup=restore), number, repeat),
+    ]
+    # Moving down from the head stays clear of the body and walls for 10 moves
+    moves = 10
+    results.append(("SmartSnake.move", params, time_calls(snake.move, moves, repeat * number // moves, setup=restore),
+                    moves, repeat * number // moves))
+    return results
+
+def benchmark_forward(number=2000, repeat=5, rng=None):
+    """ImprovedNeuralNetwork.forward on one vision row"""
+    brain = ImprovedNeuralNetwork(rng=rng)
+    x = np.zeros((1, 24))
+    return [("ImprovedNeuralNetwork.forward", {}, time_calls(lambda: brain.forward(x), number, repeat),
+             number, repeat)]
+
+def backend_params(params, backend):
+    # Only name non-default backends, so older result files still compare
+    return params if backend == "numpy" else dict(params, backend=backend)
+
+def benchmark_batch_step(population, steps=10, repeat=5, rng=None, backend="numpy"):
+    """One look/forward/think/move step of a BatchSnakeEnv over the whole population"""
+    brains = PopulationBrain([ImprovedNeuralNetwork(rng=rng) for _ in range(population)])
+    state = {}
+
+    def setup():
+        state["env"] = BatchSnakeEnv(population, rngs=[np.random.default_rng(i) for i in range(population)],
+                                     backend=backend)
+
+    def step():
+        env = state["env"]
+        games = env.alive_games()
+        env.think(games, brains.forward(env.look(games), games))
+        env.move()
+
+    setup()
+    step()  # Compile the kernels of a JIT backend outside the timing
+    return [("BatchSnakeEnv.step", backend_params({"population": population}, backend),
+             time_calls(step, steps, repeat, setup=setup), steps, repeat)]
+
+def benchmark_generation(population, engine, repeat=1, seed=0, backend="numpy"):
+    """One evolve_one_generation from a fresh population"""
+    state = {}
+
+    def setup():
+        state["evolution"] = SimpleEvolution(population_size=population, batched=engine == "batched",
+                                             seed=seed, verbose=False, backend=backend)
+
+    seconds = time_calls(lambda: state["evolution"].evolve_one_generation(), 1, repeat, setup=setup)
+    params = {"population": population, "engine": engine}
+    return [("SimpleEvolution.evolve_one_generation",
+             backend_params(params, backend) if engine == "batched" else params, seconds, 1, repeat)]
+
+def run_benchmarks(lengths=SNAKE_LENGTHS, populations=POPULATION_SIZES, engines=ENGINES, repeat=5,
+                   max_sequential_population=None, progress=None, backend="numpy"):
+    """Run every benchmark, returning the JSON-ready result document"""
+    backend = resolve_backend(backend)  # Label results with the backend that really ran
+    rng = np.random.default_rng(0)
+    results = []
+
+    def record(entries):
+        for name, params, seconds, number, repeats in entries:
+            results.append({"name": name, "params": params, "seconds": seconds,
+                            "number": number, "repeat": repeats})
+            if progress is not None:
+                progress(results[-1])
+
+    for length in lengths:
+        record(benchmark_snake(length, repeat=repeat, rng=rng))
+    record(benchmark_forward(repeat=repeat, rng=rng))
+    for population in populations:
+        record(benchmark_batch_step(population, repeat=repeat, rng=rng, backend=backend))
+    for population in populations:
+        for engine in engines:
+            if engine == "sequential" and max_sequential_population and population > max_sequential_population:
+                continue
+            record(benchmark_generation(population, engine, backend=backend))
+
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "results": results,
+    }
+
+def result_key(entry):
+    return (entry["name"], json.dumps(entry["params"], sort_keys=True))
+
+def compare_results(baseline, current, threshold=0.2):
+    """(name, params, baseline seconds, current seconds, ratio, regressed) for entries in both runs"""
+    previous = {result_key(entry): entry for entry in baseline["results"]}
+    rows = []
+    for entry in current["results"]:
+        before = previous.get(result_key(entry))
+        if before is None:
+            continue
+        ratio = entry["seconds"] / before["seconds"]
+        rows.append((entry["name"], entry["params"], before["seconds"], entry["seconds"], ratio,
+                     ratio > 1 + threshold))
+    return rows
+
+def format_result(entry):
+    params = " ".join(f"{key}={value}" for key, value in entry["params"].items())
+    return f"{entry['name']:40s} {params:32s} {entry['seconds'] * 1e6:14.1f} us"
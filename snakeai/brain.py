@@ -0,0 +1,158 @@
+import numpy as np
+
+def genome_layout(input_size=24, hidden_size=16, output_size=4):
+    """Order and shape of the parameters packed into a flat genome"""
+    return [
+        ("weights1", (input_size, hidden_size)),
+        ("weights2", (hidden_size, hidden_size)),
+        ("weights3", (hidden_size, output_size)),
+        ("bias1", (1, hidden_size)),
+        ("bias2", (1, hidden_size)),
+        ("bias3", (1, output_size)),
+    ]
+
+def random_genomes(count, rng, input_size=24, hidden_size=16, output_size=4, dtype=np.float32):
+    """(count, genome_size) matrix of genomes initialised like ImprovedNeuralNetwork"""
+    layout = genome_layout(input_size, hidden_size, output_size)
+    genomes = np.empty((count, sum(rows * cols for _, (rows, cols) in layout)), dtype=dtype)
+    offset = 0
+    for name, (rows, cols) in layout:
+        block = genomes[:, offset:offset + rows * cols]
+        block[:] = rng.standard_normal(block.shape, dtype=dtype)
+        block *= 0.2 if name.startswith("weights") else 0.1
+        offset += rows * cols
+    return genomes
+
+class ImprovedNeuralNetwork:
+    def __init__(self, input_size=24, hidden_size=16, output_size=4, rng=None):
+        # Initial weights draw from rng (a fresh unseeded Generator by default)
+        if rng is None:
+            rng = np.random.default_rng()
+        self.input_size = input_size
+        self.hidden_size = hidden_size
+        self.output_size = output_size
+
+        # Better weight initialization
+        self.weights1 = rng.standard_normal((input_size, hidden_size)) * 0.2
+        self.weights2 = rng.standard_normal((hidden_size, hidden_size)) * 0.2
+        self.weights3 = rng.standard_normal((hidden_size, output_size)) * 0.2
+
+        # Small biases
+        self.bias1 = rng.standard_normal((1, hidden_size)) * 0.1
+        self.bias2 = rng.standard_normal((1, hidden_size)) * 0.1
+        self.bias3 = rng.standard_normal((1, output_size)) * 0.1
+
+    def relu(self, x):
+        return np.maximum(0, x)
+
+    def softmax(self, x):
+        exp_x = np.exp(x - np.max(x))
+        return exp_x / np.sum(exp_x)
+
+    def forward(self, x):
+        # First hidden layer
+        z1 = np.dot(x, self.weights1) + self.bias1
+        a1 = self.relu(z1)
+
+        # Second hidden layer
+        z2 = np.dot(a1, self.weights2) + self.bias2
+        a2 = self.relu(z2)
+
+        # Output layer
+        z3 = np.dot(a2, self.weights3) + self.bias3
+        output = self.softmax(z3)
+
+        return output
+
+    def mutate(self, mutation_rate=0.1, rng=None):
+        if rng is None:
+            rng = np.random.default_rng()
+
+        # More aggressive mutation for learning
+        if rng.random() < mutation_rate:
+            self.weights1 += rng.standard_normal(self.weights1.shape) * 0.3
+        if rng.random() < mutation_rate:
+            self.weights2 += rng.standard_normal(self.weights2.shape) * 0.3
+        if rng.random() < mutation_rate:
+            self.weights3 += rng.standard_normal(self.weights3.shape) * 0.3
+
+        # Clamp weights
+        self.weights1 = np.clip(self.weights1, -2, 2)
+        self.weights2 = np.clip(self.weights2, -2, 2)
+        self.weights3 = np.clip(self.weights3, -2, 2)
+
+    def get_weights(self):
+        """All weights and biases as one flat vector (see genome_layout)"""
+        layout = genome_layout(self.input_size, self.hidden_size, self.output_size)
+        return np.concatenate([getattr(self, name).ravel() for name, _ in layout])
+
+    def set_weights(self, genome):
+        """Load a flat vector produced by get_weights"""
+        offset = 0
+        for name, shape in genome_layout(self.input_size, self.hidden_size, self.output_size):
+            size = shape[0] * shape[1]
+            setattr(self, name, np.array(genome[offset:offset + size]).reshape(shape))
+            offset += size
+
+    def bind_weights(self, genome):
+        """Use views into a flat genome as the weights, so in-place changes to it show up here"""
+        offset = 0
+        for name, shape in genome_layout(self.input_size, self.hidden_size, self.output_size):
+            size = shape[0] * shape[1]
+            setattr(self, name, genome[offset:offset + size].reshape(shape))
+            offset += size
+
+    def set_heuristic_weights(self):
+        """Initialize with some heuristic knowledge"""
+        # Set initial weights to prefer food-seeking behavior
+        # This gives the AI a starting point
+        self.weights1 *= 0.5  # Reduce randomness
+
+class PopulationBrain:
+    """The brains of a whole population stacked into (N, in, out) tensors
+
+    forward() gives the same outputs as calling ImprovedNeuralNetwork.forward
+    on every individual, but with one batched matmul per layer.
+    """
+
+    def __init__(self, brains):
+        self.weights1 = np.stack([brain.weights1 for brain in brains])
+        self.weights2 = np.stack([brain.weights2 for brain in brains])
+        self.weights3 = np.stack([brain.weights3 for brain in brains])
+
+        self.bias1 = np.stack([brain.bias1 for brain in brains])
+        self.bias2 = np.stack([brain.bias2 for brain in brains])
+        self.bias3 = np.stack([brain.bias3 for brain in brains])
+
+    @classmethod
+    def from_genomes(cls, genomes, input_size=24, hidden_size=16, output_size=4):
+        """Build from a (N, genome_size) matrix of ImprovedNeuralNetwork.get_weights rows"""
+        population = cls.__new__(cls)
+        offset = 0
+        for name, shape in genome_layout(input_size, hidden_size, output_size):
+            size = shape[0] * shape[1]
+            setattr(population, name, genomes[:, offset:offset + size].reshape(len(genomes), *shape))
+            offset += size
+        return population
+
+    def __len__(self):
+        return len(self.weights1)
+
+    def forward(self, x, individuals=None):
+        """Outputs for row i of x from brain individuals[i] (all brains if None)"""
+        if individuals is None:
+            individuals = np.arange(len(self))
+        a0 = x[:, None, :]
+
+        # First hidden layer
+        z1 = np.matmul(a0, self.weights1[individuals]) + self.bias1[individuals]
+        a1 = np.maximum(0, z1)
+
+        # Second hidden layer
+        z2 = np.matmul(a1, self.weights2[individuals]) + self.bias2[individuals]
+        a2 = np.maximum(0, z2)
+
+        # Output layer, softmax per individual
+        z3 = (np.matmul(a2, self.weights3[individuals]) + self.bias3[individuals])[:, 0, :]
+        exp_z = np.exp(z3 - z3.max(axis=1, keepdims=True))
+        return exp_z / exp_z.sum(axis=1, keepdims=True)
@@ -0,0 +1,75 @@
+"""LRU cache of game results keyed by genome and food seed
+
+A game only depends on the weights that play it and the seed of its food
+generator, so replaying an unchanged genome (the elite, or a child that
+mutate() left alone) on the same seed can be answered from memory.
+"""
+
+import hashlib
+import json
+from collections import OrderedDict
+
+import numpy as np
+
+def genome_key(genome):
+    """Digest of a flat genome's exact float values"""
+    return hashlib.blake2b(np.ascontiguousarray(genome, dtype=np.float64).tobytes(), digest_size=16).digest()
+
+def seed_key(seed):
+    """Hashable identity of anything np.random.default_rng accepts as a seed"""
+    if isinstance(seed, np.random.SeedSequence):
+        return (seed.entropy, seed.spawn_key, seed.pool_size)
+    return int(seed)
+
+class FitnessCache:
+    """Results of evaluated (genome, seed) pairs, least recently used evicted first"""
+
+    def __init__(self, max_size=4096):
+        self.max_size = max_size  # 0 disables caching (lookups still count misses)
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def key(self, genome, seed):
+        return (genome_key(genome), seed_key(seed))
+
+    def get(self, key):
+        """The stored result for key, or None"""
+        result = self.entries.get(key)
+        if result is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return result
+
+    def clear(self):
+        """Forget every result, e.g. when the rules the games were played by change"""
+        self.entries.clear()
+
+    def state(self):
+        """Entries, oldest first, and hit counters as a JSON string, for checkpoints"""
+        entries = [[digest.hex(), list(seed) if isinstance(seed, tuple) else seed, list(result)]
+                   for (digest, seed), result in self.entries.items()]
+        return json.dumps({"entries": entries, "hits": self.hits, "misses": self.misses})
+
+    def load_state(self, text):
+        state = json.loads(text)
+        self.entries.clear()
+        for digest, seed, result in state["entries"]:
+            if isinstance(seed, list):
+                seed = (seed[0], tuple(seed[1]), seed[2])
+            self.put((bytes.fromhex(digest), seed), tuple(result))
+        self.hits = state["hits"]
+        self.misses = state["misses"]
+
+    def put(self, key, result):
+        if self.max_size <= 0:
+            return
+        self.entries[key] = result
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
@@ -0,0 +1,106 @@
+"""Save and resume SimpleEvolution runs as a single .npz file
+
+A checkpoint holds everything evolve_one_generation reads: every genome,
+the champion so far, the state of the evolution Generator and how far the
+game SeedSequence has been spawned and the fitness cache with its
+counters, so a resumed run continues bit-for-bit, cache hits and step
+counts included.
+The GameRules of the run are saved too, so a resumed run keeps its board
+size and life budget. A curriculum run also saves its stage and per-stage
+history; resume it with a Curriculum of the same stages.
+"""
+
+import json
+import os
+
+import numpy as np
+
+from .brain import ImprovedNeuralNetwork
+from .rules import DEFAULT_RULES, GameRules
+from .snake import SmartSnake
+
+CHECKPOINT_VERSION = 3
+
+def pack_seed_sequence(seed_sequence):
+    """A SeedSequence, including how many children it has spawned, as a JSON string"""
+    return json.dumps({
+        "entropy": seed_sequence.entropy,
+        "spawn_key": list(seed_sequence.spawn_key),
+        "pool_size": seed_sequence.pool_size,
+        "n_children_spawned": seed_sequence.n_children_spawned,
+    })
+
+def unpack_seed_sequence(text):
+    state = json.loads(text)
+    return np.random.SeedSequence(state["entropy"], spawn_key=state["spawn_key"],
+                                  pool_size=state["pool_size"], n_children_spawned=state["n_children_spawned"])
+
+def save_checkpoint(evolution, path):
+    """Write the state of a SimpleEvolution to path, atomically"""
+    arrays = {
+        "checkpoint_version": np.array(CHECKPOINT_VERSION),
+        "generation": np.array(evolution.generation),
+        "best_score": np.array(evolution.best_score),
+        "total_steps": np.array(evolution.total_steps),
+        "rules": np.array(json.dumps(evolution.rules.options())),
+        "genomes": evolution.genomes,
+        # Generator states hold 128-bit integers, so they are stored as JSON text
+        "rng_state": np.array(json.dumps(evolution.rng.bit_generator.state)),
+        "seed_sequence": np.array(pack_seed_sequence(evolution.seed_sequence)),
+        "game_seed_sequence": np.array(pack_seed_sequence(evolution.game_seed_sequence)),
+        "fitness_cache": np.array(evolution.fitness_cache.state()),
+    }
+
+    if evolution.curriculum is not None:
+        arrays["curriculum"] = np.array(evolution.curriculum.state())
+    if evolution.best_snake is not None:
+        arrays["best_genome"] = evolution.best_snake.brain.get_weights()
+        arrays["best_snake_score"] = np.array(evolution.best_snake.score)
+
+    # Write next to the target and swap it in, so a killed process never
+    # leaves a truncated checkpoint behind
+    temp_path = str(path) + ".tmp"
+    with open(temp_path, "wb") as f:
+        np.savez(f, **arrays)
+    os.replace(temp_path, path)
+
+def load_checkpoint(evolution, path):
+    """Restore a SimpleEvolution from a file written by save_checkpoint"""
+    with np.load(path) as data:
+        if int(data["checkpoint_version"]) != CHECKPOINT_VERSION:
+            raise ValueError(f"Unsupported checkpoint version {int(data['checkpoint_version'])}")
+
+        # The run continues by the rules it was saved with (a curriculum run at its
+        # stage), so the population is built with them. Rules passed to the resumed
+        # evolution, or the curriculum's stage, must agree.
+        rules = GameRules(**json.loads(str(data["rules"])))
+        if evolution.curriculum is not None and "curriculum" in data:
+            evolution.curriculum.load_state(str(data["curriculum"]))
+        requested = evolution.curriculum.rules if evolution.curriculum is not None else evolution.rules
+        if requested != rules and requested is not DEFAULT_RULES:
+            raise ValueError(f"{path} was saved playing by {rules!r}, not {requested!r}")
+        evolution.rules = requested if requested == rules else rules
+        evolution.set_genomes(data["genomes"])
+        evolution.generation = int(data["generation"])
+        evolution.best_score = int(data["best_score"])
+        evolution.total_steps = int(data["total_steps"])
+
+        evolution.best_snake = None
+        if "best_genome" in data:
+            brain = ImprovedNeuralNetwork()
+            brain.set_weights(data["best_genome"])
+            evolution.best_snake = SmartSnake(brain=brain, rules=evolution.rules)
+            evolution.best_snake.score = int(data["best_snake_score"])
+
+        evolution.seed_sequence = unpack_seed_sequence(str(data["seed_sequence"]))
+        evolution.game_seed_sequence = unpack_seed_sequence(str(data["game_seed_sequence"]))
+        evolution.rng.bit_generator.state = json.loads(str(data["rng_state"]))
+        evolution.fitness_cache.load_state(str(data["fitness_cache"]))
+
+def load_best_brain(path):
+    """The champion's brain from a checkpoint (the elite of the last generation if none yet)"""
+    with np.load(path) as data:
+        genome = data["best_genome"] if "best_genome" in data else data["genomes"][0]
+        brain = ImprovedNeuralNetwork()
+        brain.set_weights(genome)
+        return brain
@@ -0,0 +1,284 @@
+"""Command line entry point: python -m snakeai train|export|processing|bench|replay|watch"""
+
+import argparse
+import json
+import os
+import sys
+
+import numpy as np
+
+from .benchmark import (ENGINES, POPULATION_SIZES, SNAKE_LENGTHS, compare_results, format_result,
+                        run_benchmarks)
+from .checkpoint import load_best_brain
+from .curriculum import Curriculum, format_history
+from .early_stop import ReachableFitness, StagedEvaluation
+from .evolution import SimpleEvolution
+from .kernel import BACKENDS
+from .processing import (ProcessingNeuralNetwork, ProcessingSnake, load_processing_model,
+                         save_processing_model)
+from .profiling import Profiler, format_report
+from .replay import EpisodePlayer, read_episodes, render_frame
+from .rules import GameRules
+
+# The uncompiled "python" kernels are only meant for tests
+BACKEND_CHOICES = [backend for backend in BACKENDS if backend != "python"] + ["auto"]
+
+def board_rules(text):
+    """argparse type: GameRules for a WIDTHxHEIGHT board such as 20x20, with the default life budget"""
+    try:
+        width, height = (int(size) for size in text.lower().split("x"))
+        return GameRules(width=width, height=height)
+    except ValueError as error:
+        raise argparse.ArgumentTypeError(f"invalid board {text!r}: expected WIDTHxHEIGHT ({error})")
+
+def train(args):
+    """Run SimpleEvolution headless, streaming one stats line per generation"""
+    early_stop = None
+    if args.early_stop == "reachable":
+        early_stop = ReachableFitness()
+    elif args.early_stop == "staged":
+        early_stop = StagedEvaluation(horizon=args.horizon, keep=args.keep)
+
+    curriculum = None
+    if args.curriculum:
+        if args.rules is not None:
+            raise SystemExit("--board and --curriculum both choose the board; pass one of them")
+        curriculum = Curriculum()
+
+    profiler = None
+    if args.profile or args.profile_generation:
+        profiler = Profiler(dump_generations=args.profile_generation or (), prefix=args.profile_prefix)
+
+    options = dict(population_size=args.population, batched=args.engine == "batched", workers=args.workers,
+                   seed=args.seed, verbose=False, checkpoint_path=args.checkpoint,
+                   checkpoint_every=args.checkpoint_every, shared_seed=args.shared_seed,
+                   cache_size=args.cache_size, early_stop=early_stop, verify_early_stop=args.verify_early_stop,
+                   detect_loops=args.detect_loops, record_path=args.record, profiler=profiler,
+                   backend=args.backend, rules=args.rules, curriculum=curriculum)
+    if args.resume and args.checkpoint and os.path.exists(args.checkpoint):
+        evolution = SimpleEvolution.resume(args.checkpoint, **options)
+        print(f"Resumed from {args.checkpoint} at generation {evolution.generation}", file=sys.stderr)
+    else:
+        evolution = SimpleEvolution(**options)
+    jsonl = None
+    if args.jsonl == "-":
+        jsonl = sys.stdout
+    elif args.jsonl:
+        jsonl = open(args.jsonl, "a")
+
+    try:
+        while evolution.generation < args.generations:
+            evolution.evolve_one_generation()
+            stats = evolution.stats
+            if jsonl is not None:
+                jsonl.write(json.dumps(stats) + "\n")
+                jsonl.flush()
+            if jsonl is not sys.stdout:
+                print(f"gen {stats['generation']:4d}  best score {stats['best_score']:4d}  "
+                      f"best fitness {stats['best_fitness']:8.1f}  avg fitness {stats['average_fitness']:9.1f}  "
+                      f"{stats['seconds']:.2f}s" + stopped_summary(stats) + stage_summary(stats), flush=True)
+                if "profile" in stats:
+                    print(format_report(stats["profile"]), flush=True)
+        if curriculum is not None:
+            print("Curriculum stages:\n" + format_history(curriculum.history),
+                  file=sys.stderr if jsonl is sys.stdout else sys.stdout)
+    finally:
+        evolution.close()
+        if jsonl is not None and jsonl is not sys.stdout:
+            jsonl.close()
+
+def stage_summary(stats):
+    """Curriculum part of the per-generation progress line"""
+    if "stage" not in stats:
+        return ""
+    return f"  stage {stats['stage']} ({stats['board']}, median score {stats['median_score']:.1f})"
+
+def stopped_summary(stats):
+    """Early stopping part of the per-generation progress line"""
+    if "stopped_games" not in stats:
+        return ""
+    summary = f"  stopped {stats['stopped_games']}"
+    if stats["steps_saved"] is not None:
+        summary += f" ({stats['steps_saved']} steps saved)"
+    unchanged = {True: "same", False: "changed", None: "unverified"}[stats["parents_unchanged"]]
+    return summary + f"  parents {unchanged}"
+
+def export(args):
+    """Write the best brain of a checkpoint as a Processing model CSV"""
+    network = ProcessingNeuralNetwork.from_brain(load_best_brain(args.checkpoint))
+    save_processing_model(args.output, network)
+    print(f"Wrote {args.output}")
+
+def play_processing(args):
+    """Benchmark a Processing model CSV under the sketch's game rules"""
+    network, evolution = load_processing_model(args.model)
+    scores = []
+    for seed in np.random.SeedSequence(args.seed).spawn(args.games):
+        snake = ProcessingSnake(network, rng=np.random.default_rng(seed))
+        while not snake.dead:
+            snake.think()
+            snake.move()
+        scores.append(snake.score)
+
+    if evolution:
+        print(f"Trained for {len(evolution)} generations, best recorded score {max(evolution)}")
+    print(f"{args.games} games: mean score {np.mean(scores):.1f}, best {max(scores)}")
+
+def bench(args):
+    """Time the simulator's hot paths, optionally saving and comparing JSON results"""
+    document = run_benchmarks(
+        lengths=args.lengths, populations=args.populations, engines=args.engines, repeat=args.repeat,
+        max_sequential_population=args.max_sequential_population, backend=args.backend,
+        progress=lambda entry: print(format_result(entry), flush=True))
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(document, f, indent=2)
+        print(f"Wrote {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = 0
+        print(f"\nCompared with {args.compare} (slower than {1 + args.threshold:.2f}x is a regression)")
+        for name, params, before, after, ratio, regressed in compare_results(baseline, document, args.threshold):
+            params = " ".join(f"{key}={value}" for key, value in params.items())
+            flag = "  REGRESSION" if regressed else ""
+            print(f"{name:40s} {params:32s} {before * 1e6:12.1f} -> {after * 1e6:12.1f} us  {ratio:5.2f}x{flag}")
+            regressions += regressed
+        if regressions:
+            sys.exit(1)
+
+def load_episode(path, index):
+    for i, episode in enumerate(read_episodes(path)):
+        if i == index:
+            return episode
+    raise SystemExit(f"{path} has no episode {index}")
+
+def replay(args):
+    """List the episodes of a replay log, or print one frame of an episode"""
+    if args.episode is None:
+        for i, episode in enumerate(read_episodes(args.log)):
+            cause = episode.death_cause or "stopped"
+            board = f"{episode.rules.width}x{episode.rules.height}"
+            print(f"{i:6d}  {board:>7s}  score {episode.score:4d}  moves {len(episode):6d}  {cause}")
+        return
+
+    player = EpisodePlayer(load_episode(args.log, args.episode))
+    frame = args.frame if args.frame is not None else -1
+    frame = frame + len(player) if frame < 0 else frame
+    snake = player.frame(frame)
+    print(render_frame(snake))
+    print(f"move {frame}/{len(player) - 1}  score {snake.score}  life {snake.life_left}")
+
+def watch(args):
+    """Open the pygame window (the only mode that needs a display)"""
+    from .ui import ImprovedSnakeGame
+
+    episode = load_episode(args.replay, args.episode) if args.replay else None
+    game = ImprovedSnakeGame(human_controlled=args.mode == "human", use_evolution=args.mode == "evolution",
+                             episode=episode, population_size=args.population, rules=args.rules)
+    game.run()
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m snakeai", description="Snake AI training and viewer")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    train_parser = commands.add_parser("train", help="evolve a population without a display")
+    train_parser.add_argument("--generations", type=int, default=10,
+                              help="train until this many generations have run (counting resumed ones)")
+    train_parser.add_argument("--population", type=int, default=20)
+    train_parser.add_argument("--seed", type=int, default=None)
+    train_parser.add_argument("--engine", choices=["batched", "sequential"], default="batched",
+                              help="step all games at once (default) or one SmartSnake at a time")
+    train_parser.add_argument("--backend", choices=BACKEND_CHOICES, default="numpy",
+                              help="how the batched and parallel engines step games: numpy arrays (default), "
+                                   "Numba-compiled kernels, or auto (numba if installed)")
+    train_parser.add_argument("--board", type=board_rules, default=None, dest="rules", metavar="WxH",
+                              help="play on a WIDTHxHEIGHT board instead of 40x30, e.g. 20x20")
+    train_parser.add_argument("--curriculum", action="store_true",
+                              help="start on a 10x10 board with a short life and grow board and life up to "
+                                   "the full game as the median score passes each stage's threshold "
+                                   "(after at least 30 generations per stage)")
+    train_parser.add_argument("--workers", type=int, default=None,
+                              help="evaluate fitness on a pool of this many processes")
+    train_parser.add_argument("--shared-seed", action="store_true",
+                              help="play every game on the same food seed, so unchanged genomes hit the fitness cache")
+    train_parser.add_argument("--cache-size", type=int, default=4096,
+                              help="remember this many (genome, seed) results (0 disables the cache)")
+    train_parser.add_argument("--early-stop", choices=["reachable", "staged"], default=None,
+                              help="cut hopeless games short (batched engine): 'reachable' never changes the "
+                                   "selected parents, 'staged' keeps only the best --keep after --horizon moves")
+    train_parser.add_argument("--horizon", type=int, default=200, help="moves before the staged cut")
+    train_parser.add_argument("--keep", type=float, default=0.5, help="fraction of games the staged cut keeps")
+    train_parser.add_argument("--verify-early-stop", action="store_true",
+                              help="replay stopped games to report steps saved and whether the parents changed")
+    train_parser.add_argument("--detect-loops", action="store_true",
+                              help="end games that repeat an exact state without eating (same fitness, fewer moves)")
+    train_parser.add_argument("--record", metavar="PATH",
+                              help="append every played game to this replay log (batched or sequential engine)")
+    train_parser.add_argument("--profile", action="store_true",
+                              help="time look/think/forward/move/place_food and the generation phases, "
+                                   "reported every generation (and in --jsonl)")
+    train_parser.add_argument("--profile-generation", type=int, action="append", metavar="N",
+                              help="also run generation N under cProfile, writing PREFIX-genN.pstats and a "
+                                   "flame graph PREFIX-genN.folded (repeatable; implies --profile)")
+    train_parser.add_argument("--profile-prefix", default="profile", metavar="PREFIX")
+    train_parser.add_argument("--jsonl", metavar="PATH",
+                              help="append per-generation stats as JSON lines ('-' for stdout)")
+    train_parser.add_argument("--checkpoint", metavar="PATH", help="save the run to this .npz file")
+    train_parser.add_argument("--checkpoint-every", type=int, default=1, metavar="K",
+                              help="checkpoint every K generations (default 1)")
+    train_parser.add_argument("--resume", action="store_true",
+                              help="continue from --checkpoint if it exists")
+    train_parser.set_defaults(func=train)
+
+    export_parser = commands.add_parser("export", help="save a checkpoint's best brain as a Processing model CSV")
+    export_parser.add_argument("checkpoint", help=".npz file written by train --checkpoint")
+    export_parser.add_argument("output", help="CSV to write, loadable with the sketch's Load button")
+    export_parser.set_defaults(func=export)
+
+    processing_parser = commands.add_parser("processing", help="play a Processing model CSV (e.g. gen64.csv)")
+    processing_parser.add_argument("model")
+    processing_parser.add_argument("--games", type=int, default=100)
+    processing_parser.add_argument("--seed", type=int, default=None)
+    processing_parser.set_defaults(func=play_processing)
+
+    bench_parser = commands.add_parser("bench", help="benchmark look/think/move, forward and whole generations")
+    bench_parser.add_argument("--lengths", type=int, nargs="+", default=list(SNAKE_LENGTHS),
+                              help="snake body lengths for the SmartSnake benchmarks")
+    bench_parser.add_argument("--populations", type=int, nargs="+", default=list(POPULATION_SIZES))
+    bench_parser.add_argument("--engines", nargs="+", choices=ENGINES, default=list(ENGINES))
+    bench_parser.add_argument("--backend", choices=BACKEND_CHOICES, default="numpy",
+                              help="BatchSnakeEnv backend of the batch step and batched generation benchmarks")
+    bench_parser.add_argument("--max-sequential-population", type=int, default=None, metavar="N",
+                              help="skip sequential generations above this population (they are slow)")
+    bench_parser.add_argument("--repeat", type=int, default=5, help="keep the best of this many runs")
+    bench_parser.add_argument("--output", metavar="PATH", help="write the results as JSON")
+    bench_parser.add_argument("--compare", metavar="PATH",
+                              help="compare with an earlier --output file; exit 1 on a regression")
+    bench_parser.add_argument("--threshold", type=float, default=0.2,
+                              help="relative slowdown counted as a regression (default 0.2)")
+    bench_parser.set_defaults(func=bench)
+
+    replay_parser = commands.add_parser("replay", help="list or print games recorded with train --record")
+    replay_parser.add_argument("log")
+    replay_parser.add_argument("--episode", type=int, default=None, help="print this episode instead of listing")
+    replay_parser.add_argument("--frame", type=int, default=None, help="move to print (default: the last)")
+    replay_parser.set_defaults(func=replay)
+
+    watch_parser = commands.add_parser("watch", help="open the pygame window")
+    watch_parser.add_argument("mode", nargs="?", choices=["ai", "human", "evolution"], default="ai")
+    watch_parser.add_argument("--replay", metavar="PATH", help="play back a replay log instead")
+    watch_parser.add_argument("--episode", type=int, default=0, help="episode of --replay to play")
+    watch_parser.add_argument("--population", type=int, default=20,
+                              help="population size in evolution mode (G shows up to 400 of its games at once)")
+    watch_parser.add_argument("--board", type=board_rules, default=None, dest="rules", metavar="WxH",
+                              help="play on a WIDTHxHEIGHT board instead of 40x30 (a replay uses its own)")
+    watch_parser.set_defaults(func=watch)
+
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    args.func(args)
@@ -0,0 +1,101 @@
+"""Curriculum over board size and life budget for SimpleEvolution
+
+Early generations hardly find food, and on the full 40x30 board with 300
+moves of life they spend nearly all their moves wandering an empty board. A
+Curriculum starts the population on a small board with a short life budget
+and moves it to the next, larger stage once it has played there for at
+least min_generations and the median score of a generation reaches the
+stage's threshold. Genomes carry over unchanged: the
+network sees inverse distances along its rays, which mean the same thing on
+any board.
+
+SimpleEvolution(curriculum=...) plays every generation by the current
+stage's rules and adds the stage to its stats. Curriculum.history sums up
+each stage played so far: its generations, simulated steps, best score and
+last median score.
+"""
+
+import json
+
+import numpy as np
+
+from .rules import DEFAULT_RULES, GameRules
+
+# (rules, median score that moves on to the next stage), smallest board first;
+# the last stage is the full game and has no threshold. A fresh population
+# already scores a median of about 19/26/34 on these boards through
+# SmartSnake's heuristic fallback; evolution first drops it to a few points as
+# the networks take over, then recovers in some 40-70 generations. The
+# thresholds sit at three quarters of that baseline and DEFAULT_MIN_GENERATIONS
+# lies past the drop, so each stage ends once the evolved networks play it well.
+DEFAULT_STAGES = [
+    (GameRules(width=10, height=10, start_life=100, food_life=60, max_life=200, max_hunger=60,
+               food_margin=1, food_distance=2), 14),
+    (GameRules(width=20, height=15, start_life=150, food_life=100, max_life=400, max_hunger=80,
+               food_margin=1, food_distance=3), 20),
+    (GameRules(width=30, height=22, start_life=200, food_life=120, max_life=600, max_hunger=90,
+               food_margin=2, food_distance=4), 25),
+    (DEFAULT_RULES, None),
+]
+DEFAULT_MIN_GENERATIONS = 30
+
+class Curriculum:
+    """Stages of GameRules a population trains through, moving on when its median score is high enough"""
+
+    def __init__(self, stages=None, min_generations=DEFAULT_MIN_GENERATIONS):
+        self.stages = list(stages if stages is not None else DEFAULT_STAGES)
+        self.min_generations = min_generations  # Generations played at a stage before it can end
+        if not self.stages:
+            raise ValueError("A curriculum needs at least one stage")
+        if any(threshold is None for _, threshold in self.stages[:-1]):
+            raise ValueError("Every stage but the last needs a threshold")
+        self.stage = 0
+        self.history = []  # One summary per stage reached, see record()
+
+    @property
+    def rules(self):
+        """GameRules of the current stage"""
+        return self.stages[self.stage][0]
+
+    @property
+    def threshold(self):
+        """Median score that ends the current stage, None on the last stage"""
+        return self.stages[self.stage][1] if self.stage < len(self.stages) - 1 else None
+
+    def record(self, generation, scores, steps):
+        """Account one generation played at the current stage; True if it moved on to the next stage"""
+        if not self.history or self.history[-1]["stage"] != self.stage:
+            rules = self.rules
+            self.history.append({"stage": self.stage, "board": f"{rules.width}x{rules.height}",
+                                 "start_life": rules.start_life, "first_generation": generation,
+                                 "generations": 0, "steps": 0, "best_score": 0, "median_score": 0.0})
+        summary = self.history[-1]
+        median = float(np.median(scores))
+        summary["generations"] += 1
+        summary["steps"] += int(steps)
+        summary["best_score"] = max(summary["best_score"], int(np.max(scores)))
+        summary["median_score"] = median
+
+        threshold = self.threshold
+        if threshold is not None and summary["generations"] >= self.min_generations and median >= threshold:
+            self.stage += 1
+            return True
+        return False
+
+    def state(self):
+        """Stage and history as a JSON string, for checkpoints"""
+        return json.dumps({"stage": self.stage, "history": self.history})
+
+    def load_state(self, text):
+        state = json.loads(text)
+        if state["stage"] >= len(self.stages):
+            raise ValueError(f"Checkpoint is at stage {state['stage']} of a longer curriculum")
+        self.stage = state["stage"]
+        self.history = state["history"]
+
+def format_history(history):
+    """One line per stage: board, life, generations, steps, best and last median score"""
+    return "\n".join(f"  stage {entry['stage']}  {entry['board']:>7s}  life {entry['start_life']:4d}  "
+                     f"gens {entry['first_generation']:4d}+{entry['generations']:<4d}  steps {entry['steps']:10d}  "
+                     f"best {entry['best_score']:4d}  median {entry['median_score']:6.1f}"
+                     for entry in history)
@@ -0,0 +1,141 @@
+"""Stopping hopeless games early during batched evaluation
+
+A policy is called by play_batch every `interval` steps with the
+BatchSnakeEnv and its live games, and returns a mask of the games to stop.
+Before each generation SimpleEvolution calls start() with the tournaments
+it has already drawn, so a policy knows what a game has to beat to be
+selected.
+
+ReachableFitness only stops a game once calculate_fitness's formula proves
+it can neither win any of its tournaments nor be the elite, so the selected
+parents are exactly those of a full evaluation. StagedEvaluation is a
+heuristic: after a short horizon only the most promising fraction of the
+games keeps playing.
+"""
+
+import numpy as np
+
+def fitness_bounds(env, games):
+    """Lower and upper bounds of the final calculate_fitness of live games
+
+    life_left never exceeds the larger of the env rules' start_life and
+    max_life, and a game ends once moves_without_food passes max_hunger,
+    which bounds the fitness from below. A game that cannot reach its food
+    before starving keeps its score and gains 5 per move it still survives;
+    one that can reach it is unbounded.
+    """
+    score = env.score[games]
+    life_left = env.life_left[games]
+    hunger = env.moves_without_food[games]
+    rules = env.rules
+
+    most_life = max(rules.start_life, rules.max_life)
+    lower = np.maximum(1, score * 1000 + (rules.start_life - most_life) * 10 - (rules.max_hunger + 1) * 5)
+
+    head_y, head_x = np.divmod(env.head[games], env.width)
+    food_y, food_x = np.divmod(env.food[games], env.width)
+    distance = np.abs(head_x - food_x) + np.abs(head_y - food_y)
+    moves_left = np.minimum(life_left, rules.max_hunger + 1 - hunger)
+    starving = np.maximum(1, score * 1000 + (rules.start_life - life_left) * 10 - hunger * 5 + moves_left * 5)
+    upper = np.where(distance > moves_left, starving, np.inf)
+    return lower, upper
+
+class ReachableFitness:
+    """Stop games whose best reachable fitness is below every cutoff they face
+
+    A game's cutoff is the smallest, over the tournaments it was drawn into,
+    of the best lower bound among that tournament's entrants (or the best
+    lower bound overall for the elite). A stopped game keeps the fitness of
+    the moment it stopped, which is still below every such cutoff.
+    """
+
+    interval = 10
+
+    def start(self, tournaments, slots, known_fitness):
+        """Prepare for one generation
+
+        tournaments holds population indices, slots maps each game of the
+        coming BatchSnakeEnv to its population index, and known_fitness has
+        the exact fitness of population members that are not played.
+        """
+        self.tournaments = tournaments
+        self.slots = np.asarray(slots)
+        self.known_fitness = np.asarray(known_fitness, dtype=np.float64)
+        self.upper = np.full(len(self.slots), np.inf)  # Bound of each game at the moment it stopped
+
+    def population_bounds(self, env, games):
+        """(lower, upper) bounds of every population member's final fitness"""
+        lower = self.known_fitness.copy()
+        upper = self.known_fitness.copy()
+
+        # Finished games are exact; stopped ones ended below their bound
+        fitness = env.calculate_fitness()
+        lower[self.slots] = fitness
+        upper[self.slots] = np.where(env.stopped, self.upper, fitness)
+
+        live_lower, live_upper = fitness_bounds(env, games)
+        lower[self.slots[games]] = live_lower
+        upper[self.slots[games]] = live_upper
+        return lower, upper
+
+    def __call__(self, env, games):
+        lower, upper = self.population_bounds(env, games)
+
+        entrants = lower[self.tournaments]
+        cutoff = np.full(len(lower), lower.max())
+        np.minimum.at(cutoff, self.tournaments.ravel(), np.repeat(entrants.max(axis=1), self.tournaments.shape[1]))
+
+        stop = upper[self.slots[games]] < cutoff[self.slots[games]]
+        self.upper[games[stop]] = upper[self.slots[games[stop]]]
+        return stop
+
+    def stopped_upper_bounds(self):
+        """Best fitness each game could still have reached when it stopped (inf if it was not stopped)"""
+        return self.upper
+
+class StagedEvaluation:
+    """After horizon moves, keep playing only the best keep fraction of the games
+
+    Games are ranked by the fitness they would have if they ended at the
+    horizon, and exactly the top keep fraction survives. Unlike
+    ReachableFitness this can change which parents are selected, so tune
+    horizon and keep with SimpleEvolution(verify_early_stop=True).
+    """
+
+    def __init__(self, horizon=200, keep=0.5):
+        self.interval = horizon
+        self.keep = keep
+
+    def start(self, tournaments, slots, known_fitness):
+        self.slots = np.asarray(slots)
+        self.done = False
+
+    def __call__(self, env, games):
+        stop = np.zeros(len(games), dtype=bool)
+        if self.done:
+            return stop
+        self.done = True
+
+        # Rank everyone, finished games included; ties go to the earlier game
+        ranking = np.argsort(-env.calculate_fitness(), kind="stable")
+        keep = max(1, int(np.ceil(self.keep * env.num_games)))
+        stop[np.isin(games, ranking[keep:])] = True
+        return stop
+
+    def stopped_upper_bounds(self):
+        return np.full(len(self.slots), np.inf)
+
+def selection_is_certain(fitness, stopped, upper, tournaments, best_index):
+    """Whether no stopped game could have changed the elite or a tournament winner
+
+    fitness is what selection used, stopped marks the games that were cut
+    short and upper holds the best fitness each of those could have reached.
+    """
+    if not stopped.any():
+        return True
+    if stopped[best_index] or fitness[best_index] <= upper[stopped].max():
+        return False
+
+    winners = tournaments[np.arange(len(tournaments)), np.argmax(fitness[tournaments], axis=1)]
+    beaten = ~stopped[tournaments] | (fitness[winners][:, None] > upper[tournaments])
+    return bool(beaten.all() and not stopped[winners].any())
@@ -0,0 +1,433 @@
+import multiprocessing
+import time
+from contextlib import nullcontext
+
+import numpy as np
+
+from .batch import evaluate_genomes, play_batch
+from .brain import ImprovedNeuralNetwork, PopulationBrain, genome_layout, random_genomes
+from .cache import FitnessCache
+from .early_stop import selection_is_certain
+from .checkpoint import load_checkpoint, save_checkpoint
+from .profiling import BRAIN_PHASES, SNAKE_PHASES
+from .replay import BatchRecorder, EpisodeRecorder, write_episodes
+from .rules import DEFAULT_RULES
+from .snake import SmartSnake
+
+class SimpleEvolution:
+    def __init__(self, population_size=50, batched=False, workers=None, seed=None, verbose=True,
+                 checkpoint_path=None, checkpoint_every=1, shared_seed=False, cache_size=4096,
+                 early_stop=None, verify_early_stop=False, detect_loops=False, record_path=None, profiler=None,
+                 backend="numpy", rules=None, curriculum=None):
+        self.population_size = population_size
+        self.verbose = verbose  # Print progress while evolving
+        self.checkpoint_path = checkpoint_path  # Save a checkpoint here every checkpoint_every generations
+        self.checkpoint_every = checkpoint_every
+        self.batched = batched  # Step the whole population at once with BatchSnakeEnv
+        self.workers = workers  # Spread evaluation over a process pool of this size
+        self.pool = None
+        self.shared_seed = shared_seed  # Every game of every generation gets the same food seed (enables the cache)
+        self.fitness_cache = FitnessCache(cache_size)  # Results of already played (genome, seed) pairs
+        self.early_stop = early_stop  # Policy from snakeai.early_stop that cuts hopeless batched games short
+        self.verify_early_stop = verify_early_stop  # Replay stopped games in full to check the selection
+        self.detect_loops = detect_loops  # End looping games at once (same fitness, fewer moves)
+        self.record_path = record_path  # Append every played game to this snakeai.replay log
+        self.profiler = profiler  # snakeai.profiling.Profiler timing each phase, or None
+        self.backend = backend  # snakeai.kernel backend of the batched and parallel engines
+        self.rules = rules if rules is not None else DEFAULT_RULES  # Board size and life budget of every game
+        self.curriculum = curriculum  # snakeai.curriculum.Curriculum choosing the rules as scores grow, or None
+        if curriculum is not None:
+            if rules is not None:
+                raise ValueError("Pass either rules or a curriculum")
+            self.rules = curriculum.rules
+        if early_stop is not None and (workers or not batched):
+            raise ValueError("Early stopping needs the batched engine without workers")
+        if record_path is not None and workers:
+            raise ValueError("Recording games needs the batched or sequential engine")
+
+        # Every random draw of the run derives from one master SeedSequence:
+        # rng drives selection, crossover and mutation, and each game gets its
+        # own child of game_seed_sequence, so a game's outcome only depends on
+        # its weights and seed
+        self.seed_sequence = np.random.SeedSequence(seed)
+        evolution_seed, self.game_seed_sequence = self.seed_sequence.spawn(2)
+        self.rng = np.random.default_rng(evolution_seed)
+        self.generation = 0
+        self.best_snake = None
+        self.best_seed = None  # Food seed of best_snake's game, to watch it again
+        self.best_score = 0
+        self.total_steps = 0  # Moves simulated over the whole run, cached games not counted
+        self.stats = None  # Summary of the last evolved generation
+
+        # Column ranges of the three weight layers in a genome; the biases follow them
+        self.layer_columns = []
+        offset = 0
+        for name, (rows, cols) in genome_layout():
+            if name.startswith("weights"):
+                self.layer_columns.append(slice(offset, offset + rows * cols))
+            offset += rows * cols
+        self.weight_size = self.layer_columns[-1].stop
+
+        # Create initial population, with the heuristic weights1 scaling
+        genomes = random_genomes(population_size, self.rng)
+        genomes[:, self.layer_columns[0]] *= 0.5
+        self.set_genomes(genomes)
+
+    def set_genomes(self, genomes):
+        """Make the rows of a (N, genome_size) matrix the population
+
+        Genomes live as float32 rows of one contiguous matrix, and every
+        snake's brain is a view of its row. The next generation is bred into
+        a preallocated second matrix and the two are swapped, so no snake or
+        network is built per child.
+        """
+        self.genomes = np.array(genomes, dtype=np.float32)
+        self.population_size = len(self.genomes)
+        self.next_genomes = np.empty_like(self.genomes)
+        self.parent_genomes = np.empty_like(self.genomes[1:])
+        self.crossover_draws = np.empty((self.population_size - 1, self.weight_size), dtype=np.float32)
+        self.crossover_mask = np.empty(self.crossover_draws.shape, dtype=bool)
+        self.bias_draws = np.empty((self.population_size - 1, self.genomes.shape[1] - self.weight_size),
+                                   dtype=np.float32)
+
+        self.population = [SmartSnake(brain=ImprovedNeuralNetwork(), rules=self.rules)
+                           for _ in range(self.population_size)]
+        self.bind_population()
+
+    def set_rules(self, rules):
+        """Play the following generations by rules; cached results of the old rules are dropped"""
+        self.rules = rules
+        self.population = [SmartSnake(brain=snake.brain, rules=rules) for snake in self.population]
+        self.fitness_cache.clear()
+
+    def bind_population(self):
+        for snake, genome in zip(self.population, self.genomes):
+            snake.brain.bind_weights(genome)
+
+    def evolve_one_generation(self):
+        """Evolve one generation without graphics"""
+        self.log(f"\n=== Generation {self.generation} ===")
+        start_time = time.perf_counter()
+        if self.profiler is not None:
+            self.profiler.begin_generation(self.generation)
+
+        # Tournaments are drawn before any game is played, so early stopping
+        # knows what each game has to beat
+        with self.phase("select"):
+            tournaments = self.draw_tournaments(2 * (self.population_size - 1))
+
+        # Run all snakes, skipping (genome, seed) pairs that were played before.
+        # Without a shared seed every game gets a fresh seed and can never hit,
+        # so the genomes are not even hashed.
+        hits = self.fitness_cache.hits
+        all_seeds = self.game_seeds()
+        slots, keys = [], []
+        if self.shared_seed:
+            with self.phase("cache"):
+                for slot, (snake, genome, seed) in enumerate(zip(self.population, self.genomes, all_seeds)):
+                    key = self.fitness_cache.key(genome, seed)
+                    result = self.fitness_cache.get(key)
+                    if result is None:
+                        slots.append(slot)
+                        keys.append(key)
+                    else:
+                        snake.score, snake.fitness, snake.life_left, snake.moves_without_food = result
+                        snake.dead = True
+        else:
+            slots = list(range(self.population_size))
+
+        snakes = [self.population[slot] for slot in slots]
+        seeds = [all_seeds[slot] for slot in slots]
+        stopped = np.zeros(self.population_size, dtype=bool)
+        upper = np.full(self.population_size, np.inf)  # Best fitness a stopped game could have reached
+        played_steps = np.zeros(self.population_size, dtype=np.int64)
+        with self.phase("play"):
+            if snakes and self.workers:
+                played_steps[slots] = self.run_parallel(snakes, seeds)
+            elif snakes and self.batched:
+                if self.early_stop is not None:
+                    self.early_stop.start(tournaments, slots, [snake.fitness for snake in self.population])
+                env = self.run_batched(snakes, seeds, early_stop=self.early_stop)
+                stopped[slots] = env.stopped
+                played_steps[slots] = env.steps
+                if self.early_stop is not None:
+                    upper[slots] = np.where(env.stopped, self.early_stop.stopped_upper_bounds(), np.inf)
+            elif snakes:
+                played_steps[slots] = self.run_sequential(snakes, seeds)
+
+        # Stopped games did not reach their real end, so their results are not cached
+        with self.phase("cache"):
+            for slot, key in zip(slots, keys):
+                if not stopped[slot]:
+                    snake = self.population[slot]
+                    self.fitness_cache.put(key, (snake.score, snake.fitness, snake.life_left,
+                                                 snake.moves_without_food))
+
+        # Find best snake
+        best_fitness = 0
+        best_index = 0
+        total_fitness = 0
+
+        for i, snake in enumerate(self.population):
+            total_fitness += snake.fitness
+            if snake.fitness > best_fitness:
+                best_fitness = snake.fitness
+                best_index = i
+
+        avg_fitness = total_fitness / len(self.population)
+        # The population's weights get overwritten by the next generation, so keep a copy
+        best_snake = self.population[best_index].clone()
+        best_snake.score = self.population[best_index].score
+        best_snake.fitness = best_fitness
+        self.best_snake = best_snake
+        self.best_seed = all_seeds[best_index]
+        self.best_score = max(self.best_score, best_snake.score)
+
+        scores = np.array([snake.score for snake in self.population])
+        self.total_steps += int(played_steps.sum())
+
+        self.log(f"Best score: {best_snake.score}")
+        self.log(f"Best fitness: {best_fitness:.1f}")
+        self.log(f"Average fitness: {avg_fitness:.1f}")
+
+        self.stats = {
+            "generation": self.generation,
+            "best_score": best_snake.score,
+            "best_fitness": best_fitness,
+            "average_fitness": avg_fitness,
+            "average_score": sum(snake.score for snake in self.population) / len(self.population),
+            "median_score": float(np.median(scores)),
+            "cache_hits": self.fitness_cache.hits - hits,
+            "steps": int(played_steps.sum()),
+            "total_steps": self.total_steps,
+        }
+        if self.curriculum is not None:
+            self.stats["stage"] = self.curriculum.stage
+            self.stats["board"] = f"{self.rules.width}x{self.rules.height}"
+        if self.early_stop is not None:
+            fitness = np.array([snake.fitness for snake in self.population])
+            self.stats["stopped_games"] = int(stopped.sum())
+            # True when the stopped games' bounds prove it; otherwise unknown (None)
+            # unless the stopped games are replayed to check
+            certain = selection_is_certain(fitness, stopped, upper, tournaments, best_index)
+            self.stats["parents_unchanged"] = True if certain else None
+            self.stats["steps_saved"] = None
+            if self.verify_early_stop:
+                self.stats["parents_unchanged"], self.stats["steps_saved"] = self.replay_stopped(
+                    fitness, stopped, played_steps, all_seeds, tournaments, best_index)
+            self.log(f"Stopped {self.stats['stopped_games']} games early")
+
+        # Create new population
+        with self.phase("breed"):
+            self.breed(best_index, tournaments)
+        self.generation += 1
+
+        # Move on to the next stage once the median score is high enough; the
+        # bred population plays the next generation by the new rules
+        if self.curriculum is not None and self.curriculum.record(self.generation - 1, scores,
+                                                                  self.stats["steps"]):
+            self.set_rules(self.curriculum.rules)
+            self.log(f"Curriculum stage {self.curriculum.stage}: {self.rules.width}x{self.rules.height} board, "
+                     f"{self.rules.start_life} life")
+        self.stats["seconds"] = time.perf_counter() - start_time
+
+        if self.checkpoint_path and self.generation % self.checkpoint_every == 0:
+            with self.phase("checkpoint"):
+                self.save(self.checkpoint_path)
+
+        if self.profiler is not None:
+            self.stats["profile"] = self.profiler.end_generation(self.generation - 1)
+
+        return best_snake
+
+    def phase(self, name):
+        """Timer for one phase of the generation (a no-op without a profiler)"""
+        return self.profiler.phase(name) if self.profiler is not None else nullcontext()
+
+    def save(self, path):
+        """Checkpoint the population, champion and RNG state to a .npz file"""
+        save_checkpoint(self, path)
+
+    @classmethod
+    def resume(cls, path, **kwargs):
+        """Continue a run from a checkpoint written by save()"""
+        evolution = cls(**kwargs)
+        load_checkpoint(evolution, path)
+        return evolution
+
+    def log(self, message):
+        if self.verbose:
+            print(message)
+
+    def game_seeds(self):
+        """One food SeedSequence per snake for this generation"""
+        if self.shared_seed:
+            return [self.game_seed_sequence] * len(self.population)
+        return self.game_seed_sequence.spawn(len(self.population))
+
+    def run_sequential(self, snakes=None, seeds=None):
+        """Play the snakes one at a time with SmartSnake.think/move, returning their steps"""
+        if snakes is None:
+            snakes, seeds = self.population, self.game_seeds()
+
+        episodes = []
+        for i, (snake, seed) in enumerate(zip(snakes, seeds)):
+            if i % 10 == 0:
+                self.log(f"Running snake {i+1}/{len(snakes)}")
+
+            snake.rng = np.random.default_rng(seed)
+            snake.detect_loops = self.detect_loops
+            snake.reset()
+            recorder = EpisodeRecorder(snake, seed) if self.record_path else None
+
+            if self.profiler is None:
+                self.play_snake(snake, recorder)
+            else:
+                with self.profiler.instrument(snake, SNAKE_PHASES), \
+                        self.profiler.instrument(snake.brain, BRAIN_PHASES):
+                    self.play_snake(snake, recorder)
+
+            snake.calculate_fitness()
+            if recorder is not None:
+                episodes.append(recorder.episode())
+
+        if self.record_path:
+            write_episodes(self.record_path, episodes)
+        return [snake.steps for snake in snakes]
+
+    def play_snake(self, snake, recorder=None):
+        while not snake.dead and snake.life_left > 0:
+            snake.think()
+            snake.move()
+            if recorder is not None:
+                recorder.record()
+
+    def run_batched(self, snakes=None, seeds=None, early_stop=None):
+        """Play every snake's game to the end in one BatchSnakeEnv, returning the env"""
+        if snakes is None:
+            snakes, seeds = self.population, self.game_seeds()
+
+        brains = PopulationBrain([snake.brain for snake in snakes])
+        recorder = BatchRecorder(seeds) if self.record_path else None
+        env = play_batch(brains, [np.random.default_rng(seed) for seed in seeds], early_stop=early_stop,
+                         detect_loops=self.detect_loops, recorder=recorder, profiler=self.profiler,
+                         rules=self.rules, backend=self.backend)
+        if recorder is not None:
+            write_episodes(self.record_path, recorder.episodes(env))
+
+        fitness = env.calculate_fitness()
+        for game, snake in enumerate(snakes):
+            env.copy_to_snake(game, snake)
+            snake.fitness = int(fitness[game])
+        return env
+
+    def replay_stopped(self, fitness, stopped, played_steps, seeds, tournaments, best_index):
+        """Play the stopped games to their end, returning (parents unchanged, steps saved)"""
+        games = np.flatnonzero(stopped)
+        if len(games) == 0:
+            return True, 0
+
+        _, lifetimes, full_fitness, _, _ = evaluate_genomes(self.genomes[games], [seeds[game] for game in games],
+                                                            self.detect_loops, self.rules, self.backend)
+        exact = fitness.copy()
+        exact[games] = full_fitness
+
+        unchanged = (np.argmax(exact) == best_index
+                     and np.array_equal(self.tournament_winners(tournaments, exact),
+                                        self.tournament_winners(tournaments, fitness)))
+        return bool(unchanged), int(lifetimes.sum() - played_steps[games].sum())
+
+    def run_parallel(self, snakes=None, seeds=None):
+        """Play every snake's game on the worker pool, returning their steps
+
+        Only flat genomes and seeds are sent to the workers. Chunks are
+        evaluated with evaluate_genomes, so results match run_batched.
+        """
+        if snakes is None:
+            snakes, seeds = self.population, self.game_seeds()
+        if self.pool is None:
+            self.pool = multiprocessing.Pool(self.workers)
+
+        genomes = np.stack([snake.brain.get_weights() for snake in snakes])
+        # One chunk per worker: a chunk lasts as long as its longest game anyway
+        chunks = [chunk for chunk in np.array_split(np.arange(len(genomes)), self.workers) if len(chunk)]
+        results = self.pool.starmap(evaluate_genomes, [(genomes[chunk], [seeds[game] for game in chunk],
+                                                        self.detect_loops, self.rules, self.backend)
+                                                       for chunk in chunks])
+
+        for chunk, (scores, lifetimes, fitness, life_left, moves_without_food) in zip(chunks, results):
+            for i, game in enumerate(chunk):
+                snake = snakes[game]
+                snake.score = int(scores[i])
+                snake.fitness = int(fitness[i])
+                snake.life_left = int(life_left[i])
+                snake.moves_without_food = int(moves_without_food[i])
+                snake.steps = int(lifetimes[i])
+                snake.dead = True
+        return [snake.steps for snake in snakes]
+
+    def close(self):
+        """Shut down the worker pool, if one was started"""
+        if self.pool is not None:
+            self.pool.close()
+            self.pool.join()
+            self.pool = None
+
+    def breed(self, best_index, tournaments, mutation_rate=0.2):
+        """Replace the population with the elite plus mutated crossovers of tournament winners
+
+        Works on whole-population arrays: next_genomes is filled in place and
+        then swapped with genomes.
+        """
+        children = self.next_genomes[1:]
+        weights = slice(0, self.weight_size)
+
+        # Keep the best snake
+        self.next_genomes[0] = self.genomes[best_index]
+
+        # Uniform crossover of the weights of two tournament winners per child
+        winners = self.tournament_winners(tournaments, np.array([snake.fitness for snake in self.population]))
+        parents1, parents2 = winners[:len(children)], winners[len(children):]
+        np.take(self.genomes, parents2, axis=0, out=children)
+        np.take(self.genomes, parents1, axis=0, out=self.parent_genomes)
+        self.rng.random(out=self.crossover_draws, dtype=np.float32)
+        np.less(self.crossover_draws, 0.5, out=self.crossover_mask)
+        np.copyto(children[:, weights], self.parent_genomes[:, weights], where=self.crossover_mask)
+
+        # Children start from fresh small biases, as a newly built ImprovedNeuralNetwork does
+        self.rng.standard_normal(out=self.bias_draws, dtype=np.float32)
+        self.bias_draws *= 0.1
+        children[:, self.weight_size:] = self.bias_draws
+
+        # Each weight layer of a child gets noise with probability mutation_rate
+        # (higher than the default for exploration), then weights are clamped
+        mutated = self.rng.random((len(children), len(self.layer_columns))) < mutation_rate
+        for layer, columns in enumerate(self.layer_columns):
+            rows = np.flatnonzero(mutated[:, layer]) + 1
+            if len(rows):
+                noise = self.rng.standard_normal((len(rows), columns.stop - columns.start), dtype=np.float32)
+                noise *= 0.3
+                self.next_genomes[rows, columns] += noise
+        np.clip(children[:, weights], -2, 2, out=children[:, weights])
+
+        self.genomes, self.next_genomes = self.next_genomes, self.genomes
+        self.bind_population()
+
+    def draw_tournaments(self, count, tournament_size=5):
+        """Entrants of count tournaments, each tournament_size distinct snakes, as a (count, size) array"""
+        if tournament_size > self.population_size:
+            raise ValueError(f"Tournament of {tournament_size} needs at least that many snakes")
+
+        tournaments = self.rng.integers(self.population_size, size=(count, tournament_size))
+        # Redraw the tournaments that picked a snake twice
+        while True:
+            ordered = np.sort(tournaments, axis=1)
+            repeated = (ordered[:, 1:] == ordered[:, :-1]).any(axis=1)
+            if not repeated.any():
+                break
+            tournaments[repeated] = self.rng.integers(self.population_size, size=(repeated.sum(), tournament_size))
+        return tournaments
+
+    def tournament_winners(self, tournaments, fitness):
+        """Index of the fittest entrant of every tournament (the first one on ties)"""
+        return tournaments[np.arange(len(tournaments)), np.argmax(fitness[tournaments], axis=1)]
@@ -0,0 +1,187 @@
+"""Per-game loops over BatchSnakeEnv's arrays, compiled with Numba when available
+
+BatchSnakeEnv steps games with whole-population NumPy operations, which
+pay for a few dozen temporary arrays per step. The kernels here do the same
+work (vision, move, collisions, growth, life and loop checks) one game at a
+time over the env's plain arrays, which Numba compiles to a tight loop.
+Food is still drawn in Python from each game's own Generator, so every
+backend plays bit for bit the same games as SmartSnake; the kernels report
+which games ate and the env places their food.
+
+Backends, chosen per env with backend=...:
+
+    numpy   the vectorised BatchSnakeEnv methods (default)
+    numba   the kernels compiled by Numba
+    python  the same kernels run uncompiled, to test them without Numba
+    auto    numba when Numba is installed, numpy otherwise
+
+Asking for numba without Numba installed warns and falls back to numpy.
+"""
+
+import warnings
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+from .snake import DEATH_CAUSES, HEAD_LINK
+
+BACKENDS = ("numpy", "numba", "python")
+
+# Death causes as BatchSnakeEnv.death_cause stores them
+WALL, BODY, STARVATION, LOOP = (DEATH_CAUSES.index(cause) for cause in ("wall", "body", "starvation", "loop"))
+
+def look_games(games, head, food, cells, ray_cells, wall_distance, width, vision_dx, vision_dy, vision):
+    """Write the SmartSnake.look vision of games[i] into vision[i]"""
+    for i in range(len(games)):
+        game = games[i]
+        cell = head[game]
+        head_x, head_y = cell % width, cell // width
+        food_dx = food[game] % width - head_x
+        food_dy = food[game] // width - head_y
+
+        for d in range(len(vision_dx)):
+            wall = wall_distance[cell, d]
+            if wall == 0:  # Wall too far away to see
+                vision[i, 3 * d] = 0.0
+                vision[i, 3 * d + 1] = 0.0
+                vision[i, 3 * d + 2] = 0.0
+                continue
+
+            # Food sits on the ray if it is a whole number of steps away
+            dx, dy = vision_dx[d], vision_dy[d]
+            food_distance = food_dx * dx if dx != 0 else food_dy * dy
+            if food_distance >= 1 and food_dx == food_distance * dx and food_dy == food_distance * dy:
+                vision[i, 3 * d] = 1.0 / max(food_distance, 20)
+            else:
+                vision[i, 3 * d] = 0.0
+
+            # First body cell along the ray; the padding cell is never occupied
+            vision[i, 3 * d + 1] = 0.0
+            for k in range(ray_cells.shape[2]):
+                if cells[game, ray_cells[cell, d, k]]:
+                    vision[i, 3 * d + 1] = 1.0 / max(k + 1, 20)
+                    break
+
+            vision[i, 3 * d + 2] = 1.0 / max(wall, 1)
+
+def move_games(games, neighbours, direction, head, head_ptr, length, body_cells, cells, links, body_hash,
+               zobrist_body, free_cells, free_position, num_free, food_cell_mask, food, score, life_left,
+               moves_without_food, steps, dead, death_cause, food_life, max_life, max_hunger, ate):
+    """SmartSnake.move for every game in games; ate[i] tells whether games[i] needs new food"""
+    capacity = body_cells.shape[1]
+    for i in range(len(games)):
+        game = games[i]
+        ate[i] = False
+        steps[game] += 1
+
+        old_head = head[game]
+        moved = direction[game]
+        new_head = neighbours[old_head, moved]
+
+        # Wall and body collisions
+        if new_head < 0:
+            dead[game] = True
+            death_cause[game] = WALL
+            continue
+        if cells[game, new_head]:
+            dead[game] = True
+            death_cause[game] = BODY
+            continue
+
+        # The old head now links to the new one
+        links[game, old_head] = moved
+        body_hash[game] ^= (zobrist_body[old_head, HEAD_LINK] ^ zobrist_body[old_head, moved]
+                            ^ zobrist_body[new_head, HEAD_LINK])
+
+        grows = new_head == food[game]
+        tail = -1
+        if not grows:
+            # Free the tail
+            tail = body_cells[game, (head_ptr[game] - length[game] + 1) % capacity]
+            cells[game, tail] = False
+            body_hash[game] ^= zobrist_body[tail, links[game, tail]]
+
+        head_ptr[game] = (head_ptr[game] + 1) % capacity
+        body_cells[game, head_ptr[game]] = new_head
+        head[game] = new_head
+        cells[game, new_head] = True
+
+        # Take the new head out of the free-cell index, then put the tail back
+        position = free_position[game, new_head]
+        if position >= 0:
+            num_free[game] -= 1
+            last = free_cells[game, num_free[game]]
+            free_cells[game, position] = last
+            free_position[game, last] = position
+            free_position[game, new_head] = -1
+        if not grows and food_cell_mask[tail]:
+            free_cells[game, num_free[game]] = tail
+            free_position[game, tail] = num_free[game]
+            num_free[game] += 1
+
+        if grows:
+            ate[i] = True
+            length[game] += 1
+            score[game] += 1
+            life_left[game] = min(life_left[game] + food_life, max_life)
+            moves_without_food[game] = 0
+        else:
+            moves_without_food[game] += 1
+
+        life_left[game] -= 1
+        if life_left[game] <= 0 or moves_without_food[game] > max_hunger:
+            dead[game] = True
+            death_cause[game] = STARVATION
+
+def check_loops(games, body_hash, zobrist_food, zobrist_direction, food, direction, recent_states, life_left,
+                moves_without_food, steps, dead, death_cause, max_hunger):
+    """SmartSnake's loop detection for the games that just moved, once their food is placed"""
+    for i in range(len(games)):
+        game = games[i]
+        if dead[game]:
+            continue
+        state = body_hash[game] ^ zobrist_food[food[game]] ^ zobrist_direction[direction[game]]
+        hunger = moves_without_food[game]
+
+        looped = False
+        for seen in range(hunger):
+            if recent_states[game, seen] == state:
+                looped = True
+                break
+        recent_states[game, hunger] = state
+
+        if looped:
+            # Skip ahead to where the loop would have starved
+            moves = min(life_left[game], max_hunger + 1 - hunger)
+            life_left[game] -= moves
+            moves_without_food[game] += moves
+            steps[game] += moves
+            dead[game] = True
+            death_cause[game] = LOOP
+
+PYTHON_KERNELS = (look_games, move_games, check_loops)
+compiled_kernels = None  # Built by the first numba env
+
+def resolve_backend(backend):
+    """The backend an env asking for backend actually uses"""
+    if backend == "auto":
+        return "numpy" if numba is None else "numba"
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown backend {backend!r}, expected one of {BACKENDS + ('auto',)}")
+    if backend == "numba" and numba is None:
+        warnings.warn("Numba is not installed, falling back to the numpy backend", RuntimeWarning)
+        return "numpy"
+    return backend
+
+def load_kernels(backend):
+    """(look_games, move_games, check_loops) for a resolved backend, None for numpy"""
+    global compiled_kernels
+    if backend == "numpy":
+        return None
+    if backend == "python":
+        return PYTHON_KERNELS
+    if compiled_kernels is None:
+        compiled_kernels = tuple(numba.njit(cache=True)(kernel) for kernel in PYTHON_KERNELS)
+    return compiled_kernels
@@ -0,0 +1,212 @@
+"""Models from the Processing sketch (SnakeAI/*.pde) in the Python runtime
+
+SnakeAI.pde's fileSelectedOut saves the best brain as a CSV with one column
+per layer (L0, L1, ...) plus a Graph column holding the best score of every
+generation. Each layer is a Matrix of shape (outputs, inputs + 1), bias in
+the last column, flattened row by row (Matrix.toArray). Every layer,
+including the output, goes through Matrix.activate, which is ReLU.
+
+ProcessingSnake replays the sketch's game rules (38 x 38 board, Snake.look's
+binary food/body vision starting from the left) so loaded models can be
+benchmarked and served without retraining.
+"""
+
+import csv
+from collections import deque
+
+import numpy as np
+
+from .rules import VISION_DIRECTIONS, build_ray_tables
+
+# Board of the Processing sketch: a 38 x 38 grid of SIZE pixel cells
+PROCESSING_BOARD = 38
+
+# Snake.look order, starting to the left and turning clockwise
+PROCESSING_VISION_DIRECTIONS = [(-1, 0), (-1, -1), (0, -1), (1, -1), (1, 0), (1, 1), (0, 1), (-1, 1)]
+
+# Where each of those rays sits in build_ray_tables (VISION_DIRECTIONS order)
+PROCESSING_RAYS = [VISION_DIRECTIONS.index(direction) for direction in PROCESSING_VISION_DIRECTIONS]
+
+# Snake.think output order
+PROCESSING_DIRECTIONS = [(0, -1), (0, 1), (-1, 0), (1, 0)]  # Up, Down, Left, Right
+
+class ProcessingNeuralNetwork:
+    """NeuralNet.output from the sketch: bias-augmented layers with ReLU everywhere"""
+
+    def __init__(self, layers):
+        # One (outputs, inputs + 1) matrix per layer, bias in the last column
+        self.layers = [np.asarray(layer, dtype=np.float32) for layer in layers]
+
+    @classmethod
+    def from_brain(cls, brain):
+        """Convert an ImprovedNeuralNetwork to the Processing layout
+
+        The hidden layers compute the same values; the output goes through
+        ReLU instead of softmax, so the chosen move only differs when every
+        output is negative (Processing then picks Up).
+        """
+        return cls([np.hstack([weights.T, bias.T]) for weights, bias in (
+            (brain.weights1, brain.bias1),
+            (brain.weights2, brain.bias2),
+            (brain.weights3, brain.bias3),
+        )])
+
+    def forward(self, x):
+        """Outputs for a (M, inputs) batch of vision rows"""
+        a = np.asarray(x, dtype=np.float32)
+        for layer in self.layers:
+            a = np.maximum(0, a @ layer[:, :-1].T + layer[:, -1])
+        return a
+
+    def output(self, inputs):
+        """NeuralNet.output for a single vision array"""
+        return self.forward(np.asarray(inputs)[None, :])[0]
+
+def load_processing_model(path):
+    """Read a fileSelectedOut CSV, returning (network, best score per generation)
+
+    Layer shapes follow fileSelectedIn: the first layer has 25 columns
+    (24 inputs + bias) and the hidden size is its value count / 25.
+    """
+    with open(path, newline="") as f:
+        rows = list(csv.DictReader(f))
+
+    layer_names = sorted((name for name in rows[0] if name.startswith("L")), key=lambda name: int(name[1:]))
+    columns = [[float(row[name]) for row in rows if row[name]] for name in layer_names]
+
+    input_size = 24
+    hidden_nodes = len(columns[0]) // (input_size + 1)
+    layers = []
+    for i, values in enumerate(columns):
+        cols = input_size + 1 if i == 0 else hidden_nodes + 1
+        layers.append(np.array(values, dtype=np.float32).reshape(-1, cols))
+
+    # fileSelectedIn stops at the first empty (0) Graph entry
+    evolution = []
+    for row in rows:
+        if not row.get("Graph") or int(row["Graph"]) == 0:
+            break
+        evolution.append(int(row["Graph"]))
+
+    return ProcessingNeuralNetwork(layers), evolution
+
+def save_processing_model(path, network, evolution=()):
+    """Write a network in the fileSelectedOut layout, loadable by the sketch"""
+    columns = [layer.ravel() for layer in network.layers]
+    header = [f"L{i}" for i in range(len(columns))] + ["Graph"]
+    length = max(max(len(column) for column in columns), len(evolution))
+
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f, lineterminator="\r\n")
+        writer.writerow(header)
+        for i in range(length):
+            row = [str(np.float32(column[i])) if i < len(column) else "" for column in columns]
+            row.append(str(evolution[i]) if i < len(evolution) else "")
+            writer.writerow(row)
+
+class ProcessingSnake:
+    """Snake.pde's game rules on a grid, driven by a ProcessingNeuralNetwork
+
+    Positions are grid cells rather than pixels. As in the sketch, body holds
+    the segments behind the head and may repeat a cell right after eating.
+    """
+
+    def __init__(self, brain, rng=None, unlimited_life=False):
+        self.brain = brain
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.unlimited_life = unlimited_life  # modelLoaded in the sketch: no life budget
+        self.size = PROCESSING_BOARD
+        # The sketch looks all the way to the wall, so no distance cap
+        ray_cells, wall_distance = build_ray_tables(self.size, self.size, max_distance=self.size + 1)
+        self.ray_cells = [[[cell for cell in ray if cell < self.size * self.size] for ray in rays]
+                          for rays in ray_cells.tolist()]
+        self.wall_distance = wall_distance.tolist()
+
+        center = self.size // 2
+        self.head = (center, center)
+        self.body = deque([(center, center + 1), (center, center + 2)])
+        self.grid = bytearray(self.size * self.size)  # Number of body segments per cell
+        for x, y in self.body:
+            self.grid[y * self.size + x] += 1
+
+        self.velocity = (0, 0)
+        self.score = 3
+        self.life_left = 200
+        self.lifetime = 0
+        self.dead = False
+        self.fitness = 0
+        self.food = self.new_food()
+
+    def new_food(self):
+        return (int(self.rng.integers(self.size)), int(self.rng.integers(self.size)))
+
+    def look(self):
+        """Snake.look: [food seen, body seen, 1 / wall distance] per direction"""
+        head = self.head[1] * self.size + self.head[0]
+        food = self.food[1] * self.size + self.food[0]
+        vision = []
+        for d in PROCESSING_RAYS:
+            ray = self.ray_cells[head][d]
+            vision.append(1.0 if food in ray else 0.0)
+            vision.append(1.0 if any(self.grid[cell] for cell in ray) else 0.0)
+            vision.append(1.0 / self.wall_distance[head][d])
+        return vision
+
+    def think(self):
+        """Snake.think: first strictly largest output, ignoring reversals"""
+        decision = self.brain.output(self.look())
+        max_index = 0
+        max_value = 0
+        for i, value in enumerate(decision):
+            if value > max_value:
+                max_value = value
+                max_index = i
+
+        direction = PROCESSING_DIRECTIONS[max_index]
+        if direction != (-self.velocity[0], -self.velocity[1]):
+            self.velocity = direction
+
+    def move(self):
+        """Snake.move: eat, shift the body, then check for death"""
+        if self.dead:
+            return
+        if not self.unlimited_life:
+            self.lifetime += 1
+            self.life_left -= 1
+
+        grow = self.head == self.food
+        if grow:
+            self.eat()
+
+        # Shift the body to follow the head
+        self.body.appendleft(self.head)
+        self.grid[self.head[1] * self.size + self.head[0]] += 1
+        if not grow:
+            tail_x, tail_y = self.body.pop()
+            self.grid[tail_y * self.size + tail_x] -= 1
+        self.head = (self.head[0] + self.velocity[0], self.head[1] + self.velocity[1])
+
+        x, y = self.head
+        if x < 0 or x >= self.size or y < 0 or y >= self.size:
+            self.dead = True
+        elif self.grid[y * self.size + x]:
+            self.dead = True
+        elif self.life_left <= 0 and not self.unlimited_life:
+            self.dead = True
+
+    def eat(self):
+        self.score += 1
+        if not self.unlimited_life and self.life_left < 500:
+            self.life_left = 500 if self.life_left > 400 else self.life_left + 100
+
+        # Food never lands on the body (the head's cell is allowed, as in the sketch)
+        self.food = self.new_food()
+        while self.grid[self.food[1] * self.size + self.food[0]]:
+            self.food = self.new_food()
+
+    def calculate_fitness(self):
+        """Snake.calculateFitness"""
+        if self.score < 10:
+            self.fitness = self.lifetime * self.lifetime * 2 ** self.score
+        else:
+            self.fitness = self.lifetime * self.lifetime * 2 ** 10 * (self.score - 9)
@@ -0,0 +1,127 @@
+"""Opt-in timers for the phases of a generation
+
+A Profiler attached to SimpleEvolution (profiler=...) times the generation
+phases (select, cache, play, breed, checkpoint) and, inside play, the game
+methods: look, think, forward, move and place_food of SmartSnake or of
+BatchSnakeEnv / PopulationBrain. Game methods are timed by shadowing them
+on the instances being played for the duration of the games, so nothing is
+added to the hot loop when no profiler is attached. Times are inclusive
+(think contains look and forward); games run on worker processes only show
+up as play.
+
+Every phase also adds its own (exclusive) time under its full nesting path,
+which write_folded saves in the collapsed-stack format read by
+flamegraph.pl and speedscope. Generations listed in dump_generations are
+additionally run under cProfile and saved as <prefix>-gen<N>.pstats and
+<prefix>-gen<N>.folded.
+"""
+
+import cProfile
+import time
+from contextlib import contextmanager
+
+# Methods timed on the objects that play a generation
+SNAKE_PHASES = ("look", "think", "move", "place_food")
+BRAIN_PHASES = ("forward",)
+
+class Phase:
+    """Context manager timing one named phase of a Profiler"""
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.profiler.enter(self.name)
+
+    def __exit__(self, *exc_info):
+        self.profiler.exit()
+
+class Profiler:
+    """Cumulative seconds and call counts per phase, reported and reset every generation"""
+
+    def __init__(self, dump_generations=(), prefix="profile"):
+        self.dump_generations = set(dump_generations)  # Run these generations under cProfile too
+        self.prefix = prefix
+        self.cprofile = None
+        self.reset()
+
+    def reset(self):
+        self.totals = {}  # name -> [seconds, calls]
+        self.folded = {}  # "outer;inner" path -> exclusive seconds
+        self.stack = []  # Names, start times and child seconds of the open phases
+        self.starts = []
+        self.children = []
+
+    def enter(self, name):
+        self.stack.append(name)
+        self.children.append(0.0)
+        self.starts.append(time.perf_counter())
+
+    def exit(self):
+        elapsed = time.perf_counter() - self.starts.pop()
+        path = ";".join(self.stack)
+        name = self.stack.pop()
+
+        total = self.totals.setdefault(name, [0.0, 0])
+        total[0] += elapsed
+        total[1] += 1
+        self.folded[path] = self.folded.get(path, 0.0) + elapsed - self.children.pop()
+        if self.children:
+            self.children[-1] += elapsed
+
+    def phase(self, name):
+        return Phase(self, name)
+
+    def timed(self, name, function):
+        """function wrapped to count as phase name"""
+        def wrapper(*args, **kwargs):
+            self.enter(name)
+            try:
+                return function(*args, **kwargs)
+            finally:
+                self.exit()
+        return wrapper
+
+    @contextmanager
+    def instrument(self, target, names):
+        """Time target's methods in names until the block ends"""
+        for name in names:
+            setattr(target, name, self.timed(name, getattr(target, name)))
+        try:
+            yield target
+        finally:
+            for name in names:
+                delattr(target, name)
+
+    def report(self):
+        """{phase: {"seconds", "calls"}}, slowest first"""
+        return {name: {"seconds": seconds, "calls": calls}
+                for name, (seconds, calls) in sorted(self.totals.items(), key=lambda item: -item[1][0])}
+
+    def write_folded(self, path):
+        """Exclusive times in microseconds as collapsed stacks, one "a;b;c count" line each"""
+        with open(path, "w") as f:
+            for stack, seconds in sorted(self.folded.items()):
+                f.write(f"{stack} {max(0, round(seconds * 1e6))}\n")
+
+    def begin_generation(self, generation):
+        self.reset()
+        if generation in self.dump_generations:
+            self.cprofile = cProfile.Profile()
+            self.cprofile.enable()
+
+    def end_generation(self, generation):
+        """The generation's report, after writing its dumps if it was chosen"""
+        if self.cprofile is not None:
+            self.cprofile.disable()
+            self.cprofile.dump_stats(f"{self.prefix}-gen{generation}.pstats")
+            self.cprofile = None
+            self.write_folded(f"{self.prefix}-gen{generation}.folded")
+        return self.report()
+
+def format_report(report):
+    """One line per phase: seconds, calls and microseconds per call"""
+    return "\n".join(f"  {name:12s} {entry['seconds']:9.3f}s {entry['calls']:10d} calls "
+                     f"{entry['seconds'] / entry['calls'] * 1e6:10.1f} us/call"
+                     for name, entry in report.items())
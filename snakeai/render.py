@@ -0,0 +1,131 @@
+"""Cached pygame drawing resources for the snake window
+
+TextCache builds each font once and keeps rendered strings, so static
+labels are rendered a single time and changing ones (score, life) only when
+their text changes. BoardRenderer turns a snake's occupancy grid into a one
+pixel per cell palette surface with pygame.surfarray and scales it up, so
+the whole board costs one blit however long the snake is.
+"""
+
+import numpy as np
+import pygame
+
+from .rules import GRID_HEIGHT, GRID_SIZE, GRID_WIDTH
+
+# Palette index of each kind of board cell
+EMPTY, BODY, HEAD, FOOD = range(4)
+BOARD_COLORS = [(0, 0, 0), (255, 255, 255), (0, 255, 0), (255, 0, 0)]  # Black, white, green, red
+
+class TextCache:
+    """Fonts by size and rendered text surfaces by (text, size, color)"""
+
+    def __init__(self, max_surfaces=256):
+        self.fonts = {}
+        self.surfaces = {}
+        self.max_surfaces = max_surfaces  # Forget everything past this many, counters keep changing
+
+    def font(self, size):
+        font = self.fonts.get(size)
+        if font is None:
+            font = self.fonts[size] = pygame.font.Font(None, size)
+        return font
+
+    def render(self, text, size, color):
+        key = (text, size, color)
+        surface = self.surfaces.get(key)
+        if surface is None:
+            if len(self.surfaces) >= self.max_surfaces:
+                self.surfaces.clear()
+            surface = self.surfaces[key] = self.font(size).render(text, True, color)
+        return surface
+
+def make_palette_surface(size, colors):
+    surface = pygame.Surface(size, depth=8)
+    surface.set_palette(colors + [(0, 0, 0)] * (256 - len(colors)))
+    return surface
+
+class BoardRenderer:
+    """Draw a snake's board as one scaled blit of its occupancy grid"""
+
+    def __init__(self, width=GRID_WIDTH, height=GRID_HEIGHT, cell_size=GRID_SIZE, colors=BOARD_COLORS):
+        self.width = width
+        self.height = height
+        self.cells = np.zeros((width, height), dtype=np.uint8)  # Indexed [x, y], as surfarray expects
+        self.small = make_palette_surface((width, height), colors)
+        self.scaled = make_palette_surface((width * cell_size, height * cell_size), colors)
+
+    def fill_cells(self, snake):
+        # The body grid holds 0 (EMPTY) or 1 (BODY) per cell, row by row
+        self.cells[:] = np.frombuffer(snake.grid, dtype=np.uint8).reshape(self.height, self.width).T
+        head_x, head_y = snake.head
+        self.cells[head_x, head_y] = HEAD
+        food_x, food_y = snake.food
+        self.cells[food_x, food_y] = FOOD
+
+    def render(self, snake):
+        """The board surface for snake's current state (reused between calls)"""
+        self.fill_cells(snake)
+        pygame.surfarray.blit_array(self.small, self.cells)
+        pygame.transform.scale(self.small, self.scaled.get_size(), self.scaled)
+        return self.scaled
+
+    def draw(self, surface, snake, position=(0, 0)):
+        surface.blit(self.render(snake), position)
+
+# Tiles add a dead variant of every cell kind and a border colour
+DEAD_OFFSET = len(BOARD_COLORS)
+TILE_BORDER = 2 * len(BOARD_COLORS)
+TILE_COLORS = BOARD_COLORS + [(0, 0, 0), (90, 90, 90), (0, 90, 0), (90, 0, 0)] + [(60, 60, 90)]
+
+class TileRenderer:
+    """Draw many games of a BatchSnakeEnv as tiles of one shared board texture
+
+    Every game's cells are written into one palette texture, one pixel per
+    cell and a border pixel between tiles, with NumPy; the texture is then
+    scaled to the window in a single blit, so the cost per frame hardly
+    depends on the number of tiles. Dead games are dimmed.
+    """
+
+    def __init__(self, num_games, size, width=GRID_WIDTH, height=GRID_HEIGHT):
+        self.num_games = num_games
+        self.width = width
+        self.height = height
+
+        # As many columns as keep the tiles closest to the window's shape
+        tile_aspect = (width + 1) / (height + 1)
+        self.columns = max(1, min(num_games, int(np.ceil(np.sqrt(num_games * size[0] / size[1] / tile_aspect)))))
+        self.rows = -(-num_games // self.columns)
+
+        self.tiles = np.full((self.rows * self.columns, height + 1, width + 1), TILE_BORDER, dtype=np.uint8)
+        self.tiles[num_games:] = EMPTY  # Unused tiles of the last row
+        texture_size = (self.columns * (width + 1), self.rows * (height + 1))
+        self.small = make_palette_surface(texture_size, TILE_COLORS)
+
+        # Scale to fit the window without distorting cells
+        scale = min(size[0] / texture_size[0], size[1] / texture_size[1])
+        self.scaled = make_palette_surface((int(texture_size[0] * scale), int(texture_size[1] * scale)),
+                                           TILE_COLORS)
+
+    def render(self, env, games=None):
+        """The tiled surface for num_games games of env (the first ones if games is None)"""
+        games = np.arange(self.num_games) if games is None else np.asarray(games)
+        count = len(games)
+        boards = self.tiles[:count, :self.height, :self.width]
+        boards[:] = env.cells[games, :-1].reshape(count, self.height, self.width)
+
+        tile = np.arange(count)
+        head_y, head_x = np.divmod(env.head[games], self.width)
+        boards[tile, head_y, head_x] = HEAD
+        food_y, food_x = np.divmod(env.food[games], self.width)
+        boards[tile, food_y, food_x] = FOOD
+        boards[env.dead[games]] += DEAD_OFFSET
+
+        # (tile row, tile column, y, x) to a texture indexed [x, y]
+        texture = self.tiles.reshape(self.rows, self.columns, self.height + 1, self.width + 1)
+        texture = texture.transpose(1, 3, 0, 2).reshape(self.small.get_size())
+        pygame.surfarray.blit_array(self.small, texture)
+        pygame.transform.scale(self.small, self.scaled.get_size(), self.scaled)
+        return self.scaled
+
+    def draw(self, surface, env, games=None, position=(0, 0)):
+        surface.blit(self.render(env, games), position)
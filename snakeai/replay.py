@@ -0,0 +1,287 @@
+"""Compact binary logs of SmartSnake games and a player that rebuilds any frame
+
+A game's moves only depend on its brain and its food, so an episode stores
+just the food seed, the food positions in the order they appeared and the
+direction of every move, packed 2 bits per step. A 1000-move game takes
+about 300 bytes.
+
+A log file is a header followed by any number of episodes, so recorders can
+keep appending to it:
+
+    header   b"SNAKEREP", version                             ("<8sH")
+    episode  seed entropy (16 bytes), flags, spawn key length, death cause,
+             food count, step count                          ("<16sBBbHI")
+             the GameRules it was played by: width, height, start_life,
+             food_life, max_life, max_hunger, food_margin,
+             food_distance                                    ("<HHIIIIHH")
+             spawn key                                        (uint32 each)
+             food cells, y * width + x                        (uint16 each)
+             moves, index into DIRECTIONS, 4 per byte         (lowest bits first)
+
+Episodes carry their rules, so one log can hold games on several board
+sizes. Version 1 logs had the board size in the file header and no rules;
+their episodes are read as DEFAULT_RULES games.
+
+EpisodePlayer re-simulates an episode with its recorded food, snapshotting
+the state every keyframe_interval moves, so frame(t) only replays the moves
+since the nearest keyframe.
+"""
+
+import os
+import struct
+
+import numpy as np
+
+from .rules import DEFAULT_RULES, GameRules
+from .snake import DEATH_CAUSES, DIRECTION_INDEX, DIRECTIONS, SmartSnake
+
+REPLAY_MAGIC = b"SNAKEREP"
+REPLAY_VERSION = 2
+FILE_HEADER = struct.Struct("<8sH")
+EPISODE_HEADER = struct.Struct("<16sBBbHI")
+EPISODE_RULES = struct.Struct("<HHIIIIHH")  # In GameRules.options() order
+V1_BOARD = struct.Struct("<HH")  # Board size that followed a version 1 file header
+
+# Episode flag bits
+HAS_SEED = 1
+DETECT_LOOPS = 2
+
+class Episode:
+    """One recorded game: food seed, food positions and the direction of every move"""
+
+    def __init__(self, seed, foods, actions, death_cause=None, detect_loops=False, rules=None):
+        self.seed = seed  # SeedSequence of the food rng, or None if unknown
+        self.foods = [tuple(food) for food in foods]  # Initial food, then one per apple eaten (but the winning one)
+        self.actions = np.asarray(actions, dtype=np.uint8)  # Index into DIRECTIONS per move
+        self.death_cause = death_cause  # One of DEATH_CAUSES, or None if the game was cut short
+        self.detect_loops = detect_loops  # Whether the game ended on a repeated state
+        self.rules = rules if rules is not None else DEFAULT_RULES  # The GameRules it was played by
+
+    @property
+    def score(self):
+        # A won game ate its last food without a new one appearing
+        return len(self.foods) if self.death_cause == "win" else len(self.foods) - 1
+
+    def __len__(self):
+        return len(self.actions)
+
+def pack_actions(actions):
+    """Direction indices as bytes, 4 per byte with the first move in the lowest bits"""
+    padded = np.zeros(-(-len(actions) // 4) * 4, dtype=np.uint8)
+    padded[:len(actions)] = actions
+    return (padded[0::4] | padded[1::4] << 2 | padded[2::4] << 4 | padded[3::4] << 6).tobytes()
+
+def unpack_actions(data, count):
+    packed = np.frombuffer(data, dtype=np.uint8)
+    return (packed[:, None] >> np.array([0, 2, 4, 6], dtype=np.uint8) & 3).ravel()[:count]
+
+def encode_episode(episode):
+    seed = episode.seed
+    if seed is not None and not isinstance(seed, np.random.SeedSequence):
+        seed = np.random.SeedSequence(seed)
+    entropy = 0 if seed is None else seed.entropy
+    if not isinstance(entropy, int) or not 0 <= entropy < 2**128:
+        raise ValueError("Only seeds with up to 128 bits of integer entropy can be recorded")
+    spawn_key = () if seed is None else seed.spawn_key
+
+    flags = (HAS_SEED if seed is not None else 0) | (DETECT_LOOPS if episode.detect_loops else 0)
+    death = -1 if episode.death_cause is None else DEATH_CAUSES.index(episode.death_cause)
+    cells = [y * episode.rules.width + x for x, y in episode.foods]
+    return b"".join([
+        EPISODE_HEADER.pack(entropy.to_bytes(16, "little"), flags, len(spawn_key), death,
+                            len(cells), len(episode.actions)),
+        EPISODE_RULES.pack(*episode.rules.options().values()),
+        struct.pack(f"<{len(spawn_key)}I", *spawn_key),
+        struct.pack(f"<{len(cells)}H", *cells),
+        pack_actions(episode.actions),
+    ])
+
+def write_episodes(path, episodes, append=True):
+    """Write episodes to a log file, appending to it if it already exists (and append is set)"""
+    new_file = not append or not os.path.exists(path)
+    with open(path, "wb" if new_file else "ab") as f:
+        if new_file:
+            f.write(FILE_HEADER.pack(REPLAY_MAGIC, REPLAY_VERSION))
+        for episode in episodes:
+            f.write(encode_episode(episode))
+
+def read_episodes(path):
+    """Yield the episodes of a log file in the order they were written"""
+    with open(path, "rb") as f:
+        magic, version = FILE_HEADER.unpack(f.read(FILE_HEADER.size))
+        if magic != REPLAY_MAGIC or version not in (1, REPLAY_VERSION):
+            raise ValueError(f"{path} is not a version {REPLAY_VERSION} replay log")
+        if version == 1:
+            width, height = V1_BOARD.unpack(f.read(V1_BOARD.size))
+            if (width, height) != (DEFAULT_RULES.width, DEFAULT_RULES.height):
+                raise ValueError(f"{path} was recorded on a {width} x {height} board")
+
+        rules_cache = {}  # Episodes of one log mostly share their rules
+        while True:
+            header = f.read(EPISODE_HEADER.size)
+            if not header:
+                return
+            entropy, flags, key_length, death, food_count, steps = EPISODE_HEADER.unpack(header)
+            rules = DEFAULT_RULES
+            if version > 1:
+                values = EPISODE_RULES.unpack(f.read(EPISODE_RULES.size))
+                rules = rules_cache.get(values)
+                if rules is None:
+                    rules = rules_cache[values] = GameRules(*values)
+            width = rules.width
+            spawn_key = struct.unpack(f"<{key_length}I", f.read(4 * key_length))
+            cells = struct.unpack(f"<{food_count}H", f.read(2 * food_count))
+            actions = unpack_actions(f.read(-(-steps // 4)), steps)
+
+            seed = None
+            if flags & HAS_SEED:
+                seed = np.random.SeedSequence(int.from_bytes(entropy, "little"), spawn_key=spawn_key)
+            yield Episode(seed, [(cell % width, cell // width) for cell in cells], actions,
+                          death_cause=None if death < 0 else DEATH_CAUSES[death],
+                          detect_loops=bool(flags & DETECT_LOOPS), rules=rules)
+
+class EpisodeRecorder:
+    """Record a SmartSnake's game: call record() after every move()
+
+    The snake must have just been reset, so its food is the first of the
+    episode.
+    """
+
+    def __init__(self, snake, seed=None):
+        self.snake = snake
+        self.seed = seed
+        self.foods = [snake.food]
+        self.actions = []
+        self.score = snake.score
+
+    def record(self):
+        snake = self.snake
+        self.actions.append(DIRECTION_INDEX[snake.direction])
+        if snake.score > self.score:
+            self.score = snake.score
+            if snake.death_cause != "win":
+                self.foods.append(snake.food)
+
+    def episode(self):
+        return Episode(self.seed, self.foods, self.actions, self.snake.death_cause, self.snake.detect_loops,
+                       self.snake.rules)
+
+class BatchRecorder:
+    """Record every game of a BatchSnakeEnv; play_batch calls start, then before_move/after_move"""
+
+    def __init__(self, seeds=None):
+        self.seeds = seeds  # Food seed of each game, if known
+
+    def start(self, env):
+        if self.seeds is None:
+            self.seeds = [None] * env.num_games
+        self.foods = [[int(food)] for food in env.food]
+        self.score = env.score.copy()
+        self.games = []  # Games that moved, per step
+        self.moves = []  # Their directions
+
+    def before_move(self, env, games):
+        self.games.append(games.copy())
+        self.moves.append(env.direction[games].astype(np.uint8))
+
+    def after_move(self, env, games):
+        eaters = games[env.score[games] > self.score[games]]
+        for game in eaters[env.death_cause[eaters] != DEATH_CAUSES.index("win")]:
+            self.foods[game].append(int(env.food[game]))
+        self.score[eaters] = env.score[eaters]
+
+    def episodes(self, env):
+        """One Episode per game, in game order"""
+        games = np.concatenate(self.games) if self.games else np.zeros(0, dtype=np.int64)
+        moves = np.concatenate(self.moves) if self.moves else np.zeros(0, dtype=np.uint8)
+        # A stable sort keeps each game's moves in step order
+        order = np.argsort(games, kind="stable")
+        bounds = np.searchsorted(games[order], np.arange(env.num_games + 1))
+        moves = moves[order]
+
+        episodes = []
+        for game in range(env.num_games):
+            cause = None if env.stopped[game] or env.death_cause[game] < 0 else DEATH_CAUSES[env.death_cause[game]]
+            foods = [(cell % env.width, cell // env.width) for cell in self.foods[game]]
+            episodes.append(Episode(self.seeds[game], foods, moves[bounds[game]:bounds[game + 1]], cause,
+                                    env.detect_loops, env.rules))
+        return episodes
+
+class ReplaySnake(SmartSnake):
+    """A SmartSnake whose food comes from a recorded sequence instead of its rng"""
+
+    def __init__(self, foods, detect_loops=False, rules=None):
+        self.foods = foods
+        self.food_index = 0
+        # Moves come from the recording, so the brain is never asked
+        super().__init__(use_heuristics=False, detect_loops=detect_loops, rules=rules)
+
+    def place_food(self):
+        if self.food_index == len(self.foods):
+            return None  # Eating the last food won the game
+        food = self.foods[self.food_index]
+        self.food_index += 1
+        return food
+
+class EpisodePlayer:
+    """Rebuild any frame of an Episode; frame t is the state after t moves"""
+
+    def __init__(self, episode, keyframe_interval=100):
+        self.episode = episode
+        self.keyframe_interval = keyframe_interval
+        self.snake = ReplaySnake(episode.foods, episode.detect_loops, episode.rules)
+
+        # One pass over the game, keeping a snapshot every keyframe_interval moves
+        self.keyframes = [self.snapshot()]
+        for t in range(len(episode)):
+            self.step(t)
+            if (t + 1) % keyframe_interval == 0:
+                self.keyframes.append(self.snapshot())
+        self.position = len(episode)  # Frame self.snake is at
+
+    def __len__(self):
+        """Number of frames, the starting position included"""
+        return len(self.episode) + 1
+
+    def snapshot(self):
+        snake = self.snake
+        return (snake.body, snake.direction, snake.food, snake.food_index, snake.score, snake.life_left,
+                snake.moves_without_food, snake.dead, snake.death_cause,
+                dict(snake.recent_states) if snake.recent_states is not None else None)
+
+    def restore(self, keyframe):
+        snake = self.snake
+        (snake.body, snake.direction, snake.food, snake.food_index, snake.score, snake.life_left,
+         snake.moves_without_food, snake.dead, snake.death_cause, recent_states) = keyframe
+        snake.recent_states = dict(recent_states) if recent_states is not None else None
+
+    def step(self, t):
+        self.snake.direction = DIRECTIONS[self.episode.actions[t]]
+        self.snake.move()
+
+    def frame(self, t):
+        """A ReplaySnake in the state after t moves (negative t counts from the end)"""
+        if t < 0:
+            t += len(self)
+        if not 0 <= t < len(self):
+            raise IndexError(f"frame {t} out of range for {len(self)} frames")
+
+        # Start from the nearest keyframe, or from the current frame if that is closer
+        start = t // self.keyframe_interval * self.keyframe_interval
+        if start <= self.position <= t:
+            start = self.position
+        else:
+            self.restore(self.keyframes[t // self.keyframe_interval])
+        for step in range(start, t):
+            self.step(step)
+        self.position = t
+        return self.snake
+
+def render_frame(snake):
+    """A frame as text: H head, o body, * food, . empty"""
+    rows = [["."] * snake.width for _ in range(snake.height)]
+    fx, fy = snake.food
+    rows[fy][fx] = "*"
+    for i, (x, y) in enumerate(snake.body):
+        rows[y][x] = "H" if i == 0 else "o"
+    return "\n".join("".join(row) for row in rows)
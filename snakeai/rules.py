@@ -0,0 +1,185 @@
+"""Board geometry and game rules shared by every snake engine
+
+GameRules bundles what differs between the game variants in this
+repository: the board size, the life budget and where food may appear.
+SmartSnake, BatchSnakeEnv and the front-end scripts all take one, and the
+defaults are the rules the evolution has always trained on.
+"""
+
+import numpy as np
+
+# Window dimensions
+WIDTH = 800
+HEIGHT = 600
+GRID_SIZE = 20
+GRID_WIDTH = WIDTH // GRID_SIZE
+GRID_HEIGHT = HEIGHT // GRID_SIZE
+
+# Movement directions, indexed the same way as the network outputs
+DIRECTIONS = [(0, -1), (0, 1), (-1, 0), (1, 0)]  # Up, Down, Left, Right
+
+# Vision rays, in the order SmartSnake.look reports them
+VISION_DIRECTIONS = [
+    (0, -1),   # Up
+    (1, -1),   # Up-Right
+    (1, 0),    # Right
+    (1, 1),    # Down-Right
+    (0, 1),    # Down
+    (-1, 1),   # Down-Left
+    (-1, 0),   # Left
+    (-1, -1)   # Up-Left
+]
+
+# look_in_direction gives up after this many cells
+MAX_LOOK_DISTANCE = 50
+
+# Zobrist link of the head segment, after the four DIRECTIONS
+HEAD_LINK = len(DIRECTIONS)
+
+def build_ray_tables(width, height, max_distance=MAX_LOOK_DISTANCE):
+    """Precompute the cells every vision ray passes through from every cell
+
+    Returns (ray_cells, wall_distance). ray_cells[cell, d] lists the flat cell
+    indices (y * width + x) along direction d, nearest first, padded with
+    width * height: a spare cell past the board that is never occupied.
+    wall_distance[cell, d] is the distance to the wall as look_in_direction
+    measures it, or 0 when the wall is out of sight and the ray reads [0, 0, 0].
+    """
+    ys, xs = np.divmod(np.arange(width * height), width)
+    length = min(max(width, height) - 1, max_distance - 1)
+    ray_cells = np.full((width * height, len(VISION_DIRECTIONS), length), width * height, dtype=np.int32)
+    wall_distance = np.zeros((width * height, len(VISION_DIRECTIONS)), dtype=np.int32)
+
+    for d, (dx, dy) in enumerate(VISION_DIRECTIONS):
+        # Number of cells between each cell and the wall in this direction
+        steps_x = np.full(xs.shape, width + height) if dx == 0 else (width - 1 - xs if dx > 0 else xs)
+        steps_y = np.full(ys.shape, width + height) if dy == 0 else (height - 1 - ys if dy > 0 else ys)
+        inside = np.minimum(steps_x, steps_y)
+
+        visible = inside + 1 <= max_distance
+        wall_distance[visible, d] = inside[visible] + 1
+
+        for k in range(1, length + 1):
+            reach = visible & (inside >= k)
+            ray_cells[reach, d, k - 1] = (ys[reach] + dy * k) * width + xs[reach] + dx * k
+
+    return ray_cells, wall_distance
+
+def build_neighbour_table(width, height):
+    """neighbours[cell, d]: the cell one step along DIRECTIONS[d], or -1 past the wall"""
+    ys, xs = np.divmod(np.arange(width * height), width)
+    neighbours = np.empty((width * height, len(DIRECTIONS)), dtype=np.int32)
+    for d, (dx, dy) in enumerate(DIRECTIONS):
+        x, y = xs + dx, ys + dy
+        inside = (x >= 0) & (x < width) & (y >= 0) & (y < height)
+        neighbours[:, d] = np.where(inside, y * width + x, -1)
+    return neighbours
+
+class Board:
+    """Lookup tables of a width x height board: vision rays, neighbours and Zobrist keys
+
+    The arrays serve BatchSnakeEnv; the *_lists copies are the same tables as
+    nested lists, which are faster to index one cell at a time in SmartSnake.
+    Boards only depend on their size, so get_board builds each size once.
+    """
+
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.size = width * height
+
+        self.ray_cells, self.wall_distance = build_ray_tables(width, height)
+        self.neighbours = build_neighbour_table(width, height)
+        self.neighbour_lists = self.neighbours.tolist()
+        self.ray_cell_lists = [[[cell for cell in ray if cell < self.size] for ray in rays]
+                               for rays in self.ray_cells.tolist()]
+        self.wall_distance_lists = self.wall_distance.tolist()
+
+        # Zobrist keys for loop detection. A body segment is keyed by its cell and
+        # the direction to the segment ahead of it (HEAD_LINK for the head), which
+        # stays fixed while the snake moves, so the body hash updates in O(1) per
+        # move and still tells apart bodies that cover the same cells in another order.
+        self.zobrist_body = np.random.default_rng(1).integers(0, 2**64, size=(self.size, HEAD_LINK + 1),
+                                                              dtype=np.uint64)
+        self.zobrist_food = np.random.default_rng(2).integers(0, 2**64, size=self.size, dtype=np.uint64)
+        self.zobrist_direction = np.random.default_rng(3).integers(0, 2**64, size=len(DIRECTIONS), dtype=np.uint64)
+        self.zobrist_body_lists = self.zobrist_body.tolist()
+        self.zobrist_food_lists = self.zobrist_food.tolist()
+        self.zobrist_direction_lists = self.zobrist_direction.tolist()
+
+# Every Board built so far, by (width, height)
+boards = {}
+
+def get_board(width, height):
+    """The Board of a width x height board, shared by all rules of that size"""
+    board = boards.get((width, height))
+    if board is None:
+        board = boards[(width, height)] = Board(width, height)
+    return board
+
+class GameRules:
+    """Board size, life budget and food placement of a game
+
+    A game starts with start_life moves in the middle of the board, facing
+    right. Each food adds food_life, up to max_life, and the game is lost
+    when life runs out or after more than max_hunger moves without food.
+    Food appears on a free cell at least food_margin cells away from the
+    walls and more than food_distance steps (Manhattan) from the head, or
+    nearer when no free cell is that far. A game with no free food cell
+    left is won.
+    """
+
+    def __init__(self, width=GRID_WIDTH, height=GRID_HEIGHT, start_life=300, food_life=150, max_life=800,
+                 max_hunger=100, food_margin=2, food_distance=5):
+        if width - 2 * food_margin < 1 or height - 2 * food_margin < 1:
+            raise ValueError(f"a food margin of {food_margin} leaves no room for food on a {width}x{height} board")
+        self.width = width
+        self.height = height
+        self.start_life = start_life
+        self.food_life = food_life
+        self.max_life = max_life
+        self.max_hunger = max_hunger
+        self.food_margin = food_margin
+        self.food_distance = food_distance
+        self.board = get_board(width, height)
+
+        # Cells food may appear on, ascending, and a mask of them over the board
+        ys, xs = np.divmod(np.arange(width * height), width)
+        self.food_cell_mask = ((xs >= food_margin) & (xs < width - food_margin)
+                               & (ys >= food_margin) & (ys < height - food_margin))
+        self.food_cells = np.flatnonzero(self.food_cell_mask)
+        self.food_cell_list = self.food_cells.tolist()
+        self.food_cell_mask_list = self.food_cell_mask.tolist()
+
+        # Steps from the head that are too close for food
+        self.near_offsets = [(dx, dy) for dx in range(-food_distance, food_distance + 1)
+                             for dy in range(abs(dx) - food_distance, food_distance - abs(dx) + 1)]
+        self.near_dx = np.array([dx for dx, _ in self.near_offsets], dtype=np.int64)
+        self.near_dy = np.array([dy for _, dy in self.near_offsets], dtype=np.int64)
+
+    def options(self):
+        """Keyword arguments that rebuild these rules"""
+        return {"width": self.width, "height": self.height, "start_life": self.start_life,
+                "food_life": self.food_life, "max_life": self.max_life, "max_hunger": self.max_hunger,
+                "food_margin": self.food_margin, "food_distance": self.food_distance}
+
+    @property
+    def start(self):
+        """(x, y) of the first body segment"""
+        return (self.width // 2, self.height // 2)
+
+    def __eq__(self, other):
+        return isinstance(other, GameRules) and self.options() == other.options()
+
+    def __hash__(self):
+        return hash(tuple(self.options().values()))
+
+    def __repr__(self):
+        return "GameRules(" + ", ".join(f"{name}={value}" for name, value in self.options().items()) + ")"
+
+    def __reduce__(self):
+        # Rebuild the tables on unpickling rather than sending them to workers
+        return (GameRules, tuple(self.options().values()))
+
+# The rules of the 40x30 board the evolution trains on
+DEFAULT_RULES = GameRules()
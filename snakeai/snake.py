@@ -0,0 +1,359 @@
+from collections import deque
+
+import numpy as np
+
+from .brain import ImprovedNeuralNetwork
+from .rules import DEFAULT_RULES, DIRECTIONS, HEAD_LINK, VISION_DIRECTIONS
+
+VISION_INDEX = {direction: d for d, direction in enumerate(VISION_DIRECTIONS)}
+VISION_DX = np.array([dx for dx, _ in VISION_DIRECTIONS])
+VISION_DY = np.array([dy for _, dy in VISION_DIRECTIONS])
+
+# Why a game ended; "loop" is only reported when loop detection is on, and a
+# game is won once there is no free cell left for food
+DEATH_CAUSES = ["wall", "body", "starvation", "loop", "win"]
+
+DIRECTION_INDEX = {direction: i for i, direction in enumerate(DIRECTIONS)}
+
+class SmartSnake:
+    def __init__(self, brain=None, use_heuristics=True, rng=None, detect_loops=False, rules=None):
+        # Board size, life budget and food placement (snakeai.rules.GameRules)
+        self.rules = rules if rules is not None else DEFAULT_RULES
+        self.board = self.rules.board
+        self.width = self.rules.width
+        self.height = self.rules.height
+        # Food placement draws from rng, a numpy Generator (a fresh unseeded one by default)
+        self.rng = rng if rng is not None else np.random.default_rng()
+        # End the game as soon as the exact same state comes back without eating.
+        # Decisions never depend on life_left or moves_without_food, so such a
+        # game would circle until it starved; the counters are fast-forwarded to
+        # that end, which leaves score and fitness unchanged.
+        self.detect_loops = detect_loops
+        self.reset()
+        if brain is None:
+            self.brain = ImprovedNeuralNetwork()
+            if use_heuristics:
+                self.brain.set_heuristic_weights()
+        else:
+            self.brain = brain
+
+    @property
+    def body(self):
+        """Body segments as a list, head first"""
+        return list(self._body)
+
+    @body.setter
+    def body(self, body):
+        """Place the snake: (x, y) segments, head first, each next to the one before
+
+        Segments must be adjacent (one step up, down, left or right) because
+        the body hash keys every segment by the direction to the one ahead.
+        """
+        body = list(body)
+        for (x, y), (ahead_x, ahead_y) in zip(body[1:], body):
+            if (ahead_x - x, ahead_y - y) not in DIRECTION_INDEX:
+                raise ValueError(f"Body segments {(ahead_x, ahead_y)} and {(x, y)} are not adjacent")
+
+        # Segments live in a deque so moving and growing are O(1)
+        self._body = deque(body)
+
+        # Occupancy grid of the body, indexed by y * width + x
+        width = self.width
+        self.grid = bytearray(width * self.height)
+        for x, y in self._body:
+            self.grid[y * width + x] = 1
+
+        # Zobrist hash of the segments and their links
+        zobrist_body = self.board.zobrist_body_lists
+        head_x, head_y = self._body[0]
+        self.body_hash = zobrist_body[head_y * width + head_x][HEAD_LINK]
+        for (x, y), (ahead_x, ahead_y) in zip(list(self._body)[1:], self._body):
+            self.body_hash ^= zobrist_body[y * width + x][DIRECTION_INDEX[(ahead_x - x, ahead_y - y)]]
+
+        # Free-cell index of the cells food may appear on: free_cells holds them in
+        # no particular order and free_position[cell] is a cell's place in it (-1
+        # when taken or not a food cell), so a move updates it with O(1) swaps
+        self.free_cells = list(self.rules.food_cell_list)
+        self.free_position = [-1] * len(self.grid)
+        for position, cell in enumerate(self.free_cells):
+            self.free_position[cell] = position
+        for x, y in self._body:
+            self.take_cell(y * width + x)
+
+    @property
+    def head(self):
+        return self._body[0]
+
+    def state_hash(self):
+        """Zobrist hash of the body, food and direction: everything think() depends on"""
+        return (self.body_hash ^ self.board.zobrist_food_lists[self.food[1] * self.width + self.food[0]]
+                ^ self.board.zobrist_direction_lists[DIRECTION_INDEX[self.direction]])
+
+    def reset(self):
+        # Start position in the middle
+        self.body = [self.rules.start]
+        self.direction = (1, 0)  # Start moving right
+        self.food = self.place_food()
+        self.score = 0
+        self.life_left = self.rules.start_life
+        self.dead = False
+        self.fitness = 0
+        self.moves_without_food = 0
+        self.steps = 0  # Moves played, counting the ones a detected loop skips
+        self.death_cause = None  # One of DEATH_CAUSES once dead
+        self.recent_states = {self.state_hash(): 0} if self.detect_loops else None  # Since the last food
+
+    def take_cell(self, cell):
+        """Remove a cell from the free-cell index by moving the last free cell into its place"""
+        position = self.free_position[cell]
+        if position >= 0:
+            last = self.free_cells.pop()
+            if last != cell:
+                self.free_cells[position] = last
+                self.free_position[last] = position
+            self.free_position[cell] = -1
+
+    def release_cell(self, cell):
+        if self.rules.food_cell_mask_list[cell]:
+            self.free_position[cell] = len(self.free_cells)
+            self.free_cells.append(cell)
+
+    def place_food(self):
+        """A random free food cell as (x, y), or None when none is left (the game is won)
+
+        Draws from the free-cell index, so the cost does not grow with the
+        snake. Cells too close to the head are drawn again, unless every free
+        cell is that close.
+        """
+        free_cells = self.free_cells
+        if not free_cells:
+            return None
+        head_x, head_y = self._body[0]
+        checked = False
+        while True:
+            food_y, food_x = divmod(free_cells[int(self.rng.integers(len(free_cells)))], self.width)
+            # Make sure food is not too close to snake
+            if abs(food_x - head_x) + abs(food_y - head_y) > self.rules.food_distance:
+                return (food_x, food_y)
+            if not checked:
+                if self.free_cells_near_head() == len(free_cells):
+                    return (food_x, food_y)
+                checked = True
+
+    def free_cells_near_head(self):
+        """Number of free food cells within rules.food_distance steps of the head"""
+        head_x, head_y = self._body[0]
+        count = 0
+        for dx, dy in self.rules.near_offsets:
+            x, y = head_x + dx, head_y + dy
+            if 0 <= x < self.width and 0 <= y < self.height and self.free_position[y * self.width + x] >= 0:
+                count += 1
+        return count
+
+    def look(self):
+        """Improved vision system with better distance calculation"""
+        vision = []
+        for dx, dy in VISION_DIRECTIONS:
+            vision.extend(self.look_in_direction(dx, dy))
+
+        return vision
+
+    def look_in_direction(self, dx, dy):
+        """Better distance calculation - closer objects have higher values
+
+        Reads the precomputed ray through the occupancy grid instead of walking
+        the board and scanning the body list at every step.
+        """
+        head_x, head_y = self._body[0]
+        head = head_y * self.width + head_x
+        d = VISION_INDEX[(dx, dy)]
+
+        wall_distance = self.board.wall_distance_lists[head][d]
+        if wall_distance == 0:  # Wall too far away to see
+            return [0, 0, 0]
+
+        # Food sits on the ray if it is a whole number of steps away
+        food_dx = self.food[0] - head_x
+        food_dy = self.food[1] - head_y
+        food_distance = food_dx * dx if dx != 0 else food_dy * dy
+        food_found = (food_distance >= 1 and food_dx == food_distance * dx
+                      and food_dy == food_distance * dy)
+
+        body_found = False
+        body_distance = 0
+        grid = self.grid
+        for distance, cell in enumerate(self.board.ray_cell_lists[head][d], 1):
+            if grid[cell]:
+                body_found = True
+                body_distance = distance
+                break
+
+        # Closer = higher value
+        wall_dist = 1.0 / max(wall_distance, 1)
+        food_dist = 1.0 / max(food_distance, 20) if food_found else 0
+        body_dist = 1.0 / max(body_distance, 20) if body_found else 0
+        return [food_dist, body_dist, wall_dist]
+
+    def think(self):
+        """Improved decision making with fallback heuristics"""
+        vision = self.look()
+        vision_array = np.array(vision).reshape(1, -1)
+
+        output = self.brain.forward(vision_array)[0]
+
+        # Choose direction with highest output
+        direction_index = np.argmax(output)
+        directions = [(0, -1), (0, 1), (-1, 0), (1, 0)]  # Up, Down, Left, Right
+        new_direction = directions[direction_index]
+
+        # Fallback to simple heuristics if AI output is too random
+        if max(output) < 0.35:  # If AI is uncertain
+            new_direction = self.get_heuristic_direction()
+
+        # Prevent reversing and immediate suicide
+        if not self.is_safe_direction(new_direction):
+            # Try to find any safe direction
+            for dir in directions:
+                if (dir[0] * -1, dir[1] * -1) != self.direction and self.is_safe_direction(dir):
+                    new_direction = dir
+                    break
+
+        # Prevent reversing
+        if (new_direction[0] * -1, new_direction[1] * -1) != self.direction:
+            self.direction = new_direction
+
+    def get_heuristic_direction(self):
+        """Simple heuristic: move towards food if safe"""
+        head_x, head_y = self._body[0]
+        food_x, food_y = self.food
+
+        dx = food_x - head_x
+        dy = food_y - head_y
+
+        # Prefer the direction that gets us closer to food
+        if abs(dx) > abs(dy):
+            preferred = (1, 0) if dx > 0 else (-1, 0)
+        else:
+            preferred = (0, 1) if dy > 0 else (0, -1)
+
+        # Check if preferred direction is safe
+        if self.is_safe_direction(preferred) and (preferred[0] * -1, preferred[1] * -1) != self.direction:
+            return preferred
+
+        # If not safe, try other directions
+        alternatives = [(0, 1), (0, -1), (1, 0), (-1, 0)]
+        for alt in alternatives:
+            if self.is_safe_direction(alt) and (alt[0] * -1, alt[1] * -1) != self.direction:
+                return alt
+
+        return self.direction  # Keep current direction as last resort
+
+    def is_safe_direction(self, direction):
+        """Check if moving in this direction is immediately safe"""
+        head_x, head_y = self._body[0]
+        cell = self.board.neighbour_lists[head_y * self.width + head_x][DIRECTION_INDEX[direction]]
+
+        # Past the wall, or into the body
+        return cell >= 0 and not self.grid[cell]
+
+    def move(self):
+        """Move the snake"""
+        if self.dead:
+            return
+
+        self.steps += 1
+        width = self.width
+        head_x, head_y = self._body[0]
+        old_head = head_y * width + head_x
+        moved = DIRECTION_INDEX[self.direction]
+        cell = self.board.neighbour_lists[old_head][moved]
+
+        # Check wall collision
+        if cell < 0:
+            self.dead = True
+            self.death_cause = "wall"
+            return
+
+        # Check body collision
+        if self.grid[cell]:
+            self.dead = True
+            self.death_cause = "body"
+            return
+
+        # Move snake; the old head now links to the new one
+        zobrist_body = self.board.zobrist_body_lists
+        self.body_hash ^= (zobrist_body[old_head][HEAD_LINK] ^ zobrist_body[old_head][moved]
+                           ^ zobrist_body[cell][HEAD_LINK])
+        new_head = (head_x + self.direction[0], head_y + self.direction[1])
+        self._body.appendleft(new_head)
+        self.grid[cell] = 1
+        self.take_cell(cell)
+
+        # Check food collision
+        won = False
+        if new_head == self.food:
+            self.score += 1
+            food = self.place_food()
+            if food is None:
+                won = True  # The food stays on the head
+            else:
+                self.food = food
+            self.life_left = min(self.life_left + self.rules.food_life, self.rules.max_life)
+            self.moves_without_food = 0
+            if self.detect_loops:
+                self.recent_states.clear()
+        else:
+            tail_x, tail_y = self._body.pop()
+            ahead_x, ahead_y = self._body[-1]
+            self.body_hash ^= zobrist_body[tail_y * width + tail_x][
+                DIRECTION_INDEX[(ahead_x - tail_x, ahead_y - tail_y)]]
+            self.grid[tail_y * width + tail_x] = 0
+            self.release_cell(tail_y * width + tail_x)
+            self.moves_without_food += 1
+
+        self.life_left -= 1
+        if won:
+            # No cell left for food: the board is full
+            self.dead = True
+            self.death_cause = "win"
+        elif self.life_left <= 0 or self.moves_without_food > self.rules.max_hunger:
+            self.dead = True
+            self.death_cause = "starvation"
+        elif self.detect_loops:
+            state = self.state_hash()
+            if state in self.recent_states:
+                # Skip ahead to where the loop would have starved
+                moves = min(self.life_left, self.rules.max_hunger + 1 - self.moves_without_food)
+                self.life_left -= moves
+                self.moves_without_food += moves
+                self.steps += moves
+                self.dead = True
+                self.death_cause = "loop"
+            else:
+                self.recent_states[state] = self.moves_without_food
+
+    def calculate_fitness(self):
+        """Better fitness function"""
+        # Reward score heavily
+        self.fitness = self.score * 1000
+
+        # Reward surviving longer
+        self.fitness += (self.rules.start_life - self.life_left) * 10
+
+        # Bonus for not starving
+        self.fitness -= self.moves_without_food * 5
+
+        # Make sure fitness is positive
+        self.fitness = max(1, self.fitness)
+
+    def clone(self):
+        """Create a copy of the snake"""
+        new_snake = SmartSnake(use_heuristics=False, rules=self.rules)
+        new_snake.brain = ImprovedNeuralNetwork()
+        new_snake.brain.weights1 = self.brain.weights1.copy()
+        new_snake.brain.weights2 = self.brain.weights2.copy()
+        new_snake.brain.weights3 = self.brain.weights3.copy()
+        new_snake.brain.bias1 = self.brain.bias1.copy()
+        new_snake.brain.bias2 = self.brain.bias2.copy()
+        new_snake.brain.bias3 = self.brain.bias3.copy()
+        return new_snake
@@ -0,0 +1,90 @@
+"""Run a SimpleEvolution in a background process and publish its champions
+
+The pygame window stays responsive while a generation is evaluated: it
+sends train requests to a TrainingWorker, pauses and resumes it, and polls
+the results queue once a frame. Every message carries the generation count,
+the stats and champion of the last evolved generation (the champion's genome
+and food seed, so it can be watched replaying its own game) and the first
+genomes of the current population for the grid view.
+"""
+
+import multiprocessing
+import queue
+
+from .evolution import SimpleEvolution
+
+def publish(evolution, results, preview):
+    best = evolution.best_snake
+    results.put({
+        "generation": evolution.generation,
+        "stats": evolution.stats,
+        "champion": None if best is None else best.brain.get_weights(),
+        "champion_seed": evolution.best_seed,
+        "genomes": evolution.genomes[:preview].copy(),
+    })
+
+def training_loop(options, preview, commands, results):
+    """Worker process: evolve until the requested generation, then wait for the next request"""
+    evolution = SimpleEvolution(verbose=False, **options)
+    publish(evolution, results, preview)
+    target = 0
+    paused = False
+    try:
+        while True:
+            # Block for a request when idle or paused, only drain requests while training
+            while True:
+                try:
+                    command, value = commands.get(block=paused or evolution.generation >= target)
+                except queue.Empty:
+                    break
+                if command == "stop":
+                    return
+                if command == "pause":
+                    paused = value
+                else:
+                    target = value
+
+            evolution.evolve_one_generation()
+            publish(evolution, results, preview)
+    finally:
+        evolution.close()
+
+class TrainingWorker:
+    """A SimpleEvolution (built from options) living in its own process"""
+
+    def __init__(self, preview=0, **options):
+        # spawn, so the worker does not inherit the window's pygame state
+        context = multiprocessing.get_context("spawn")
+        self.commands = context.Queue()
+        self.results = context.Queue()
+        self.process = context.Process(target=training_loop, args=(options, preview, self.commands, self.results),
+                                       daemon=True)
+        self.process.start()
+
+    def train(self, generations):
+        """Keep evolving until generations generations have run in total"""
+        self.commands.put(("train", generations))
+
+    def pause(self):
+        """Stop evolving after the generation in progress, keeping the requested target"""
+        self.commands.put(("pause", True))
+
+    def resume(self):
+        self.commands.put(("pause", False))
+
+    def poll(self):
+        """Messages published since the last poll, without waiting"""
+        messages = []
+        while True:
+            try:
+                messages.append(self.results.get_nowait())
+            except queue.Empty:
+                return messages
+
+    def close(self, timeout=1.0):
+        """Stop the worker; a generation still running is abandoned"""
+        self.commands.put(("stop", None))
+        self.process.join(timeout)
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join()
@@ -0,0 +1,397 @@
+import time
+
+import numpy as np
+import pygame
+
+from .batch import BatchSnakeEnv
+from .brain import ImprovedNeuralNetwork, PopulationBrain
+from .render import BoardRenderer, TextCache, TileRenderer
+from .replay import EpisodePlayer
+from .rules import DEFAULT_RULES, HEIGHT, WIDTH
+from .snake import SmartSnake
+from .training import TrainingWorker
+
+# Colors
+BLACK = (0, 0, 0)
+WHITE = (255, 255, 255)
+GREEN = (0, 255, 0)
+RED = (255, 0, 0)
+BLUE = (0, 0, 255)
+YELLOW = (255, 255, 0)
+
+# The window redraws at this rate whatever the simulation speed
+RENDER_FPS = 60
+# Simulation speed multipliers, cycled with +/-; None steps as fast as each frame allows
+SPEEDS = [1, 2, 5, 10, 100, 1000, None]
+# Share of a frame the simulation may use before the renderer takes over
+FRAME_BUDGET = 0.8 / RENDER_FPS
+# The population grid view shows at most this many games
+MAX_TILES = 400
+
+class ImprovedSnakeGame:
+    def __init__(self, human_controlled=False, use_evolution=False, episode=None, population_size=20, rules=None):
+        pygame.init()
+        self.screen = pygame.display.set_mode((WIDTH, HEIGHT))
+        pygame.display.set_caption("Improved Snake AI")
+        self.clock = pygame.time.Clock()
+        self.text = TextCache()  # Fonts and rendered labels, built once
+        # Board size and life budget of the games shown; a replay brings its own
+        self.rules = episode.rules if episode is not None else rules if rules is not None else DEFAULT_RULES
+        self.board = BoardRenderer(self.rules.width, self.rules.height,
+                                   cell_size=max(1, min(WIDTH // self.rules.width, HEIGHT // self.rules.height)))
+        self.human_controlled = human_controlled
+        self.use_evolution = use_evolution
+        self.population_size = population_size
+        # Play back a recorded snakeai.replay Episode instead of a live snake
+        self.player = EpisodePlayer(episode) if episode is not None else None
+        self.running = True
+
+        # Simulation steps per second at 1x speed, based on mode
+        if human_controlled:
+            self.fps = 10  # Slower for human control
+        elif use_evolution:
+            self.fps = 15  # Medium for evolution
+        else:
+            self.fps = 20  # Faster for AI watching
+        self.speed_index = 0  # Into SPEEDS
+
+        if use_evolution:
+            # G shows the population's games side by side instead of the champion
+            self.grid_view = False
+            self.tiles = TileRenderer(min(population_size, MAX_TILES), (WIDTH, HEIGHT - 80), self.rules.width,
+                                      self.rules.height)
+            self.trainer = None
+            self.start_training()
+        elif self.player is not None:
+            self.frame_index = 0
+            self.snake = self.player.frame(0)
+            self.training_mode = False
+        else:
+            self.snake = SmartSnake(rules=self.rules)
+            self.training_mode = False
+            if human_controlled:
+                self.snake = SmartSnake(rules=self.rules)  # For human play, just track position
+
+    def handle_events(self):
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                self.running = False
+            elif event.type == pygame.KEYDOWN:
+                if event.key in (pygame.K_PLUS, pygame.K_EQUALS, pygame.K_KP_PLUS):
+                    self.speed_index = min(self.speed_index + 1, len(SPEEDS) - 1)
+                elif event.key in (pygame.K_MINUS, pygame.K_KP_MINUS):
+                    self.speed_index = max(self.speed_index - 1, 0)
+                elif self.human_controlled:
+                    if event.key == pygame.K_UP and self.snake.direction != (0, 1):
+                        self.snake.direction = (0, -1)
+                    elif event.key == pygame.K_DOWN and self.snake.direction != (0, -1):
+                        self.snake.direction = (0, 1)
+                    elif event.key == pygame.K_LEFT and self.snake.direction != (1, 0):
+                        self.snake.direction = (-1, 0)
+                    elif event.key == pygame.K_RIGHT and self.snake.direction != (-1, 0):
+                        self.snake.direction = (1, 0)
+                    elif event.key == pygame.K_r:
+                        self.snake.reset()
+                elif self.player is not None:
+                    # R restarts the replay, Left/Right seek 50 moves
+                    if event.key == pygame.K_r:
+                        self.seek(0)
+                    elif event.key == pygame.K_LEFT:
+                        self.seek(self.frame_index - 50)
+                    elif event.key == pygame.K_RIGHT:
+                        self.seek(self.frame_index + 50)
+                else:
+                    if event.key == pygame.K_r:
+                        if self.use_evolution:
+                            self.start_training()
+                        else:
+                            self.snake.reset()
+                    elif event.key == pygame.K_t and self.use_evolution:
+                        # Watching pauses the worker after its current generation
+                        self.training_mode = not self.training_mode
+                        if self.training_mode:
+                            self.trainer.resume()
+                        else:
+                            self.trainer.pause()
+                    elif event.key == pygame.K_g and self.use_evolution:
+                        self.grid_view = not self.grid_view
+                        self.grid_env = None
+                    elif event.key == pygame.K_SPACE and self.use_evolution:
+                        # Continue training if space is pressed while watching or after training completes
+                        if not (self.training_mode and self.training):
+                            self.training_mode = True
+                            self.trainer.resume()
+                            self.train_more(5)  # Train 5 more generations
+
+    def seek(self, frame_index):
+        self.frame_index = min(max(frame_index, 0), len(self.player) - 1)
+        self.snake = self.player.frame(self.frame_index)
+
+    def start_training(self):
+        """Evolve a new population from scratch in a background TrainingWorker"""
+        if self.trainer is not None:
+            self.trainer.close()
+        self.trainer = TrainingWorker(preview=self.tiles.num_games, population_size=self.population_size,
+                                      batched=True, rules=self.rules)
+        self.generation = 0
+        self.best_snake = None
+        self.best_seed = None
+        self.best_fitness = 0
+        self.population_genomes = None  # The first members of the population being trained
+        self.grid_env = None
+        self.training_mode = True
+        self.training_generations = 0
+        self.train_more(10)
+
+    def train_more(self, generations):
+        self.training_start = self.generation
+        self.training_generations = self.generation + generations
+        self.trainer.train(self.training_generations)
+
+    @property
+    def training(self):
+        """Whether the worker still has generations to evolve"""
+        return self.generation < self.training_generations
+
+    def receive_training(self):
+        """Take in what the worker published since the last frame"""
+        for message in self.trainer.poll():
+            self.generation = message["generation"]
+            self.population_genomes = message["genomes"]
+            stats = message["stats"]
+            if stats is not None and stats["best_fitness"] > self.best_fitness:
+                # Hot-swap the watched champion for the better one
+                brain = ImprovedNeuralNetwork()
+                brain.set_weights(message["champion"])
+                self.best_snake = SmartSnake(brain=brain, rules=self.rules)
+                self.best_seed = message["champion_seed"]
+                self.best_fitness = stats["best_fitness"]
+                self.restart_champion()
+
+            # Stop after the requested training generations
+            if self.generation == self.training_generations and self.training_mode:
+                self.training_mode = False
+                print(f"Training completed! Best score: {stats['best_score']}")
+
+    def start_grid(self):
+        """Start new games for the first population members shown in the grid view"""
+        self.grid_brains = PopulationBrain.from_genomes(self.population_genomes)
+        self.grid_env = BatchSnakeEnv(len(self.population_genomes), rules=self.rules)
+
+    def step_grid(self):
+        """One move of every grid game; finished grids restart with the latest population"""
+        if self.grid_env is None or len(self.grid_env.alive_games()) == 0:
+            if self.population_genomes is None:
+                return False
+            self.start_grid()
+        env = self.grid_env
+        games = env.alive_games()
+        env.think(games, self.grid_brains.forward(env.look(games), games))
+        env.move()
+        return True
+
+    def restart_champion(self):
+        """Watch the champion's own game again: the same food seed gives the same moves"""
+        self.best_snake.rng = np.random.default_rng(self.best_seed)
+        self.best_snake.reset()
+
+    def draw(self):
+        self.screen.fill(BLACK)
+
+        if self.use_evolution:
+            if self.grid_view:
+                self.draw_grid()
+            elif self.training_mode:
+                # Show training info with progress
+                if self.training:
+                    title = f"Training Generation {self.generation + 1}/{self.training_generations}"
+                    status = "AI is learning... Please wait"
+                else:
+                    title = f"Trained {self.generation} generations"
+                    status = "Press Space to train 5 more"
+                text = self.text.render(title, 36, WHITE)
+                self.screen.blit(text, (WIDTH//2 - 200, HEIGHT//2 - 30))
+
+                progress_text = self.text.render(status, 24, WHITE)
+                self.screen.blit(progress_text, (WIDTH//2 - 140, HEIGHT//2))
+
+                controls_text = self.text.render("Press T to pause and watch the best AI, G for the population", 24,
+                                                 WHITE)
+                self.screen.blit(controls_text, (WIDTH//2 - 150, HEIGHT//2 + 30))
+
+                # Show training progress bar
+                bar_width = 300
+                bar_height = 20
+                bar_x = WIDTH//2 - bar_width//2
+                bar_y = HEIGHT//2 + 70
+                progress = (self.generation - self.training_start) / (self.training_generations - self.training_start)
+
+                pygame.draw.rect(self.screen, WHITE, (bar_x, bar_y, bar_width, bar_height), 2)
+                pygame.draw.rect(self.screen, GREEN, (bar_x, bar_y, int(bar_width * progress), bar_height))
+
+            else:
+                # Show the best snake playing
+                if self.best_snake:
+                    self.draw_snake(self.best_snake)
+                    self.draw_info(self.best_snake)
+                else:
+                    # Show waiting message
+                    text = self.text.render("Waiting for the first champion...", 36, WHITE)
+                    self.screen.blit(text, (WIDTH//2 - 250, HEIGHT//2))
+        else:
+            # Single snake mode
+            self.draw_snake(self.snake)
+            self.draw_info(self.snake)
+
+        pygame.display.flip()
+
+    def draw_grid(self):
+        env = self.grid_env
+        if env is None:
+            header = "Population - waiting for the worker..."
+        else:
+            self.tiles.draw(self.screen, env, position=((WIDTH - self.tiles.scaled.get_width()) // 2, 40))
+            alive = env.num_games - int(env.dead.sum())
+            header = f"Population - Gen {self.generation} | Alive {alive}/{env.num_games} | Best score {env.score.max()}"
+        if self.training:
+            header += f" | Training {self.generation}/{self.training_generations}"
+            if not self.training_mode:
+                header += " (paused)"
+        self.screen.blit(self.text.render(header, 36 if env is None else 24, YELLOW), (10, 10))
+        controls_text = self.text.render("G: Champion | T: Pause/Resume Training | R: Restart | +/-: Speed", 24, WHITE)
+        self.screen.blit(controls_text, (10, HEIGHT - 30))
+
+    def draw_snake(self, snake):
+        # Snake (head green, body white) and food (red) in one blit
+        self.board.draw(self.screen, snake)
+
+    def draw_info(self, snake, mode_text=None):
+        # Determine correct mode text
+        if mode_text is None:
+            if self.human_controlled:
+                display_text = "Human Control"
+            elif self.player is not None:
+                display_text = f"Replay - Move {self.frame_index}/{len(self.player) - 1}"
+            elif self.use_evolution:
+                if self.training_mode:
+                    display_text = f"Training Generation {self.generation}"
+                else:
+                    display_text = f"AI Control - Gen {self.generation}"
+            else:
+                display_text = "AI Control"
+        else:
+            display_text = mode_text
+
+        # Mode
+        mode_text_render = self.text.render(display_text, 36, YELLOW)
+        self.screen.blit(mode_text_render, (10, 10))
+
+        # Score
+        score_text = self.text.render(f"Score: {snake.score}", 36, WHITE)
+        self.screen.blit(score_text, (10, 50))
+
+        # Life left
+        life_text = self.text.render(f"Life: {snake.life_left}", 36, WHITE)
+        self.screen.blit(life_text, (10, 90))
+
+        # Simulation speed
+        speed = SPEEDS[self.speed_index]
+        speed_text = self.text.render(f"Speed: {speed}x" if speed else "Speed: max", 36, WHITE)
+        self.screen.blit(speed_text, (10, 130))
+
+        # Controls - show different controls based on mode
+        if self.human_controlled:
+            controls_text = self.text.render("Arrow Keys: Move | R: Reset | +/-: Speed", 24, WHITE)
+        elif self.player is not None:
+            controls_text = self.text.render("Left/Right: Seek | R: Restart | +/-: Speed", 24, WHITE)
+        elif self.use_evolution:
+            if self.training_mode:
+                controls_text = self.text.render("Training... | T: Pause and Watch | R: Restart Training", 24, WHITE)
+            else:
+                controls_text = self.text.render("T: Resume Training | Space: +5 Gens | R: Restart | G: Grid | +/-: Speed",
+                                                 24, WHITE)
+        else:
+            controls_text = self.text.render("R: Reset | +/-: Speed", 24, WHITE)
+
+        self.screen.blit(controls_text, (10, HEIGHT - 30))
+
+        if snake.dead:
+            dead_text = self.text.render("GAME OVER", 36, RED)
+            text_rect = dead_text.get_rect(center=(WIDTH//2, HEIGHT//2))
+            self.screen.blit(dead_text, text_rect)
+
+            restart_text = self.text.render("Press R to restart", 24, WHITE)
+            restart_rect = restart_text.get_rect(center=(WIDTH//2, HEIGHT//2 + 30))
+            self.screen.blit(restart_text, restart_rect)
+
+    def update(self):
+        """Advance the watched game by one step, returning False if it has nothing left to do"""
+        if self.human_controlled:
+            # Human control - just move snake based on input
+            if self.snake.dead:
+                return False
+            self.snake.move()
+        elif self.player is not None:
+            if self.frame_index == len(self.player) - 1:
+                return False
+            self.frame_index += 1
+            self.snake = self.player.frame(self.frame_index)
+        elif self.use_evolution:
+            if self.grid_view:
+                return self.step_grid()
+            if self.training_mode or not self.best_snake:
+                return False
+            # Show the best snake playing
+            if not self.best_snake.dead:
+                self.best_snake.think()
+                self.best_snake.move()
+            else:
+                # If snake dies, reset it to watch again
+                self.restart_champion()
+        else:
+            # Single AI snake
+            if self.snake.dead:
+                return False
+            self.snake.think()
+            self.snake.move()
+        return True
+
+    def simulate(self, lag):
+        """Run the steps due after lag seconds at the current speed, returning the time left over
+
+        Steps are a fixed 1 / (fps * speed) seconds apart. The simulation gets
+        at most FRAME_BUDGET per frame; whatever it cannot catch up on within
+        that is dropped, so the window keeps redrawing at RENDER_FPS.
+        """
+        deadline = time.perf_counter() + FRAME_BUDGET
+        speed = SPEEDS[self.speed_index]
+        if speed is None:
+            while time.perf_counter() < deadline and self.update():
+                pass
+            return 0.0
+
+        step_time = 1.0 / (self.fps * speed)
+        while lag >= step_time:
+            if time.perf_counter() >= deadline or not self.update():
+                return 0.0
+            lag -= step_time
+        return lag
+
+    def run(self):
+        lag = 0.0  # Simulation time owed to the watched game
+        previous = time.perf_counter()
+        while self.running:
+            self.handle_events()
+            if self.use_evolution:
+                self.receive_training()
+
+            now = time.perf_counter()
+            lag = self.simulate(lag + now - previous)
+            previous = now
+
+            self.draw()
+            self.clock.tick(RENDER_FPS)
+
+        if self.use_evolution:
+            self.trainer.close()
+        pygame.quit()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+
+import random
+
+import numpy as np
+import pytest
+
+from snakeai import GameRules, SimpleEvolution
+
+def genomes(evolution):
+    return np.stack([snake.brain.get_weights() for snake in evolution.population])
+
+def test_resume_is_bit_for_bit(tmp_path):
+    path = tmp_path / "run.npz"
+    random.seed(8)
+    np.random.seed(8)
+
+    evolution = SimpleEvolution(population_size=6, batched=True, seed=8, verbose=False,
+                                checkpoint_path=path, checkpoint_every=2)
+    for _ in range(2):
+        evolution.evolve_one_generation()
+    evolution.checkpoint_path = None
+    expected = []
+    for _ in range(2):
+        evolution.evolve_one_generation()
+        expected.append(evolution.stats["best_fitness"])
+
+    # The global generators play no part in the run
+    random.seed(0)
+    np.random.seed(0)
+    resumed = SimpleEvolution.resume(path, population_size=6, batched=True, verbose=False)
+    assert resumed.generation == 2
+    actual = []
+    for _ in range(2):
+        resumed.evolve_one_generation()
+        actual.append(resumed.stats["best_fitness"])
+
+    assert actual == expected
+    assert np.array_equal(genomes(resumed), genomes(evolution))
+
+def test_resume_keeps_the_fitness_cache(tmp_path):
+    path = tmp_path / "run.npz"
+    evolution = SimpleEvolution(population_size=6, batched=True, seed=2, verbose=False, shared_seed=True,
+                                checkpoint_path=path)
+    evolution.evolve_one_generation()
+    saved = list(evolution.fitness_cache.entries.items())
+    evolution.checkpoint_path = None
+    evolution.evolve_one_generation()
+
+    resumed = SimpleEvolution.resume(path, population_size=6, batched=True, verbose=False, shared_seed=True)
+    assert list(resumed.fitness_cache.entries.items()) == saved
+    resumed.evolve_one_generation()
+    for name in ("cache_hits", "steps", "total_steps", "best_fitness"):
+        assert resumed.stats[name] == evolution.stats[name]
+    assert evolution.stats["cache_hits"] > 0
+    assert resumed.fitness_cache.entries == evolution.fitness_cache.entries
+    assert (resumed.fitness_cache.hits, resumed.fitness_cache.misses) == (evolution.fitness_cache.hits,
+                                                                          evolution.fitness_cache.misses)
+
+def test_resume_restores_generators(tmp_path):
+    path = tmp_path / "run.npz"
+    evolution = SimpleEvolution(population_size=3, verbose=False)
+    evolution.game_seeds()
+    evolution.save(path)
+
+    resumed = SimpleEvolution.resume(path, population_size=3, verbose=False)
+    assert resumed.rng.bit_generator.state == evolution.rng.bit_generator.state
+    assert ([seed.spawn_key for seed in resumed.game_seeds()]
+            == [seed.spawn_key for seed in evolution.game_seeds()])
+    assert resumed.game_seeds()[0].entropy == evolution.seed_sequence.entropy
+
+def test_resume_keeps_the_board(tmp_path):
+    path = tmp_path / "run.npz"
+    rules = GameRules(width=12, height=12, start_life=120)
+    evolution = SimpleEvolution(population_size=6, batched=True, seed=3, verbose=False, rules=rules)
+    evolution.evolve_one_generation()
+    evolution.save(path)
+    evolution.evolve_one_generation()
+
+    # Resumed without rules, the run continues on its own board
+    resumed = SimpleEvolution.resume(path, population_size=6, batched=True, verbose=False)
+    assert resumed.rules == rules
+    assert all(snake.rules == rules for snake in resumed.population)
+    resumed.evolve_one_generation()
+    assert resumed.stats["best_fitness"] == evolution.stats["best_fitness"]
+    assert resumed.total_steps == evolution.total_steps
+
+    with pytest.raises(ValueError, match="was saved playing by"):
+        SimpleEvolution.resume(path, population_size=6, verbose=False, rules=GameRules(width=20, height=20))
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+
+import json
+import os
+import pstats
+import subprocess
+import sys
+
+from snakeai.benchmark import compare_results
+from snakeai.cli import main
+
+def test_train_streams_jsonl(tmp_path):
+    path = tmp_path / "stats.jsonl"
+    main(["train", "--generations", "2", "--population", "6", "--seed", "5", "--jsonl", str(path)])
+
+    stats = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [row["generation"] for row in stats] == [0, 1]
+    assert all(row["best_fitness"] >= row["average_fitness"] for row in stats)
+
+def test_headless_modules_do_not_import_pygame():
+    code = "import sys, snakeai, snakeai.cli; sys.exit('pygame' in sys.modules)"
+    root = os.path.dirname(os.path.abspath(__file__))
+    assert subprocess.run([sys.executable, "-c", code], cwd=root).returncode == 0
+
+def test_bench_writes_comparable_results(tmp_path):
+    path = tmp_path / "bench.json"
+    main(["bench", "--lengths", "1", "50", "--populations", "6", "--engines", "batched",
+          "--repeat", "1", "--output", str(path)])
+
+    document = json.loads(path.read_text())
+    names = {entry["name"] for entry in document["results"]}
+    assert {"SmartSnake.look", "SmartSnake.think", "SmartSnake.move", "ImprovedNeuralNetwork.forward",
+            "BatchSnakeEnv.step", "SimpleEvolution.evolve_one_generation"} <= names
+    assert all(entry["seconds"] > 0 for entry in document["results"])
+
+    slower = {"results": [dict(entry, seconds=entry["seconds"] * 2) for entry in document["results"]]}
+    rows = compare_results(document, slower)
+    assert len(rows) == len(document["results"])
+    assert all(regressed for *_, regressed in rows)
+
+def test_train_profiles_a_chosen_generation(tmp_path):
+    prefix = tmp_path / "run"
+    path = tmp_path / "stats.jsonl"
+    main(["train", "--generations", "2", "--population", "6", "--seed", "5", "--jsonl", str(path),
+          "--profile-generation", "1", "--profile-prefix", str(prefix)])
+
+    stats = [json.loads(line) for line in path.read_text().splitlines()]
+    for row in stats:
+        profile = row["profile"]
+        assert {"select", "play", "breed", "look", "forward", "think", "move"} <= set(profile)
+        assert profile["look"]["calls"] == profile["think"]["calls"] > 0
+        assert profile["play"]["seconds"] <= row["seconds"]
+
+    assert not (tmp_path / "run-gen0.pstats").exists()
+    pstats.Stats(str(tmp_path / "run-gen1.pstats"))
+    folded = (tmp_path / "run-gen1.folded").read_text().splitlines()
+    assert "play;look" in [line.rsplit(" ", 1)[0] for line in folded]
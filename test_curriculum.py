@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+
+import numpy as np
+import pytest
+
+from snakeai import GameRules, SimpleEvolution
+from snakeai.cli import main
+from snakeai.curriculum import Curriculum
+
+SMALL = GameRules(width=8, height=8, start_life=60, food_life=40, max_life=120, max_hunger=40,
+                  food_margin=1, food_distance=2)
+MEDIUM = GameRules(width=16, height=12, start_life=120, food_life=60, max_life=240, max_hunger=60,
+                   food_margin=1, food_distance=3)
+
+def test_stages_advance_on_the_median_score():
+    curriculum = Curriculum([(SMALL, 3), (MEDIUM, 5), (GameRules(), None)], min_generations=1)
+    assert not curriculum.record(0, [0, 1, 9], 100)  # Median 1
+    assert curriculum.record(1, [2, 3, 4], 50)
+    assert curriculum.rules is MEDIUM and curriculum.threshold == 5
+    assert curriculum.record(2, [5, 5, 5], 70)
+    assert not curriculum.record(3, [40, 40, 40], 90)  # The last stage never ends
+    assert curriculum.stage == 2
+
+    first = curriculum.history[0]
+    assert (first["board"], first["generations"], first["steps"], first["best_score"]) == ("8x8", 2, 150, 9)
+    assert [entry["first_generation"] for entry in curriculum.history] == [0, 2, 3]
+
+    with pytest.raises(ValueError):
+        Curriculum([(SMALL, None), (MEDIUM, None)])
+
+def test_stage_holds_the_population_back():
+    curriculum = Curriculum([(SMALL, 3), (GameRules(), None)], min_generations=3)
+    assert not any(curriculum.record(generation, [5, 5, 5], 10) for generation in range(2))  # Too early
+    assert not curriculum.record(2, [0, 1, 9], 10)  # Median under the threshold
+    assert curriculum.record(3, [3, 4, 5], 10)
+    assert curriculum.history[0]["generations"] == 4
+
+    # The default stages keep a fresh population on the small board
+    evolution = SimpleEvolution(population_size=10, batched=True, seed=1, verbose=False, curriculum=Curriculum())
+    for _ in range(3):
+        evolution.evolve_one_generation()
+    assert evolution.curriculum.stage == 0 and evolution.rules.width == 10
+
+def test_evolution_moves_to_the_next_board():
+    results = []
+    for batched in (False, True):
+        evolution = SimpleEvolution(population_size=8, batched=batched, seed=4, verbose=False, shared_seed=True,
+                                    curriculum=Curriculum([(SMALL, 0), (MEDIUM, None)], min_generations=1))
+        evolution.evolve_one_generation()
+        assert evolution.stats["stage"] == 0 and evolution.stats["board"] == "8x8"
+        assert evolution.rules is MEDIUM
+        assert all(snake.rules is MEDIUM for snake in evolution.population)
+        assert len(evolution.fitness_cache) == 0  # Small-board results do not carry over
+
+        evolution.evolve_one_generation()
+        assert evolution.stats["stage"] == 1 and evolution.stats["cache_hits"] == 0
+        steps = [entry["steps"] for entry in evolution.curriculum.history]
+        assert sum(steps) == evolution.total_steps > 0
+        results.append((steps, evolution.stats["best_fitness"]))
+    assert results[0] == results[1]
+
+def test_resume_continues_at_the_saved_stage(tmp_path):
+    path = tmp_path / "run.npz"
+    stages = [(SMALL, 0), (MEDIUM, None)]
+    evolution = SimpleEvolution(population_size=6, batched=True, seed=5, verbose=False,
+                                curriculum=Curriculum(stages, min_generations=1), checkpoint_path=path)
+    evolution.evolve_one_generation()
+    evolution.checkpoint_path = None
+    evolution.evolve_one_generation()
+
+    resumed = SimpleEvolution.resume(path, population_size=6, batched=True, verbose=False,
+                                     curriculum=Curriculum(stages, min_generations=1))
+    assert resumed.rules is MEDIUM and resumed.curriculum.history == evolution.curriculum.history[:1]
+    resumed.evolve_one_generation()
+    assert resumed.stats["best_fitness"] == evolution.stats["best_fitness"]
+    assert resumed.total_steps == evolution.total_steps
+    assert np.array_equal(resumed.genomes, evolution.genomes)
+
+def test_train_runs_the_default_curriculum(capsys):
+    main(["train", "--curriculum", "--generations", "2", "--population", "10", "--seed", "1"])
+    output = capsys.readouterr().out
+    assert "stage 0 (10x10" in output and "Curriculum stages:" in output
+    with pytest.raises(SystemExit):
+        main(["train", "--curriculum", "--board", "20x20"])
@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+
+import numpy as np
+import pytest
+
+from improved_snake_ai import (BatchSnakeEnv, ImprovedNeuralNetwork, PopulationBrain,
+                               SimpleEvolution, SmartSnake, GRID_WIDTH, evaluate_genomes, play_batch)
+from snakeai.snake import DEATH_CAUSES
+from snakeai.cache import FitnessCache
+from snakeai.early_stop import ReachableFitness, StagedEvaluation
+
+def play(snake):
+    """Run a SmartSnake to the end, returning the number of moves"""
+    moves = 0
+    while not snake.dead:
+        snake.think()
+        snake.move()
+        moves += 1
+    return moves
+
+def test_batch_env_matches_smart_snake():
+    seeds = [3, 14, 15, 92, 65]
+    rng = np.random.default_rng(1)
+    brains = [ImprovedNeuralNetwork(rng=rng) for _ in seeds]
+
+    env = BatchSnakeEnv(len(seeds), rngs=[np.random.default_rng(seed) for seed in seeds])
+    games = env.alive_games()
+    while len(games) > 0:
+        vision = env.look(games)
+        outputs = np.vstack([brains[game].forward(vision[i:i+1]) for i, game in enumerate(games)])
+        env.think(games, outputs)
+        env.move()
+        games = env.alive_games()
+
+    for game, (seed, brain) in enumerate(zip(seeds, brains)):
+        snake = SmartSnake(brain=brain, rng=np.random.default_rng(seed))
+        moves = play(snake)
+
+        assert env.steps[game] == moves
+        assert env.score[game] == snake.score
+        assert env.life_left[game] == snake.life_left
+        assert env.moves_without_food[game] == snake.moves_without_food
+        assert env.body(game) == snake.body
+        assert divmod(int(env.food[game]), GRID_WIDTH) == (snake.food[1], snake.food[0])
+
+def test_batch_env_vision_matches_look():
+    snake = SmartSnake(rng=np.random.default_rng(7))
+    env = BatchSnakeEnv(1, rngs=[np.random.default_rng(7)])
+    for _ in range(30):
+        assert np.array_equal(env.look(env.alive_games())[0], np.array(snake.look()))
+        snake.think()
+        env.think(env.alive_games(), snake.brain.forward(env.look(env.alive_games())))
+        snake.move()
+        env.move()
+
+def test_population_brain_matches_forward():
+    rng = np.random.default_rng(2)
+    brains = [ImprovedNeuralNetwork(rng=rng) for _ in range(10)]
+    population = PopulationBrain(brains)
+    x = rng.random((10, 24))
+
+    outputs = population.forward(x)
+    for i, brain in enumerate(brains):
+        assert np.array_equal(outputs[i], brain.forward(x[i:i+1])[0])
+
+    # A subset of individuals, each with its own input row
+    individuals = np.array([7, 2, 2])
+    outputs = population.forward(x[:3], individuals)
+    for row, individual in enumerate(individuals):
+        assert np.array_equal(outputs[row], brains[individual].forward(x[row:row+1])[0])
+
+def test_parallel_evaluation_is_independent_of_workers():
+    results = []
+    for workers in (1, 3):
+        evolution = SimpleEvolution(population_size=6, workers=workers, seed=11)
+        try:
+            evolution.run_parallel()
+        finally:
+            evolution.close()
+        results.append([(snake.score, snake.fitness) for snake in evolution.population])
+
+    evolution = SimpleEvolution(population_size=6, batched=True, seed=11)
+    evolution.run_batched()
+    results.append([(snake.score, snake.fitness) for snake in evolution.population])
+
+    assert results[0] == results[1] == results[2]
+
+def test_seed_fixes_the_whole_run():
+    np.random.seed(0)
+    runs = []
+    for batched in (False, True):
+        evolution = SimpleEvolution(population_size=8, batched=batched, seed=21, verbose=False)
+        for _ in range(3):
+            evolution.evolve_one_generation()
+        runs.append(np.stack([snake.brain.get_weights() for snake in evolution.population]))
+        # The global generators play no part
+        np.random.seed(1)
+
+    assert np.array_equal(runs[0], runs[1])
+
+def test_fitness_is_a_function_of_weights_and_seed():
+    genomes = np.stack([ImprovedNeuralNetwork(rng=np.random.default_rng(5)).get_weights()] * 3)
+    seeds = np.random.SeedSequence(6).spawn(2)
+    first = evaluate_genomes(genomes, [seeds[0], seeds[1], seeds[0]])
+    second = evaluate_genomes(genomes[:1], [seeds[0]])
+
+    assert first[2][0] == first[2][2] == second[2][0]
+    assert first[1][0] == second[1][0]
+
+def test_look_reads_occupancy_grid():
+    snake = SmartSnake(rng=np.random.default_rng(0))
+    # Head at (10, 10) with the body bending back above it
+    snake.body = [(10, 10), (11, 10), (11, 9), (11, 8), (10, 8)]
+    snake.food = (10, 4)
+
+    up = snake.look_in_direction(0, -1)
+    assert up == [1.0 / 20, 1.0 / 20, 1.0 / 11]
+    right = snake.look_in_direction(1, 0)
+    assert right == [0, 1.0 / 20, 1.0 / (GRID_WIDTH - 10)]
+
+    # Moving keeps the grid in sync with the body
+    snake.direction = (-1, 0)
+    snake.move()
+    assert snake.body == [(9, 10), (10, 10), (11, 10), (11, 9), (11, 8)]
+    assert sum(snake.grid) == len(snake.body)
+    assert snake.look_in_direction(1, -1)[1] == 1.0 / 20
+
+def test_body_collisions_use_grid():
+    snake = SmartSnake(rng=np.random.default_rng(0))
+    snake.body = [(5, 5), (5, 6), (6, 6), (6, 5)]
+    snake.food = (20, 20)
+
+    # The tail still counts as body until it moves away
+    assert not snake.is_safe_direction((1, 0))
+    assert not snake.is_safe_direction((0, 1))
+    assert snake.is_safe_direction((0, -1))
+
+    snake.direction = (1, 0)
+    snake.move()
+    assert snake.dead
+    assert isinstance(snake.body, list)
+
+    # Segments must touch, the body hash links each one to the segment ahead
+    with pytest.raises(ValueError, match="not adjacent"):
+        snake.body = [(5, 5), (7, 5)]
+
+def test_fitness_cache_skips_unchanged_genomes():
+    evolution = SimpleEvolution(population_size=6, batched=True, seed=13, verbose=False, shared_seed=True)
+    evolution.evolve_one_generation()
+    elite = evolution.population[0]
+    expected = evolution.fitness_cache.get(evolution.fitness_cache.key(elite.brain.get_weights(),
+                                                                        evolution.game_seed_sequence))
+
+    evolution.evolve_one_generation()
+    assert evolution.stats["cache_hits"] >= 1
+    assert (elite.score, elite.fitness, elite.life_left, elite.moves_without_food) == expected
+
+    # A cached result is exactly what replaying the game gives
+    snake = elite.clone()
+    evolution.run_sequential([snake], [evolution.game_seed_sequence])
+    assert (snake.score, snake.fitness) == (elite.score, elite.fitness)
+
+def test_fitness_cache_is_skipped_without_a_shared_seed():
+    evolution = SimpleEvolution(population_size=6, batched=True, seed=13, verbose=False)
+    for _ in range(2):
+        evolution.evolve_one_generation()
+    # Fresh seeds never repeat, so nothing is looked up or stored
+    assert (evolution.fitness_cache.hits, evolution.fitness_cache.misses, len(evolution.fitness_cache)) == (0, 0, 0)
+
+def test_fitness_cache_evicts_least_recently_used():
+    cache = FitnessCache(max_size=2)
+    keys = [cache.key(np.full(3, value), 7) for value in (0.0, 1.0, 2.0)]
+    cache.put(keys[0], (0, 1, 0, 0))
+    cache.put(keys[1], (1, 1, 0, 0))
+    assert cache.get(keys[0]) == (0, 1, 0, 0)
+    cache.put(keys[2], (2, 1, 0, 0))
+
+    assert cache.get(keys[1]) is None
+    assert len(cache) == 2
+    assert (cache.hits, cache.misses) == (1, 1)
+
+def test_breed_works_in_place_on_the_genome_matrix():
+    evolution = SimpleEvolution(population_size=12, seed=17, verbose=False)
+    for i, snake in enumerate(evolution.population):
+        snake.fitness = i + 1
+    snakes = list(evolution.population)
+    buffers = {id(evolution.genomes), id(evolution.next_genomes)}
+    parents = evolution.genomes.copy()
+
+    evolution.breed(11, evolution.draw_tournaments(22), mutation_rate=0)
+
+    # Same snake objects and buffers, now viewing the bred rows
+    assert evolution.population == snakes
+    assert {id(evolution.genomes), id(evolution.next_genomes)} == buffers
+    assert evolution.genomes.dtype == np.float32
+    assert np.shares_memory(evolution.population[3].brain.weights2, evolution.genomes)
+    assert np.array_equal(evolution.genomes[0], parents[11])
+
+    # Without mutation every child weight comes from a parent
+    weights = evolution.genomes[1:, :evolution.weight_size]
+    assert all(np.isin(child, parents[:, :evolution.weight_size]).all() for child in weights)
+    assert np.abs(weights).max() <= 2
+
+def test_reachable_fitness_stopping_keeps_the_run_identical():
+    runs = []
+    for early_stop in (None, ReachableFitness()):
+        evolution = SimpleEvolution(population_size=40, batched=True, seed=2, verbose=False,
+                                    early_stop=early_stop, verify_early_stop=True)
+        stopped = 0
+        for _ in range(3):
+            evolution.evolve_one_generation()
+            if early_stop is not None:
+                assert evolution.stats["parents_unchanged"] is True
+                assert evolution.stats["steps_saved"] >= 0
+                stopped += evolution.stats["stopped_games"]
+        runs.append(evolution.genomes.copy())
+
+    assert stopped > 0
+    assert np.array_equal(runs[0], runs[1])
+
+def test_staged_evaluation_reports_saved_steps():
+    evolution = SimpleEvolution(population_size=20, batched=True, seed=3, verbose=False,
+                                early_stop=StagedEvaluation(horizon=50, keep=0.25), verify_early_stop=True)
+    evolution.evolve_one_generation()
+
+    assert evolution.stats["stopped_games"] >= 10
+    assert evolution.stats["steps_saved"] > 0
+    assert evolution.stats["parents_unchanged"] in (True, False)
+
+def test_loop_detection_ends_circling_snakes_with_the_same_fitness():
+    results = []
+    for detect_loops in (False, True):
+        snake = SmartSnake(rng=np.random.default_rng(0), detect_loops=detect_loops)
+        moves = 0
+        while not snake.dead:
+            # Circle around a 2 x 2 square forever
+            snake.direction = [(0, 1), (-1, 0), (0, -1), (1, 0)][moves % 4]
+            snake.move()
+            moves += 1
+        snake.calculate_fitness()
+        results.append((snake.score, snake.life_left, snake.moves_without_food, snake.fitness))
+
+        if detect_loops:
+            assert snake.death_cause == "loop"
+            assert moves == 4
+        else:
+            assert snake.death_cause == "starvation"
+            assert moves == 101
+
+    assert results[0] == results[1]
+
+def test_batch_loop_detection_matches_smart_snake():
+    rng = np.random.default_rng(0)
+    brains = [ImprovedNeuralNetwork(rng=rng) for _ in range(20)]
+    for brain in brains:
+        brain.weights3 *= 10  # Confident outputs skip the heuristics, and some of these loop
+    seeds = np.random.SeedSequence(0).spawn(len(brains))
+    envs = [play_batch(PopulationBrain(brains), [np.random.default_rng(seed) for seed in seeds],
+                       detect_loops=detect_loops) for detect_loops in (False, True)]
+    assert np.array_equal(envs[0].calculate_fitness(), envs[1].calculate_fitness())
+    assert np.array_equal(envs[0].steps, envs[1].steps)
+    assert (envs[1].death_cause == DEATH_CAUSES.index("loop")).any()
+
+    for game, (brain, seed) in enumerate(zip(brains, seeds)):
+        snake = SmartSnake(brain=brain, rng=np.random.default_rng(seed), detect_loops=True)
+        play(snake)
+        assert snake.body == envs[1].body(game)
+        assert snake.death_cause == DEATH_CAUSES[envs[1].death_cause[game]]
+
+        # The incrementally updated hash matches one computed from scratch
+        body_hash = snake.body_hash
+        snake.body = snake.body
+        assert snake.body_hash == body_hash == envs[1].body_hash[game]
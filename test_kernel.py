@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+
+import numpy as np
+import pytest
+
+from snakeai import BatchSnakeEnv, GameRules, ImprovedNeuralNetwork, PopulationBrain, SmartSnake, play_batch
+from snakeai import kernel
+
+# The uncompiled kernels always run; the compiled ones only where Numba is installed
+BACKENDS = ["python", pytest.param("numba", marks=pytest.mark.skipif(kernel.numba is None,
+                                                                     reason="Numba is not installed"))]
+SMALL_RULES = GameRules(width=10, height=8, start_life=60, food_life=30, max_life=90, max_hunger=40,
+                        food_margin=1, food_distance=2)
+
+def make_brains(count, seed):
+    rng = np.random.default_rng(seed)
+    return [ImprovedNeuralNetwork(rng=rng) for _ in range(count)]
+
+@pytest.mark.parametrize("backend", BACKENDS)
+@pytest.mark.parametrize("rules", [None, SMALL_RULES])
+def test_kernel_steps_match_smart_snake(backend, rules):
+    seeds = [3, 14, 15, 92]
+    brains = make_brains(len(seeds), 1)
+    snakes = [SmartSnake(brain=brain, rng=np.random.default_rng(seed), rules=rules)
+              for seed, brain in zip(seeds, brains)]
+    env = BatchSnakeEnv(len(seeds), rngs=[np.random.default_rng(seed) for seed in seeds], rules=rules,
+                        backend=backend)
+    assert env.backend == backend
+
+    # Compare vision and the whole state after every step
+    games = env.alive_games()
+    while len(games) > 0:
+        vision = env.look(games)
+        for row, game in enumerate(games):
+            assert np.array_equal(vision[row], snakes[game].look())
+            snakes[game].think()
+        env.think(games, np.vstack([brains[game].forward(vision[row:row+1]) for row, game in enumerate(games)]))
+        env.move()
+        for game in games:
+            snakes[game].move()
+            assert env.body(game) == snakes[game].body
+            assert divmod(int(env.food[game]), env.width) == (snakes[game].food[1], snakes[game].food[0])
+            assert env.body_hash[game] == snakes[game].body_hash
+            assert (env.life_left[game], env.moves_without_food[game]) == (snakes[game].life_left,
+                                                                          snakes[game].moves_without_food)
+            assert bool(env.dead[game]) == snakes[game].dead
+        games = env.alive_games()
+
+    for game, snake in enumerate(snakes):
+        snake.calculate_fitness()
+        assert env.score[game] == snake.score
+        assert env.calculate_fitness()[game] == snake.fitness
+        assert kernel.DEATH_CAUSES[env.death_cause[game]] == snake.death_cause
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_kernel_plays_the_same_games_as_numpy(backend):
+    seeds = list(range(20))
+    brains = make_brains(len(seeds), 0)
+    for brain in brains:
+        brain.weights3 *= 10  # Confident outputs skip the heuristics, and some of these loop
+    genomes = np.stack([brain.get_weights() for brain in brains])
+    results = []
+    for engine in ("numpy", backend):
+        env = play_batch(PopulationBrain.from_genomes(genomes), [np.random.default_rng(seed) for seed in seeds],
+                         detect_loops=True, backend=engine)
+        results.append((env.score, env.steps, env.life_left, env.death_cause, env.calculate_fitness()))
+    for expected, actual in zip(*results):
+        assert np.array_equal(expected, actual)
+    assert (results[1][3] == kernel.LOOP).any()
+
+def test_missing_numba_falls_back_to_numpy(monkeypatch):
+    monkeypatch.setattr(kernel, "numba", None)
+    assert kernel.resolve_backend("auto") == "numpy"
+    with pytest.warns(RuntimeWarning):
+        assert BatchSnakeEnv(2, backend="numba").backend == "numpy"
+    with pytest.raises(ValueError):
+        kernel.resolve_backend("cuda")
@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+
+import os
+import numpy as np
+
+from snakeai import (ImprovedNeuralNetwork, ProcessingNeuralNetwork, ProcessingSnake,
+                     load_processing_model, save_processing_model)
+
+GEN64 = os.path.join(os.path.dirname(os.path.abspath(__file__)), "gen64.csv")
+
+def test_gen64_round_trip(tmp_path):
+    network, evolution = load_processing_model(GEN64)
+    assert [layer.shape for layer in network.layers] == [(16, 25), (16, 17), (4, 17)]
+    assert len(evolution) == 65 and evolution[-1] == 75
+
+    path = tmp_path / "model.csv"
+    save_processing_model(path, network, evolution)
+    assert path.read_bytes() == open(GEN64, "rb").read()
+
+def test_export_python_brain(tmp_path):
+    rng = np.random.default_rng(3)
+    brain = ImprovedNeuralNetwork(rng=rng)
+    path = tmp_path / "brain.csv"
+    save_processing_model(path, ProcessingNeuralNetwork.from_brain(brain))
+    network, _ = load_processing_model(path)
+
+    x = rng.random((50, 24))
+    z1 = np.maximum(0, x @ brain.weights1 + brain.bias1)
+    z2 = np.maximum(0, z1 @ brain.weights2 + brain.bias2)
+    z3 = z2 @ brain.weights3 + brain.bias3
+    assert np.allclose(network.forward(x), np.maximum(0, z3), atol=1e-5)
+
+def test_processing_snake_plays_gen64():
+    network, _ = load_processing_model(GEN64)
+    snake = ProcessingSnake(network, rng=np.random.default_rng(4))
+    assert len(snake.look()) == 24
+    while not snake.dead:
+        snake.think()
+        snake.move()
+    assert snake.score > 3
+    assert len(snake.body) == snake.score - 1
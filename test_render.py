@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+
+import os
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import numpy as np
+import pygame
+
+from snakeai import GRID_HEIGHT, GRID_SIZE, GRID_WIDTH, HEIGHT, WIDTH, BatchSnakeEnv, SmartSnake
+from snakeai.benchmark import serpentine_body
+from snakeai.render import DEAD_OFFSET, FOOD, HEAD, TILE_BORDER, BoardRenderer, TextCache, TileRenderer
+
+def test_board_blit_matches_drawing_each_cell():
+    pygame.init()
+    snake = SmartSnake()
+    snake.body = serpentine_body(300)
+    snake.food = (30, 25)
+
+    expected = pygame.Surface((WIDTH, HEIGHT))
+    for i, (x, y) in enumerate(snake.body):
+        pygame.draw.rect(expected, (0, 255, 0) if i == 0 else (255, 255, 255),
+                         (x * GRID_SIZE, y * GRID_SIZE, GRID_SIZE, GRID_SIZE))
+    pygame.draw.rect(expected, (255, 0, 0), (snake.food[0] * GRID_SIZE, snake.food[1] * GRID_SIZE,
+                                              GRID_SIZE, GRID_SIZE))
+
+    drawn = pygame.Surface((WIDTH, HEIGHT))
+    BoardRenderer().draw(drawn, snake)
+    assert np.array_equal(pygame.surfarray.array3d(drawn), pygame.surfarray.array3d(expected))
+
+def test_text_is_rendered_once_per_string():
+    pygame.init()
+    text = TextCache()
+    label = text.render("R: Reset", 24, (255, 255, 255))
+    assert text.render("R: Reset", 24, (255, 255, 255)) is label
+    assert text.render("Score: 1", 24, (255, 255, 255)) is not label
+    assert len(text.fonts) == 1
+
+def test_tiles_place_each_game_in_its_own_cell_block():
+    pygame.init()
+    env = BatchSnakeEnv(7)
+    env.dead[3] = True
+    tiles = TileRenderer(7, (WIDTH, HEIGHT))
+    tiles.render(env)
+
+    texture = pygame.surfarray.array2d(tiles.small)
+    for game in range(7):
+        row, column = divmod(game, tiles.columns)
+        x0, y0 = column * (GRID_WIDTH + 1), row * (GRID_HEIGHT + 1)
+        head_y, head_x = divmod(int(env.head[game]), GRID_WIDTH)
+        food_y, food_x = divmod(int(env.food[game]), GRID_WIDTH)
+        offset = DEAD_OFFSET if game == 3 else 0
+        assert texture[x0 + head_x, y0 + head_y] == HEAD + offset
+        assert texture[x0 + food_x, y0 + food_y] == FOOD + offset
+        assert texture[x0 + GRID_WIDTH, y0] == TILE_BORDER
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+
+import numpy as np
+
+from snakeai import GameRules, SimpleEvolution, SmartSnake
+from snakeai.cli import main
+from snakeai.replay import EpisodePlayer, EpisodeRecorder, read_episodes, write_episodes
+
+def test_player_rebuilds_every_frame(tmp_path):
+    seed = np.random.SeedSequence(4).spawn(3)[2]
+    snake = SmartSnake(rng=np.random.default_rng(seed))
+    recorder = EpisodeRecorder(snake, seed)
+    frames = [(snake.body, snake.food, snake.score, snake.life_left)]
+    while not snake.dead:
+        snake.think()
+        snake.move()
+        recorder.record()
+        frames.append((snake.body, snake.food, snake.score, snake.life_left))
+
+    path = tmp_path / "games.snr"
+    write_episodes(path, [recorder.episode()])
+    write_episodes(path, [recorder.episode()])
+    episodes = list(read_episodes(path))
+    assert len(episodes) == 2
+    episode = episodes[1]
+    assert episode.score == snake.score > 0
+    assert episode.death_cause == snake.death_cause
+
+    # Keyframes every 7 moves, so most frames replay from a snapshot
+    player = EpisodePlayer(episode, keyframe_interval=7)
+    assert len(player) == len(frames)
+    for t in [len(frames) - 1, 0, 5, 7, 8, len(frames) // 2, 3]:
+        replayed = player.frame(t)
+        assert (replayed.body, replayed.food, replayed.score, replayed.life_left) == frames[t]
+
+    # The stored seed regenerates the same food
+    again = SmartSnake(brain=snake.brain, rng=np.random.default_rng(episode.seed))
+    while not again.dead:
+        again.think()
+        again.move()
+    assert again.body == snake.body
+
+def test_batched_and_sequential_recordings_match(tmp_path):
+    logs = []
+    for batched in (False, True):
+        path = tmp_path / f"batched_{batched}.snr"
+        evolution = SimpleEvolution(population_size=6, batched=batched, seed=2, verbose=False,
+                                    detect_loops=True, record_path=path)
+        evolution.evolve_one_generation()
+        logs.append(path.read_bytes())
+
+        episodes = list(read_episodes(path))
+        assert len(episodes) == 6
+        for episode in episodes:
+            final = EpisodePlayer(episode).frame(-1)
+            assert final.dead and final.death_cause == episode.death_cause
+    assert logs[0] == logs[1]
+
+    main(["replay", str(path)])
+    main(["replay", str(path), "--episode", "0", "--frame", "10"])
+
+def test_episodes_keep_their_board(tmp_path):
+    path = tmp_path / "boards.snr"
+    for width, height in [(10, 10), (25, 15)]:
+        rules = GameRules(width=width, height=height, start_life=100)
+        snake = SmartSnake(rng=np.random.default_rng(width), rules=rules)
+        recorder = EpisodeRecorder(snake)
+        while not snake.dead:
+            snake.think()
+            snake.move()
+            recorder.record()
+        write_episodes(path, [recorder.episode()])
+
+    small, wide = read_episodes(path)
+    assert small.rules == GameRules(width=10, height=10, start_life=100)
+    assert wide.rules.width == 25
+    final = EpisodePlayer(wide).frame(-1)
+    assert (final.body, final.score, final.death_cause) == (snake.body, snake.score, snake.death_cause)
+    main(["replay", str(path), "--episode", "1"])
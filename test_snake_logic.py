@@ -1,63 +1,28 @@
 #!/usr/bin/env python3
 
 import numpy as np
-import random
-
-# Test Neural Network class without pygame
-class TestNeuralNetwork:
-    def __init__(self, input_size=24, hidden_size=16, output_size=4):
-        self.input_size = input_size
-        self.hidden_size = hidden_size
-        self.output_size = output_size
-
-        # Initialize weights with random values
-        self.weights1 = np.random.randn(input_size, hidden_size) * 0.5
-        self.weights2 = np.random.randn(hidden_size, hidden_size) * 0.5
-        self.weights3 = np.random.randn(hidden_size, output_size) * 0.5
-
-        # Bias terms
-        self.bias1 = np.zeros((1, hidden_size))
-        self.bias2 = np.zeros((1, hidden_size))
-        self.bias3 = np.zeros((1, output_size))
-
-    def relu(self, x):
-        return np.maximum(0, x)
-
-    def softmax(self, x):
-        exp_x = np.exp(x - np.max(x))
-        return exp_x / np.sum(exp_x)
-
-    def forward(self, x):
-        # First hidden layer
-        z1 = np.dot(x, self.weights1) + self.bias1
-        a1 = self.relu(z1)
-
-        # Second hidden layer
-        z2 = np.dot(a1, self.weights2) + self.bias2
-        a2 = self.relu(z2)
-
-        # Output layer
-        z3 = np.dot(a2, self.weights3) + self.bias3
-        output = self.softmax(z3)
-
-        return output
-
-    def mutate(self, mutation_rate=0.05):
-        if random.random() < mutation_rate:
-            self.weights1 += np.random.randn(*self.weights1.shape) * 0.1
-        if random.random() < mutation_rate:
-            self.weights2 += np.random.randn(*self.weights2.shape) * 0.1
-        if random.random() < mutation_rate:
-            self.weights3 += np.random.randn(*self.weights3.shape) * 0.1
-
-        self.weights1 = np.clip(self.weights1, -1, 1)
-        self.weights2 = np.clip(self.weights2, -1, 1)
-        self.weights3 = np.clip(self.weights3, -1, 1)
+import pytest
+
+from snake_ai_python import NeuralNetwork
+from snakeai import (DIRECTIONS, VISION_DIRECTIONS, BatchSnakeEnv, GameRules, ImprovedNeuralNetwork, SimpleEvolution,
+                     SmartSnake)
+from snakeai.replay import EpisodeRecorder
+from snakeai.snake import DEATH_CAUSES
+
+# A 20x30 board with a short life budget, as the debug script plays
+RULES = GameRules(width=20, height=30, start_life=200, food_life=100, max_life=500, max_hunger=500,
+                  food_margin=0, food_distance=3)
+
+def make_snake():
+    snake = SmartSnake(rng=np.random.default_rng(0), rules=RULES)
+    snake.body = [(10, 10)]
+    snake.food = (15, 10)
+    return snake
 
 # Test basic functionality
 def test_neural_network():
     print("Testing Neural Network...")
-    nn = TestNeuralNetwork()
+    nn = ImprovedNeuralNetwork(rng=np.random.default_rng(0))
 
     # Test forward pass
     test_input = np.random.rand(1, 24)
@@ -67,93 +32,28 @@ def test_neural_network():
     print(f"Output shape: {output.shape}")
     print(f"Output values: {output}")
     print(f"Output sum (should be ~1): {np.sum(output)}")
+    assert output.shape == (1, 4)
+    assert np.isclose(np.sum(output), 1)
 
     # Test mutation
     original_weights = nn.weights1.copy()
-    nn.mutate()
+    nn.mutate(mutation_rate=1)
     weight_change = np.sum(np.abs(original_weights - nn.weights1))
     print(f"Weight change after mutation: {weight_change}")
+    assert weight_change > 0
 
     print("Neural Network test completed successfully!")
-    return True
 
 # Test game logic (without graphics)
-class TestSnake:
-    def __init__(self):
-        self.body = [(10, 10)]
-        self.direction = (1, 0)
-        self.food = (15, 10)
-        self.score = 0
-        self.life_left = 200
-        self.dead = False
-
-    def place_food(self):
-        while True:
-            food = (random.randint(0, 19), random.randint(0, 29))
-            if food not in self.body:
-                return food
-
-    def look_in_direction(self, dx, dy):
-        """Test look functionality"""
-        head_x, head_y = self.body[0]
-        distance = 1
-        food_found = False
-        body_found = False
-
-        while distance < 20:  # Max distance
-            x = head_x + dx * distance
-            y = head_y + dy * distance
-
-            # Check wall collision
-            if x < 0 or x >= 20 or y < 0 or y >= 30:
-                food_dist = 1/distance if food_found else 0
-                body_dist = 1/distance if body_found else 0
-                wall_dist = 1/distance
-                return [food_dist, body_dist, wall_dist]
-
-            # Check food collision
-            if not food_found and (x, y) == self.food:
-                food_found = True
-
-            # Check body collision
-            if not body_found and (x, y) in self.body[1:]:
-                body_found = True
-
-            distance += 1
-
-        return [0, 0, 0]
-
-    def move(self):
-        """Test movement"""
-        if self.dead:
-            return
-
-        head_x, head_y = self.body[0]
-        new_head = (head_x + self.direction[0], head_y + self.direction[1])
-
-        # Check boundaries
-        if 0 <= new_head[0] < 20 and 0 <= new_head[1] < 30:
-            self.body.insert(0, new_head)
-
-            if new_head == self.food:
-                self.score += 1
-                self.food = self.place_food()
-                self.life_left = min(self.life_left + 100, 500)
-            else:
-                self.body.pop()
-
-        self.life_left -= 1
-        if self.life_left <= 0:
-            self.dead = True
-
 def test_snake_game():
     print("\nTesting Snake Game Logic...")
-    snake = TestSnake()
+    snake = make_snake()
 
     print(f"Initial position: {snake.body[0]}")
     print(f"Food position: {snake.food}")
     print(f"Initial score: {snake.score}")
     print(f"Initial life left: {snake.life_left}")
+    assert snake.life_left == 200
 
     # Test looking in directions
     print("\nTesting vision system:")
@@ -161,41 +61,49 @@ def test_snake_game():
     for dx, dy in directions:
         vision = snake.look_in_direction(dx, dy)
         print(f"Direction ({dx}, {dy}): food={vision[0]:.3f}, body={vision[1]:.3f}, wall={vision[2]:.3f}")
+    assert snake.look_in_direction(1, 0) == [1 / 20, 0, 1 / 10]  # Food 5 cells right, wall after 10
+    assert snake.look_in_direction(0, 1) == [0, 0, 1 / 20]  # 30 rows high
 
     # Test movement
     print("\nTesting movement:")
     for i in range(5):
         snake.move()
         print(f"Move {i+1}: Position={snake.body[0]}, Score={snake.score}, Life={snake.life_left}, Dead={snake.dead}")
+    assert snake.body == [(15, 10), (14, 10)]
+    assert snake.score == 1 and snake.life_left == 200 - 5 + 100
+
+    # Food appears anywhere on the board, more than 3 steps from the head
+    foods = [snake.place_food() for _ in range(500)]
+    assert all(abs(x - 15) + abs(y - 10) > 3 for x, y in foods)
+    assert {x for x, _ in foods} == set(range(20))
+
+    # The edge of the 20x30 board is a wall
+    snake.body = [(19, 29)]
+    snake.move()
+    assert snake.dead and snake.death_cause == "wall"
 
     print("Snake game logic test completed successfully!")
-    return True
 
 def test_integration():
     print("\nTesting Neural Network + Snake Integration...")
 
     # Create test snake and neural network
-    snake = TestSnake()
-    nn = TestNeuralNetwork()
+    snake = make_snake()
+    nn = ImprovedNeuralNetwork(rng=np.random.default_rng(1))
 
     # Simulate one game step
     print("Simulating AI decision making...")
 
-    # Get snake vision (simplified)
     vision = []
-    directions = [(0, -1), (1, -1), (1, 0), (1, 1), (0, 1), (-1, 1), (-1, 0), (-1, -1)]
-
-    for dx, dy in directions:
-        vision_data = snake.look_in_direction(dx, dy)
-        vision.extend(vision_data)
-
+    for dx, dy in VISION_DIRECTIONS:
+        vision.extend(snake.look_in_direction(dx, dy))
     vision_array = np.array(vision).reshape(1, -1)
+    assert np.array_equal(vision_array[0], snake.look())
 
     # Get AI decision
     output = nn.forward(vision_array)
     direction_index = np.argmax(output)
-    directions_map = [(0, -1), (0, 1), (-1, 0), (1, 0)]  # Up, Down, Left, Right
-    new_direction = directions_map[direction_index]
+    new_direction = DIRECTIONS[direction_index]  # Up, Down, Left, Right
 
     print(f"Vision array shape: {vision_array.shape}")
     print(f"Neural network output: {output}")
@@ -208,26 +116,122 @@ def test_integration():
     snake.move()
 
     print(f"Snake moved to: {snake.body[0]}")
+    assert snake.body[0] == (10 + snake.direction[0], 10 + snake.direction[1])
     print("Integration test completed successfully!")
-    return True
+
+@pytest.mark.parametrize("rules", [RULES, GameRules(width=12, height=9, start_life=80, food_life=40, max_life=120,
+                                                    max_hunger=60, food_margin=1, food_distance=2)])
+def test_batch_env_follows_the_same_rules(rules):
+    seeds = [1, 2, 3, 4]
+    rng = np.random.default_rng(5)
+    brains = [ImprovedNeuralNetwork(rng=rng) for _ in seeds]
+
+    env = BatchSnakeEnv(len(seeds), rngs=[np.random.default_rng(seed) for seed in seeds], rules=rules)
+    games = env.alive_games()
+    while len(games) > 0:
+        vision = env.look(games)
+        env.think(games, np.vstack([brains[game].forward(vision[i:i+1]) for i, game in enumerate(games)]))
+        env.move()
+        games = env.alive_games()
+
+    fitness = env.calculate_fitness()
+    for game, (seed, brain) in enumerate(zip(seeds, brains)):
+        snake = SmartSnake(brain=brain, rng=np.random.default_rng(seed), rules=rules)
+        while not snake.dead:
+            snake.think()
+            snake.move()
+        snake.calculate_fitness()
+
+        assert env.score[game] == snake.score
+        assert env.life_left[game] == snake.life_left
+        assert env.body(game) == snake.body
+        assert fitness[game] == snake.fitness
+
+# A 3x2 board the snake can fill by circling, from its start at (1, 1)
+TINY_RULES = GameRules(width=3, height=2, start_life=100, food_life=10, max_life=100, max_hunger=100,
+                       food_margin=0, food_distance=0)
+CIRCUIT = [(1, 1), (0, 1), (0, 0), (1, 0), (2, 0), (2, 1)]
+
+def circuit_direction(head):
+    next_x, next_y = CIRCUIT[(CIRCUIT.index(head) + 1) % len(CIRCUIT)]
+    return (next_x - head[0], next_y - head[1])
+
+def test_filling_the_board_wins_the_game():
+    snake = SmartSnake(rng=np.random.default_rng(0), rules=TINY_RULES)
+    recorder = EpisodeRecorder(snake)
+    while not snake.dead:
+        snake.direction = circuit_direction(snake.body[0])
+        snake.move()
+        recorder.record()
+        assert sorted(snake.free_cells) == sorted(set(range(6)) - {y * 3 + x for x, y in snake.body})
+
+    assert snake.death_cause == "win" and snake.score == 5 and len(snake.body) == 6
+    assert snake.food == snake.body[0]
+    assert recorder.episode().score == 5
+
+    for backend in ("numpy", "python"):
+        env = BatchSnakeEnv(1, rngs=[np.random.default_rng(0)], rules=TINY_RULES, backend=backend)
+        while not env.dead[0]:
+            head_y, head_x = divmod(int(env.head[0]), 3)
+            env.direction[0] = DIRECTIONS.index(circuit_direction((head_x, head_y)))
+            env.move()
+        assert DEATH_CAUSES[env.death_cause[0]] == "win"
+        assert env.body(0) == snake.body and env.num_free[0] == 0
+
+def test_food_is_placed_near_the_head_when_nothing_else_is_free():
+    # Every cell of a 5x5 board is within 5 steps of the middle
+    rules = GameRules(width=5, height=5, food_margin=0, food_distance=5)
+    snake = SmartSnake(rng=np.random.default_rng(0), rules=rules)
+    snake.body = [(2, 2), (2, 3), (2, 4)]
+    foods = {snake.place_food() for _ in range(200)}
+    assert foods == {(x, y) for x in range(5) for y in range(5)} - set(snake.body)
+
+def test_board_tables_are_built_once_per_size():
+    small = GameRules(width=10, height=10)
+    assert GameRules(width=10, height=10, start_life=50, food_distance=2).board is small.board
+    assert GameRules(width=60, height=60).board is not small.board
+
+    # Neighbours of the top-left corner, in DIRECTIONS order (Up, Down, Left, Right)
+    assert small.board.neighbour_lists[0] == [-1, 10, -1, 1]
+    assert small.board.neighbour_lists[99] == [89, -1, 98, -1]
+
+@pytest.mark.parametrize("size", [(10, 10), (60, 60)])
+def test_engines_agree_on_any_board_size(size):
+    rules = GameRules(width=size[0], height=size[1])
+    results = []
+    for batched in (False, True):
+        evolution = SimpleEvolution(population_size=6, batched=batched, seed=3, verbose=False, rules=rules)
+        evolution.evolve_one_generation()
+        results.append([(snake.score, snake.fitness) for snake in evolution.population])
+        assert evolution.best_snake.rules is rules
+    assert results[0] == results[1]
+
+def test_classic_network_breeds_from_a_generator():
+    parents = [NeuralNetwork(rng=np.random.default_rng(seed)) for seed in (1, 2)]
+    children = [parents[0].crossover(parents[1], rng=np.random.default_rng(5)) for _ in range(2)]
+    assert np.array_equal(children[0].get_weights(), children[1].get_weights())
+    assert np.all((children[0].weights1 == parents[0].weights1) | (children[0].weights1 == parents[1].weights1))
+    assert not np.any(children[0].bias1)
+
+    # Every layer mutates at rate 1, and weights stay within the classic +-1
+    children[0].mutate(mutation_rate=1, rng=np.random.default_rng(6))
+    children[1].mutate(mutation_rate=1, rng=np.random.default_rng(6))
+    assert np.array_equal(children[0].get_weights(), children[1].get_weights())
+    assert np.abs(children[0].weights1).max() <= 1
 
 # Run all tests
 if __name__ == "__main__":
     print("=== Snake AI Core Logic Tests ===\n")
 
-    success = True
-    success &= test_neural_network()
-    success &= test_snake_game()
-    success &= test_integration()
-
-    if success:
-        print("\n✅ All tests passed! The Snake AI core logic is working correctly.")
-        print("\nThe original SnakeAI project has been successfully analyzed and a working Python version has been created.")
-        print("Key features implemented:")
-        print("- Neural network with 24 inputs, 16 hidden nodes, 4 outputs")
-        print("- Snake vision system (8 directions x 3 features)")
-        print("- Movement and collision detection")
-        print("- Scoring and life system")
-        print("- AI decision making")
-    else:
-        print("\n❌ Some tests failed!")
\ No newline at end of file
+    test_neural_network()
+    test_snake_game()
+    test_integration()
+
+    print("\n✅ All tests passed! The Snake AI core logic is working correctly.")
+    print("\nThe original SnakeAI project has been successfully analyzed and a working Python version has been created.")
+    print("Key features implemented:")
+    print("- Neural network with 24 inputs, 16 hidden nodes, 4 outputs")
+    print("- Snake vision system (8 directions x 3 features)")
+    print("- Movement and collision detection")
+    print("- Scoring and life system")
+    print("- AI decision making")
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+
+import time
+
+import numpy as np
+
+from snakeai import SimpleEvolution
+from snakeai.training import TrainingWorker
+
+def test_worker_publishes_the_same_champions_as_a_local_run():
+    worker = TrainingWorker(preview=3, population_size=6, batched=True, seed=11)
+    try:
+        worker.train(2)
+        messages = []
+        deadline = time.time() + 60
+        while (not messages or messages[-1]["generation"] < 2) and time.time() < deadline:
+            messages += worker.poll()
+            time.sleep(0.05)
+    finally:
+        worker.close()
+
+    assert [message["generation"] for message in messages] == [0, 1, 2]
+    assert messages[0]["champion"] is None and messages[0]["genomes"].shape == (3, 740)
+
+    local = SimpleEvolution(population_size=6, batched=True, seed=11, verbose=False)
+    for message in messages[1:]:
+        local.evolve_one_generation()
+        assert message["stats"]["best_fitness"] == local.stats["best_fitness"]
+        assert np.array_equal(message["champion"], local.best_snake.brain.get_weights())
+        assert np.array_equal(message["genomes"], local.genomes[:3])
+
+def test_paused_worker_waits_for_resume():
+    worker = TrainingWorker(population_size=6, batched=True, seed=11)
+    try:
+        worker.pause()
+        worker.train(2)
+        messages = []
+        deadline = time.time() + 60
+        while not messages and time.time() < deadline:
+            messages += worker.poll()
+            time.sleep(0.05)
+        time.sleep(1)
+        assert [message["generation"] for message in messages + worker.poll()] == [0]
+
+        worker.resume()
+        messages = []
+        deadline = time.time() + 60
+        while (not messages or messages[-1]["generation"] < 2) and time.time() < deadline:
+            messages += worker.poll()
+            time.sleep(0.05)
+    finally:
+        worker.close()
+    assert [message["generation"] for message in messages] == [1, 2]